@@ -1,18 +1,14 @@
 import streamlit as st
-import io
-import requests
 
 from streamlit_extras.badges import badge
-from PIL import Image
+
+from aqw_app.assets import image_bytes
 
 def main():
     col1, col2, col3 = st.columns([0.0675, 0.27, 0.035])
     
     with col1:
-        url = 'https://github.com/tsu2000/aqw_guides/raw/main/images/aqw.png'
-        response = requests.get(url)
-        img = Image.open(io.BytesIO(response.content))
-        st.image(img, output_format = 'png')
+        st.image(image_bytes('aqw.png'), output_format = 'png')
 
     with col2:
         st.title('AQWorlds Stats Guides')
@@ -0,0 +1 @@
+# Streamlit-side helpers shared by the AQWorlds guide pages (assets, rendering)
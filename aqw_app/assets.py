@@ -0,0 +1,44 @@
+import logging
+import os
+
+from functools import lru_cache
+
+
+# Images shipped with the repository are served from disk. Set AQW_REMOTE_ASSETS=1 to fetch them
+# from GitHub instead, which falls back to the bundled copy if the request fails or times out.
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'images')
+REMOTE_BASE = 'https://github.com/tsu2000/aqw_guides/raw/main/images/'
+REMOTE_TIMEOUT = 3
+
+logger = logging.getLogger(__name__)
+
+
+def remote_enabled():
+    return os.environ.get('AQW_REMOTE_ASSETS', '') == '1'
+
+
+def _fetch_remote(name, timeout):
+    import requests
+
+    try:
+        response = requests.get(REMOTE_BASE + name, timeout = timeout)
+        response.raise_for_status()
+        return response.content
+    except requests.RequestException as e:
+        logger.warning('Could not fetch %s from GitHub, using the bundled copy: %s', name, e)
+        return None
+
+
+# Raw bytes of an image in images/, cached for the lifetime of the process
+@lru_cache(maxsize = 32)
+def image_bytes(name, remote = None, timeout = REMOTE_TIMEOUT):
+    if remote is None:
+        remote = remote_enabled()
+
+    if remote:
+        content = _fetch_remote(name, timeout)
+        if content is not None:
+            return content
+
+    with open(os.path.join(IMAGE_DIR, name), 'rb') as f:
+        return f.read()
@@ -0,0 +1,67 @@
+import functools
+import inspect
+import os
+
+import streamlit as st
+
+from aqw_app.profiling import active
+
+
+# Values derived from widget inputs which are kept in the session's st.session_state and only recomputed
+# when one of their inputs changes. A derived value is a function whose arguments are its inputs:
+#
+#     @derived
+#     def progress_bar_image(rep_percent):
+#         ...
+#
+# Calling it with the same arguments as on the session's previous call returns the stored value as is,
+# anything else recomputes it and replaces the stored value. Unlike st.cache_data only the latest value is
+# kept per session, and nothing is hashed or pickled, so a rerun caused by an unrelated widget costs a
+# comparison of the inputs. The inputs are compared with ==, so they must be numbers, strings or tuples of
+# them rather than arrays, and the function must not read any other widget.
+
+_VALUES_KEY = '_derived_values'
+_COUNTS_KEY = '_derived_counts'
+
+
+def _state(key):
+    return st.session_state.setdefault(key, {})
+
+
+def derived(fn):
+    # Pages all run as __main__, so values are told apart by the file they are defined in
+    original = inspect.unwrap(fn)
+    name = f'{os.path.basename(original.__code__.co_filename)[:-3]}.{original.__qualname__}'
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        inputs = (args, tuple(sorted(kwargs.items())))
+        values, counts = _state(_VALUES_KEY), _state(_COUNTS_KEY)
+        hits, misses = counts.get(name, (0, 0))
+
+        stored = values.get(name)
+        if stored is not None and stored[0] == inputs:
+            counts[name] = (hits + 1, misses)
+            return stored[1]
+
+        value = fn(*args, **kwargs)
+        values[name] = (inputs, value)
+        counts[name] = (hits, misses + 1)
+        return value
+
+    wrapper.derived_name = name
+    return wrapper
+
+
+# Hits and misses of every derived value in this session, as {name: (hits, misses)}
+def counters():
+    return dict(_state(_COUNTS_KEY))
+
+
+# Adds the session's hit/miss counters to the sidebar while the rerun is being profiled
+def show_counters():
+    if not active():
+        return
+    rows = '\n'.join(f'| {name} | {hits} | {misses} |' for name, (hits, misses) in sorted(counters().items()))
+    st.sidebar.markdown('**Derived values this session:**')
+    st.sidebar.markdown('| Value | Hits | Misses |\n|:--|--:|--:|\n' + rows)
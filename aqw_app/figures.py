@@ -0,0 +1,112 @@
+import base64
+import contextlib
+import io
+import os
+import threading
+import time
+
+import streamlit as st
+
+from aqw_app.lazy import lazy_import
+from aqw_app.profiling import active
+
+# Only matplotlib's object-oriented API is used, pyplot is never imported
+backend_agg = lazy_import('matplotlib.backends.backend_agg')
+mpl_figure = lazy_import('matplotlib.figure')
+mpl_style = lazy_import('matplotlib.style')
+
+
+# Output layer for matplotlib figures, used by the pages instead of st.pyplot. st.pyplot saves every
+# figure at 200 dpi (2400px wide for a 12 inch figure) and Streamlit then scales it back down to the
+# content width and encodes it a second time. Here the dpi is picked so the tightly cropped figure comes
+# out exactly as wide as it is displayed (times the screen's pixel ratio), and it is encoded once.
+
+# Width of the main column in Streamlit's centered layout, and the pixel ratio of high-DPI screens
+DISPLAY_WIDTH = 730
+PIXEL_RATIO = 2
+
+# Padding matplotlib adds around a tightly cropped figure, in inches
+PAD_INCHES = 0.1
+
+FORMATS = {'png': 'image/png',
+           'webp': 'image/webp',
+           'jpeg': 'image/jpeg',
+           'svg': 'image/svg+xml'}
+
+# Format used when a page doesn't ask for one, can be changed per deployment
+DEFAULT_FORMAT = os.environ.get('AQW_FIGURE_FORMAT', 'png')
+
+# Quality of the lossy formats, high enough that thin lines and text stay sharp
+QUALITY = {'jpeg': 90, 'webp': 90}
+
+# A style is applied through matplotlib's process-wide rcParams, so figures are drawn one at a time
+FIGURE_LOCK = threading.RLock()
+
+
+# Managed figure for drawing with the object-oriented API:
+#
+#     with figures.figure((12, 6), 'seaborn-whitegrid') as fig:
+#         ax = fig.subplots()
+#         ...
+#         return figures.encode(fig)
+#
+# The figure is never registered with pyplot, so nothing holds on to it after the block, and it is cleared
+# on the way out even if drawing fails. The style starts from matplotlib's defaults and only applies inside
+# the block, where the figure must also be encoded as saving reads the style too.
+@contextlib.contextmanager
+def figure(figsize, style = 'default', dpi = None):
+    with FIGURE_LOCK, mpl_style.context(style, after_reset = True):
+        fig = mpl_figure.Figure(figsize = figsize, dpi = dpi)
+        backend_agg.FigureCanvasAgg(fig)
+        try:
+            yield fig
+        finally:
+            fig.clear()
+
+
+# Dots per inch at which the tightly cropped figure is width_px pixels wide
+def dpi_for(fig, width_px):
+    bbox = fig.get_tightbbox(fig.canvas.get_renderer())
+    return width_px / (bbox.width + 2 * PAD_INCHES)
+
+
+# Encodes a figure. Returns (bytes, stats) with the format, width in pixels, dpi, payload
+# bytes and encode time in milliseconds.
+def encode(fig, fmt = None, width = DISPLAY_WIDTH, pixel_ratio = PIXEL_RATIO):
+    fmt = fmt or DEFAULT_FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown figure format {fmt!r}, expected one of {", ".join(FORMATS)}')
+
+    start = time.perf_counter()
+    dpi = dpi_for(fig, width * pixel_ratio)
+    options = {'format': fmt, 'dpi': dpi, 'bbox_inches': 'tight', 'pad_inches': PAD_INCHES}
+    if fmt in QUALITY:
+        options['pil_kwargs'] = {'quality': QUALITY[fmt]}
+
+    buf = io.BytesIO()
+    fig.savefig(buf, **options)
+    data = buf.getvalue()
+
+    stats = {'format': fmt, 'width_px': width * pixel_ratio, 'dpi': round(dpi, 1), 'bytes': len(data),
+             'encode_ms': (time.perf_counter() - start) * 1000}
+    return data, stats
+
+
+def _caption(stats):
+    return f"{stats['format'].upper()} at {stats['dpi']:.0f} dpi, {stats['bytes'] / 1024:,.1f} KiB, encoded in {stats['encode_ms']:.0f} ms"
+
+
+# Shows an encoded figure. PNG and JPEG go through st.image, which passes them on untouched at this size,
+# WebP and SVG are embedded directly as st.image would re-encode or mangle them. The encoding stats are
+# shown under the figure while the rerun is being profiled.
+def display(data, stats):
+    if stats['format'] in ('png', 'jpeg'):
+        st.image(data, output_format = stats['format'].upper(), use_column_width = True)
+    else:
+        uri = f"data:{FORMATS[stats['format']]};base64,{base64.b64encode(data).decode()}"
+        st.markdown(f'<img src="{uri}" style="width: 100%">', unsafe_allow_html = True)
+
+    if active():
+        st.caption(_caption(stats))
+    return stats
+
@@ -0,0 +1,40 @@
+import importlib
+import threading
+import types
+
+
+# Module proxy which performs the real import the first time one of its attributes is used, so
+# heavy plotting libraries are only loaded on the code paths that draw something.
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f'<lazy module {self.__name__!r} ({state})>'
+
+
+# Use in place of "import name", e.g. pd = lazy_import('pandas')
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,152 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+from aqw_app import figures
+from aqw_app.lazy import lazy_import
+from aqw_stats.reputation import REP_RANK
+
+# Only needed when the charts have to be (re)rendered
+Image = lazy_import('PIL.Image')
+
+
+# Charts on the Reputation page only depend on REP_RANK, so they are rendered once and served from disk.
+# Bump RENDER_VERSION whenever the plotting code below changes so existing assets get rebuilt.
+RENDER_VERSION = 2
+DPI = 150
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'images', 'prerendered')
+MANIFEST = 'manifest.json'
+
+_lock = threading.Lock()
+_memory = {}
+
+
+# Percentage of total rep contained in each rank increment
+def _rep_comp():
+    return {i: REP_RANK[i] / sum(REP_RANK.values()) * 100 for i in REP_RANK.keys()}
+
+
+def original_plot(ax):
+    ax.bar(REP_RANK.keys(), REP_RANK.values(), color = 'g', alpha = 0.65)
+    ax.bar_label(ax.containers[0])
+
+    ax.set_xticks(ticks = list(REP_RANK.keys()),
+                  labels = [f'Rank {num} - {num + 1}' for num in list(REP_RANK.keys())])
+
+    ax.set_title('Amount of Reputation to get from each rep rank to the next', fontsize = 15)
+    ax.set_ylabel('Reputation Points', fontsize = 15, labelpad = 10)
+    ax.set_xlabel('Rank Increments', fontsize = 15, labelpad = 10)
+
+
+def percent_plot(ax):
+    rep_comp = _rep_comp()
+
+    ax.bar(rep_comp.keys(), rep_comp.values(), color = 'b', alpha = 0.5)
+    ax.bar_label(ax.containers[0], fmt = '%.2f%%')
+
+    ax.set_xticks(ticks = list(rep_comp.keys()),
+                  labels = [f'Rank {num} - {num + 1}' for num in list(rep_comp.keys())])
+
+    ax.set_title('Percentage of total rep contained in each rank increment', fontsize = 15)
+    ax.set_ylabel('Percentage', fontsize = 15, labelpad = 10)
+    ax.set_xlabel('Rank Increments', fontsize = 15, labelpad = 10)
+
+
+def cumulative_plot(ax):
+    rep_comp = _rep_comp()
+
+    # Cumulative percentage of total rep earned at the start of each rank
+    rep_cum_comp = {'Rank 1': 0.0}
+    running = 0.0
+    for i in rep_comp:
+        running += rep_comp[i]
+        rep_cum_comp[f'Rank {i + 1}'] = running
+    rep_cum_comp['Rank 10'] = 100.0
+
+    ax.plot(rep_cum_comp.keys(), rep_cum_comp.values(), color = 'orange', alpha = 0.75, marker = 'X')
+
+    ax.set_xticks(ticks = list(rep_cum_comp.keys()))
+
+    for x, y in zip(rep_cum_comp.keys(), rep_cum_comp.values()):
+        label = f'{round(y, 2)}%'
+        ax.annotate(label, (x, y), xycoords = 'data', textcoords = 'offset points',
+                    xytext = (0, 5), ha = 'center', fontsize = 10)
+
+    ax.set_title('Cumulative Percentage of total rep earned at end of each rank', fontsize = 15)
+    ax.set_ylabel('Cumulative Percentage', fontsize = 15, labelpad = 10)
+    ax.set_xlabel('% of total rep earned at start of:', fontsize = 15, labelpad = 10)
+
+
+# Each chart is drawn onto a 12x6 figure in its style
+CHARTS = {'original': ('ggplot', original_plot),
+          'percent': ('ggplot', percent_plot),
+          'cumulative': ('seaborn-whitegrid', cumulative_plot)}
+
+
+# Hash of everything the charts depend on
+def content_hash():
+    payload = json.dumps({'rep_rank': REP_RANK, 'version': RENDER_VERSION, 'dpi': DPI}, sort_keys = True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# Renders a chart to a PNG, re-encoded by Pillow with the optimize flag to shrink the file
+def _png_bytes(style, draw):
+    raw = io.BytesIO()
+    with figures.figure((12, 6), style, dpi = DPI) as fig:
+        draw(fig.subplots())
+        fig.savefig(raw, format = 'png', dpi = DPI)
+
+    out = io.BytesIO()
+    Image.open(raw).save(out, format = 'png', optimize = True)
+    return out.getvalue()
+
+
+def _read_manifest(asset_dir):
+    try:
+        with open(os.path.join(asset_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, data):
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+
+# Renders every chart to asset_dir unless the assets there were built from the same data, returns True if rebuilt
+def build_assets(asset_dir = ASSET_DIR, force = False):
+    digest = content_hash()
+    manifest = _read_manifest(asset_dir)
+    if not force and manifest.get('hash') == digest and \
+            all(os.path.exists(os.path.join(asset_dir, f'{name}.png')) for name in CHARTS):
+        return False
+
+    os.makedirs(asset_dir, exist_ok = True)
+    for name, (style, draw) in CHARTS.items():
+        _write_atomic(os.path.join(asset_dir, f'{name}.png'), _png_bytes(style, draw))
+    _write_atomic(os.path.join(asset_dir, MANIFEST), json.dumps({'hash': digest, 'charts': sorted(CHARTS)}).encode())
+    return True
+
+
+# PNG bytes of a chart, kept in memory after the first read and rebuilt on disk if REP_RANK changed
+def chart_bytes(name, asset_dir = ASSET_DIR):
+    key = (name, content_hash())
+    if key not in _memory:
+        with _lock:
+            if key not in _memory:
+                build_assets(asset_dir)
+                with open(os.path.join(asset_dir, f'{name}.png'), 'rb') as f:
+                    _memory[key] = f.read()
+    return _memory[key]
+
+
+if __name__ == '__main__':
+    if build_assets():
+        print(f'Rendered {len(CHARTS)} charts to {ASSET_DIR}')
+    else:
+        print(f'Charts in {ASSET_DIR} are up to date')
@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+
+# Opt-in timing of the hot sections of a rerun. Turned on for every session with AQW_PROFILE=1, or for one
+# session by opening a page with ?profile=1 where the deployment allows it with AQW_PROFILE_ALLOWED=1, so
+# visitors of a public app cannot turn it on. The page's main() is wrapped with @profiled, sections inside
+# it with "with timed('name'):", and each profiled rerun shows its breakdown in the sidebar and appends one
+# JSON line to the log. Once the log reaches AQW_PROFILE_LOG_MB megabytes it is moved to a .1 file,
+# replacing the previous one. When profiling is off timed() returns a shared no-op context manager.
+#
+#     python -m aqw_app.profiling summarize     # p50/p95 per page and section from the log
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_PATH = os.environ.get('AQW_PROFILE_LOG', os.path.join(ROOT, 'data', 'profile.jsonl'))
+LOG_MAX_BYTES = int(float(os.environ.get('AQW_PROFILE_LOG_MB', 10)) * 2 ** 20)
+
+_NO_OP = contextlib.nullcontext()
+
+# Each Streamlit session reruns its script in its own thread, so the current rerun is kept per thread
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+def enabled():
+    if os.environ.get('AQW_PROFILE') == '1':
+        return True
+    if os.environ.get('AQW_PROFILE_ALLOWED') != '1':
+        return False
+    return st.experimental_get_query_params().get('profile', ['0'])[0] == '1'
+
+
+class _Timer:
+    __slots__ = ('sections', 'name', 'start')
+
+    def __init__(self, sections, name):
+        self.sections = sections
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        total, count = self.sections.get(self.name, (0.0, 0))
+        self.sections[self.name] = (total + elapsed, count + 1)
+
+
+# Whether the current rerun is being profiled, for output that only makes sense alongside the timings
+def active():
+    return getattr(_local, 'sections', None) is not None
+
+
+def timed(name):
+    sections = getattr(_local, 'sections', None)
+    if sections is None:
+        return _NO_OP
+    return _Timer(sections, name)
+
+
+def _write_log(record):
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok = True)
+    with _log_lock:
+        if os.path.exists(LOG_PATH) and os.path.getsize(LOG_PATH) >= LOG_MAX_BYTES:
+            os.replace(LOG_PATH, LOG_PATH + '.1')
+        with open(LOG_PATH, 'a', encoding = 'utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def _show(total_ms, sections):
+    rows = '\n'.join(f'| {name} | {count} | {ms:,.1f} |' for name, (ms, count) in
+                     sorted(sections.items(), key = lambda item: -item[1][0]))
+    st.sidebar.markdown('---')
+    st.sidebar.markdown(f'**Rerun profile:** {total_ms:,.1f}ms in total')
+    st.sidebar.markdown('| Section | Calls | Time (ms) |\n|:--|--:|--:|\n' + rows)
+
+
+# Wraps a page's main() so every rerun is profiled while profiling is on
+def profiled(page):
+    def decorator(main):
+        @functools.wraps(main)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return main(*args, **kwargs)
+
+            _local.sections = {}
+            start = time.perf_counter()
+            try:
+                return main(*args, **kwargs)
+            finally:
+                total_ms = (time.perf_counter() - start) * 1000
+                sections = {name: (seconds * 1000, count) for name, (seconds, count) in _local.sections.items()}
+                _local.sections = None
+                _show(total_ms, sections)
+                _write_log({'ts': time.time(), 'page': page, 'total_ms': total_ms,
+                            'sections': {name: {'ms': ms, 'calls': count} for name, (ms, count) in sections.items()}})
+        return wrapper
+    return decorator
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+# p50/p95 of the time spent per rerun in each section of each page, 'total' being the whole rerun. Reads
+# the rotated log too when there is one.
+def summarize(path = LOG_PATH):
+    times = {}
+    for log in [path + '.1', path]:
+        if log != path and not os.path.exists(log):
+            continue
+        with open(log, encoding = 'utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                times.setdefault((record['page'], 'total'), []).append(record['total_ms'])
+                for name, section in record['sections'].items():
+                    times.setdefault((record['page'], name), []).append(section['ms'])
+
+    return [{'page': page, 'section': name, 'reruns': len(values),
+             'p50_ms': _percentile(values, 0.5), 'p95_ms': _percentile(values, 0.95)}
+            for (page, name), values in sorted(times.items())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Aggregate the rerun timings logged while profiling was on.')
+    parser.add_argument('command', choices = ['summarize'])
+    parser.add_argument('--log', default = LOG_PATH)
+    parser.add_argument('--json', action = 'store_true', help = 'print the summary as JSON')
+    args = parser.parse_args()
+
+    summary = summarize(args.log)
+    if args.json:
+        print(json.dumps(summary, indent = 2))
+        return
+
+    print(f"{'page':<20} {'section':<28} {'reruns':>7} {'p50':>10} {'p95':>10}")
+    for row in summary:
+        print(f"{row['page']:<20} {row['section']:<28} {row['reruns']:>7} {row['p50_ms']:>8.1f}ms {row['p95_ms']:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
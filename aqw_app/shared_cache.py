@@ -0,0 +1,147 @@
+import collections
+import functools
+import inspect
+import os
+import pickle
+import sys
+import threading
+
+import numpy as np
+import streamlit as st
+
+from aqw_app.profiling import active
+
+
+# Results and encoded figures shared by every session of the process. Many users ask the same questions (the
+# preset items, the default inputs), so a value computed for one session is kept for the others, keyed on the
+# function and its normalised arguments. The cache holds at most AQW_CACHE_MB megabytes, evicting the least
+# recently used values first. Values are shared, so arrays are made read-only when stored and no caller may
+# modify what it gets back. Figures are only ever cached as encoded bytes, never as matplotlib objects.
+#
+#     @shared
+#     def pmf_image(p, xi):
+#         ...
+MAX_BYTES = int(float(os.environ.get('AQW_CACHE_MB', 64)) * 2 ** 20)
+
+
+# Hashable form of an argument, so 0.25 and np.float64(0.25) or [1, 2] and (1, 2) give the same key
+def _normalise(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return float(f'{value:.12g}')
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_normalise(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalise(v)) for k, v in value.items()))
+    return value
+
+
+# Approximate memory held by a value, counting arrays and bytes by their contents
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(k) + _nbytes(v) for k, v in value.items())
+    if isinstance(value, (int, float, bool, type(None), np.generic)):
+        return sys.getsizeof(value)
+    return len(pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL))
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.setflags(write = False)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+
+
+class ResultCache:
+    def __init__(self, max_bytes = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # Keys being computed, so sessions asking for the same value at once wait for one computation
+        self._pending = {}
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another session is computing it, take its value once done (or compute it if that failed)
+            pending.wait()
+
+        try:
+            value = compute()
+            _freeze(value)
+            self._store(key, value, _nbytes(value))
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+
+    def _store(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._entries[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last = False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'hit_rate': self.hits / lookups if lookups else None}
+
+
+cache = ResultCache()
+
+
+def shared(fn):
+    # Pages all run as __main__, so functions are told apart by the file they are defined in
+    original = inspect.unwrap(fn)
+    name = f'{os.path.basename(original.__code__.co_filename)[:-3]}.{original.__qualname__}'
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (name, _normalise(args), _normalise(kwargs))
+        return cache.get_or_compute(key, lambda: fn(*args, **kwargs))
+    return wrapper
+
+
+# Adds the cache's size and hit rate to the sidebar while the rerun is being profiled
+def show_stats():
+    if not active():
+        return
+    stats = cache.stats()
+    hit_rate = '-' if stats['hit_rate'] is None else f"{stats['hit_rate']:.0%}"
+    st.sidebar.markdown(f"**Shared cache:** {stats['entries']} values, {stats['bytes'] / 2 ** 20:,.1f} of "
+                        f"{stats['max_bytes'] / 2 ** 20:,.0f} MiB, {hit_rate} hit rate over {stats['hits'] + stats['misses']:,} "
+                        f"lookups, {stats['evictions']:,} evicted")
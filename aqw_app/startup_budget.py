@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Cold-start report for the multipage app. Each page is imported in a fresh interpreter with Streamlit
+# already loaded (as it is in the server), and the import time and any heavy libraries it pulled in are
+# recorded. Text-only topics are also called to check they never load the plotting stack.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries Streamlit does not load itself, which should only be imported on the code paths that draw
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'scipy')
+
+# Import time budget for each page in milliseconds, on top of importing Streamlit
+BUDGET_MS = {'1_🏠_Homepage.py': 250,
+             'pages/2_⚔️_Drop Rate Guide.py': 150,
+             'pages/3_📚_Reputation Guide.py': 150,
+             'pages/4_☠️_Void Aura Guide.py': 150}
+
+# Functions of each page which only write text, and must not import any heavy module
+TEXT_ONLY = {'pages/2_⚔️_Drop Rate Guide.py': ['expl'],
+             'pages/4_☠️_Void Aura Guide.py': ['faq']}
+
+_PROBE = '''
+import json, logging, runpy, sys, time
+import streamlit
+
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+root, page, heavy, funcs = sys.argv[1], sys.argv[2], tuple(sys.argv[3].split(',')), [f for f in sys.argv[4].split(',') if f]
+sys.path.insert(0, root)
+
+def heavy_loaded(before):
+    return sorted(m for m in set(sys.modules) - before if m.split('.')[0] in heavy and '.' not in m)
+
+before = set(sys.modules)
+start = time.perf_counter()
+page_globals = runpy.run_path(page, run_name = '__startup_probe__')
+import_ms = (time.perf_counter() - start) * 1000
+on_import = heavy_loaded(before)
+
+for name in funcs:
+    page_globals[name]()
+
+print(json.dumps({'import_ms': import_ms, 'heavy_on_import': on_import, 'heavy_after_text': heavy_loaded(before)}))
+'''
+
+
+def probe(page, repeats = 5):
+    runs = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-c', _PROBE, ROOT, os.path.join(ROOT, page),
+                                 ','.join(HEAVY_MODULES), ','.join(TEXT_ONLY.get(page, []))],
+                                capture_output = True, text = True, cwd = ROOT, check = True)
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    return {'page': page,
+            'import_ms': statistics.median(run['import_ms'] for run in runs),
+            'budget_ms': BUDGET_MS.get(page),
+            'heavy_on_import': runs[-1]['heavy_on_import'],
+            'heavy_after_text': runs[-1]['heavy_after_text']}
+
+
+# Problems found in a report, an empty list means every page is within budget
+def violations(report):
+    problems = []
+    for row in report:
+        if row['budget_ms'] is not None and row['import_ms'] > row['budget_ms']:
+            problems.append(f"{row['page']}: import took {row['import_ms']:.0f}ms, budget is {row['budget_ms']}ms")
+        if row['heavy_on_import']:
+            problems.append(f"{row['page']}: importing the page loads {', '.join(row['heavy_on_import'])}")
+        if row['heavy_after_text']:
+            problems.append(f"{row['page']}: text-only topics load {', '.join(row['heavy_after_text'])}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Report the cold-start import cost of every page.')
+    parser.add_argument('--repeats', type = int, default = 5, help = 'fresh interpreters per page, the median is reported')
+    parser.add_argument('--json', help = 'also write the report to this file')
+    parser.add_argument('--check', action = 'store_true', help = 'exit with an error if any page is over budget')
+    args = parser.parse_args()
+
+    report = [probe(page, args.repeats) for page in BUDGET_MS]
+
+    print(f"{'page':<34} {'import':>9} {'budget':>8}  heavy modules")
+    for row in report:
+        heavy = ', '.join(row['heavy_on_import'] + [f'{m} (text topics)' for m in row['heavy_after_text'] if m not in row['heavy_on_import']]) or '-'
+        print(f"{row['page']:<34} {row['import_ms']:>7.0f}ms {row['budget_ms']:>6}ms  {heavy}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent = 2)
+
+    problems = violations(report)
+    for problem in problems:
+        print(f'Over budget: {problem}')
+    if args.check and problems:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# Headless statistics for the AQWorlds guides, shared by the Streamlit pages and the batch CLI (python -m aqw_stats)
@@ -0,0 +1,4 @@
+from aqw_stats.batch import main
+
+
+main()
@@ -0,0 +1,202 @@
+import argparse
+import csv
+import json
+import sys
+from functools import lru_cache
+
+from aqw_stats import geometric
+from aqw_stats.catalog import MAX_RATE, MIN_RATE
+from aqw_stats.collector import independent_expected, independent_ppf, one_drop_expected
+from aqw_stats.reputation import MAX_RANK, REP_RANK, progress
+from aqw_stats.void_aura_table import DEFAULT_PATH, days_stats, load_table
+
+
+# Batch queries without Streamlit, e.g. for bots and spreadsheets. Queries are read one per JSON line or CSV
+# row and answered in order, one result per line or row. A JSON line names its query type in a "query"
+# field (or takes the --query default), a CSV file holds a single query type given with --query. An "id"
+# field is copied to the result, and a query that fails gives an "error" instead of stopping the batch.
+#
+#     python -m aqw_stats < queries.jsonl > results.jsonl
+#     python -m aqw_stats --format csv --query reputation < guild.csv > progress.csv
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('yes', 'true', '1', 'y')
+    return bool(value)
+
+
+# Whole numbers only, so a rank of 6.5 is an error rather than rank 6
+def _as_int(value):
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f'{value!r} is not a whole number')
+    return int(number)
+
+
+def _as_rates(value):
+    if isinstance(value, str):
+        value = value.replace(';', ' ').replace(',', ' ').split()
+    return [float(rate) for rate in value]
+
+
+# Fields of each query type as (name, converter, default), a default of None making the field required
+FIELDS = {'drop': [('rate', float, None)],
+          'multi_drop': [('rates', _as_rates, None), ('model', str, 'independent')],
+          'reputation': [('rank', _as_int, None), ('rep', _as_int, None), ('quest_rep', float, ''), ('item_boost', float, 0),
+                         ('rep_boost', _as_bool, False), ('server_boost', _as_int, 1)],
+          'void_aura': [('current', _as_int, None), ('quests_per_day', _as_int, None), ('daily_bonus', _as_int, 0),
+                        ('boost', _as_bool, False)]}
+
+# Result fields of each query type, in the order of the CSV columns
+RESULTS = {'drop': ['mean', 'std', 'p25', 'median', 'p75', 'p99', 'p975'],
+           'multi_drop': ['expected', 'median', 'p75', 'p99'],
+           'reputation': ['total_rep', 'progress_pct', 'rep_left', 'boosted_quest_rep', 'quests_left'] +
+                         [f'quests_to_rank_{r}' for r in range(2, MAX_RANK + 1)],
+           'void_aura': ['mean', 'std', 'min', 'max', 'p05', 'p25', 'p50', 'p75', 'p95']}
+
+
+def _parse(query, row):
+    if query not in FIELDS:
+        raise ValueError(f'Unknown query type {query!r}, expected one of {", ".join(FIELDS)}')
+
+    args = {}
+    for name, convert, default in FIELDS[query]:
+        value = row.get(name)
+        if value is None or value == '':
+            if default is None:
+                raise ValueError(f'Missing field {name!r}')
+            value = default
+        try:
+            args[name] = convert(value) if value != '' else None
+        except ValueError as e:
+            raise ValueError(f'Field {name!r}: {e}') from None
+    return args
+
+
+# Drop rates are given in percent, as shown in game, within the range the Drop Rate Guide accepts
+def drop(rate):
+    if not MIN_RATE <= rate <= MAX_RATE:
+        raise ValueError(f'rate must be a percentage from {MIN_RATE:g} to {MAX_RATE:g}')
+    stats = geometric.summary(rate / 100)
+    return {name: stats[name] for name in RESULTS['drop']}
+
+
+def multi_drop(rates, model = 'independent'):
+    return dict(_multi_drop(tuple(sorted(rates)), model))
+
+
+# Collector statistics only depend on the set of rates, and cost a millisecond or more each
+@lru_cache(maxsize = 4096)
+def _multi_drop(rates, model):
+    probs = [rate / 100 for rate in rates]
+    if not probs or not all(0 < p <= 1 for p in probs):
+        raise ValueError('rates must be one or more percentages above 0 and at most 100')
+
+    if model == 'one_drop':
+        return {'expected': one_drop_expected(probs), 'median': None, 'p75': None, 'p99': None}
+    if model != 'independent':
+        raise ValueError("model must be 'independent' or 'one_drop'")
+    median, p75, p99 = independent_ppf([0.5, 0.75, 0.99], probs).tolist()
+    return {'expected': independent_expected(probs), 'median': median, 'p75': p75, 'p99': p99}
+
+
+def reputation(rank, rep, quest_rep = None, item_boost = 0, rep_boost = False, server_boost = 1):
+    if not 1 <= rank <= MAX_RANK or not 0 <= rep < REP_RANK.get(rank, 1):
+        raise ValueError('rank must be 1 to 10 with rep below what the rank requires')
+    if quest_rep is not None and quest_rep <= 0:
+        raise ValueError('quest_rep must be positive')
+
+    result = progress(rank, rep, quest_rep, item_boost, rep_boost, server_boost)
+    out = {name: result.get(name) for name in RESULTS['reputation'][:5]}
+    for r in range(2, MAX_RANK + 1):
+        out[f'quests_to_rank_{r}'] = result['quests_to_rank'].get(r, 0) if quest_rep is not None else None
+    return out
+
+
+class _VoidAura:
+    def __init__(self, table_path):
+        self.table_path = table_path
+        self.table = None
+        self.loaded = False
+
+    # Repeated inputs are common in batches and an uncached exact computation takes milliseconds
+    @lru_cache(maxsize = 4096)
+    def __call__(self, current, quests_per_day, daily_bonus = 0, boost = False):
+        if not 0 <= current < 7500 or quests_per_day < 0 or daily_bonus < 0 or quests_per_day + daily_bonus == 0:
+            raise ValueError('current must be 0 to 7499 and some Void Auras must be earned per day')
+        if not self.loaded:
+            self.table = load_table(self.table_path) if self.table_path else None
+            self.loaded = True
+        return days_stats(current, quests_per_day, daily_bonus, boost, self.table)
+
+
+# Answers one query given as a dict of fields, returns the result fields
+def answer(query, row, void_aura):
+    args = _parse(query, row)
+    if query == 'void_aura':
+        return void_aura(**args)
+    return {'drop': drop, 'multi_drop': multi_drop, 'reputation': reputation}[query](**args)
+
+
+def run_jsonl(lines, out, default_query = None, table_path = DEFAULT_PATH, flush = False):
+    void_aura = _VoidAura(table_path)
+    for line in lines:
+        if not line.strip():
+            continue
+        result = {}
+        try:
+            row = json.loads(line)
+            if 'id' in row:
+                result['id'] = row['id']
+            result.update(answer(row.get('query', default_query), row, void_aura))
+        except (ValueError, TypeError, AttributeError) as e:
+            result['error'] = str(e)
+        out.write(json.dumps(result) + '\n')
+        if flush:
+            out.flush()
+
+
+def run_csv(lines, out, query, table_path = DEFAULT_PATH, flush = False):
+    if query not in RESULTS:
+        raise ValueError(f'CSV input needs --query, one of {", ".join(RESULTS)}')
+
+    void_aura = _VoidAura(table_path)
+    reader = csv.DictReader(lines)
+    writer = csv.DictWriter(out, fieldnames = list(reader.fieldnames or []) + RESULTS[query] + ['error'],
+                            extrasaction = 'ignore')
+    writer.writeheader()
+    for row in reader:
+        try:
+            row.update(answer(query, row, void_aura))
+        except (ValueError, TypeError) as e:
+            row['error'] = str(e)
+        writer.writerow(row)
+        if flush:
+            out.flush()
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = 'python -m aqw_stats', description = 'Answer AQWorlds statistics queries in bulk.')
+    parser.add_argument('input', nargs = '?', help = 'file of queries, standard input by default')
+    parser.add_argument('--output', help = 'file to write the results to, standard output by default')
+    parser.add_argument('--format', choices = ['jsonl', 'csv'], default = 'jsonl')
+    parser.add_argument('--query', choices = list(FIELDS), help = 'query type of every CSV row, or of JSON lines without one')
+    parser.add_argument('--table', default = DEFAULT_PATH, help = 'precomputed Void Aura table, used when it exists')
+    parser.add_argument('--flush', action = 'store_true', help = 'flush after every result, for use over a pipe')
+    args = parser.parse_args(argv)
+
+    infile = open(args.input, newline = '', encoding = 'utf-8') if args.input else sys.stdin
+    outfile = open(args.output, 'w', newline = '', encoding = 'utf-8') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            run_csv(infile, outfile, args.query, args.table, args.flush)
+        else:
+            run_jsonl(infile, outfile, args.query, args.table, args.flush)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        if args.input:
+            infile.close()
+        if args.output:
+            outfile.close()
@@ -0,0 +1,254 @@
+import argparse
+import bisect
+import csv
+import hashlib
+import os
+import re
+import time
+
+import numpy as np
+
+from aqw_stats import geometric
+
+
+# Catalog of item drop rates, with the statistics of each rate precomputed and indexes for searching by name.
+# The source of truth is a CSV file of name, drop rate (in %), source monster and map. It is built into a
+# single .npz file holding:
+#
+#     records     one row per item sorted by name (case-insensitive), with its rate and statistics
+#     strings     the item, monster and map names as UTF-8, with offsets, monsters and maps stored once each
+#     trigrams    sorted trigrams of the names, with the items containing each one (a postings list)
+#
+# Sorting the items by name makes the records a prefix index on their own, searched with bisect. The
+# trigram postings find names containing most of the query's trigrams, for typos and words in the middle.
+#
+#     python -m aqw_stats.catalog build          # data/items.csv -> data/items.npz
+#     python -m aqw_stats.catalog search "blade"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(ROOT, 'data', 'items.csv')
+DEFAULT_PATH = os.path.join(ROOT, 'data', 'items.npz')
+
+STAT_FIELDS = ['p25', 'median', 'p75', 'p99', 'p975', 'upper']
+RECORD_DTYPE = np.dtype([('rate', '<f8'), ('mean', '<f8'), ('std', '<f8')] +
+                        [(name, '<u4') for name in STAT_FIELDS] +
+                        [('monster', '<u4'), ('map', '<u4')])
+
+# Changed whenever the arrays or indexes in a build change
+FORMAT_VERSION = 2
+
+# Drop rates (in %) an item may have, the same range as the Drop Rate Guide's drop rate input
+MIN_RATE = 0.01
+MAX_RATE = 95.0
+
+# Share of the query's trigrams a name must contain to be a fuzzy match
+FUZZY_THRESHOLD = 0.5
+
+
+def _key(name):
+    return ' '.join(name.casefold().split())
+
+
+# Trigrams of a name the way pg_trgm takes them, from each word padded with two spaces in front and one
+# behind, so the first letters of every word weigh as much as the rest and a typo only costs the trigrams
+# of the word it is in
+def _trigrams(key):
+    grams = set()
+    for word in re.findall(r'\w+', key):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _pack(strings):
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype = np.int64)
+    np.cumsum([len(b) for b in encoded], out = offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype = np.uint8), offsets
+
+
+def _unpack(blob, offsets):
+    data = blob.tobytes()
+    return [data[start:stop].decode('utf-8') for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+# Hash of the source and of the catalog's layout, so a build made from another CSV or with older indexes is
+# rebuilt
+def _source_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f'{FORMAT_VERSION}\n'.encode() + f.read()).hexdigest()
+
+
+# Reads the CSV source as a list of (name, rate in %, monster, map)
+def read_source(path = SOURCE_PATH):
+    items = []
+    with open(path, newline = '', encoding = 'utf-8') as f:
+        for line, row in enumerate(csv.DictReader(f), start = 2):
+            name = ' '.join((row['name'] or '').split())
+            if not name:
+                raise ValueError(f'{path}:{line}: missing item name')
+            try:
+                rate = float(row['drop_rate'])
+            except (TypeError, ValueError):
+                raise ValueError(f'{path}:{line}: drop rate {row["drop_rate"]!r} is not a number') from None
+            if not MIN_RATE <= rate <= MAX_RATE:
+                raise ValueError(f'{path}:{line}: drop rate must be from {MIN_RATE:g}% to {MAX_RATE:g}%')
+            items.append((name, rate, (row.get('monster') or '').strip(), (row.get('map') or '').strip()))
+    return items
+
+
+# Builds the arrays of the catalog from (name, rate, monster, map) tuples
+def build_arrays(items, source_hash = ''):
+    items = sorted(items, key = lambda item: (_key(item[0]), item[1], item[2], item[3]))
+    monsters = sorted({item[2] for item in items} | {''})
+    maps = sorted({item[3] for item in items} | {''})
+    monster_ids = {name: i for i, name in enumerate(monsters)}
+    map_ids = {name: i for i, name in enumerate(maps)}
+
+    records = np.zeros(len(items), dtype = RECORD_DTYPE)
+    for i, (name, rate, monster, map_name) in enumerate(items):
+        stats = geometric.summary(rate / 100)
+        records[i] = (rate, stats['mean'], stats['std'], *[stats[field] for field in STAT_FIELDS],
+                      monster_ids[monster], map_ids[map_name])
+
+    postings = {}
+    trigram_counts = np.zeros(len(items), dtype = np.uint16)
+    for i, (name, *_) in enumerate(items):
+        grams = _trigrams(_key(name))
+        trigram_counts[i] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(i)
+
+    trigrams = sorted(postings)
+    starts = np.zeros(len(trigrams) + 1, dtype = np.int64)
+    np.cumsum([len(postings[gram]) for gram in trigrams], out = starts[1:])
+
+    arrays = {'records': records,
+              'trigrams': np.array(trigrams, dtype = '<U3'),
+              'trigram_starts': starts,
+              'trigram_items': np.array([i for gram in trigrams for i in postings[gram]], dtype = np.int32),
+              'trigram_counts': trigram_counts,
+              'source_hash': np.array(source_hash)}
+    for field, strings in [('names', [item[0] for item in items]), ('monsters', monsters), ('maps', maps)]:
+        arrays[field], arrays[field + '_offsets'] = _pack(strings)
+    return arrays
+
+
+def build_catalog(source = SOURCE_PATH, path = DEFAULT_PATH):
+    arrays = build_arrays(read_source(source), _source_hash(source))
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(path + '.tmp', path)
+    return Catalog(arrays)
+
+
+# Loads the built catalog, or builds it in memory when it is missing or older than the CSV source
+def load_catalog(path = DEFAULT_PATH, source = SOURCE_PATH):
+    source_hash = _source_hash(source)
+    if os.path.exists(path):
+        with np.load(path) as built:
+            if str(built['source_hash']) == source_hash:
+                return Catalog(dict(built))
+    return Catalog(build_arrays(read_source(source), source_hash))
+
+
+class Catalog:
+    def __init__(self, arrays):
+        self.records = arrays['records']
+        self.names = _unpack(arrays['names'], arrays['names_offsets'])
+        self.monsters = _unpack(arrays['monsters'], arrays['monsters_offsets'])
+        self.maps = _unpack(arrays['maps'], arrays['maps_offsets'])
+        self.keys = [_key(name) for name in self.names]
+
+        self._trigrams = arrays['trigrams']
+        self._starts = arrays['trigram_starts']
+        self._postings = arrays['trigram_items']
+        self._counts = arrays['trigram_counts']
+
+    def __len__(self):
+        return len(self.names)
+
+    # Name, rate (in %), source and the same statistics as geometric.summary for item i
+    def item(self, i):
+        record = self.records[i]
+        return {'name': self.names[i],
+                'rate': record['rate'].item(),
+                'monster': self.monsters[record['monster']],
+                'map': self.maps[record['map']],
+                'stats': {'mean': record['mean'].item(), 'std': record['std'].item(),
+                          **{field: record[field].item() for field in STAT_FIELDS}}}
+
+    # Items whose name is exactly name, ignoring case and spacing
+    def find(self, name):
+        key = _key(name)
+        start = bisect.bisect_left(self.keys, key)
+        return list(range(start, bisect.bisect_right(self.keys, key, start)))
+
+    # Items whose name starts with the query, in name order
+    def prefix(self, query, limit = 20):
+        key = _key(query)
+        start = bisect.bisect_left(self.keys, key)
+        stop = start
+        while stop < len(self.keys) and stop - start < limit and self.keys[stop].startswith(key):
+            stop += 1
+        return list(range(start, stop))
+
+    # Items whose names contain most of the query's trigrams, best matches first
+    def fuzzy(self, query, limit = 20, threshold = FUZZY_THRESHOLD):
+        grams = np.array(sorted(_trigrams(_key(query))), dtype = '<U3')
+        if not len(grams) or not len(self._trigrams):
+            return []
+        idx = np.minimum(np.searchsorted(self._trigrams, grams), len(self._trigrams) - 1)
+        idx = idx[self._trigrams[idx] == grams]
+        if not len(idx):
+            return []
+
+        hits = np.concatenate([self._postings[self._starts[i]:self._starts[i + 1]] for i in idx])
+        shared = np.bincount(hits, minlength = len(self.names))
+        candidates = np.flatnonzero(shared >= threshold * len(grams))
+
+        # Most of the query found first, then the names with the fewest other trigrams
+        coverage = shared[candidates] / len(grams)
+        similarity = shared[candidates] / (self._counts[candidates] + len(grams) - shared[candidates])
+        order = np.lexsort((-similarity, -coverage))[:limit]
+        return candidates[order].tolist()
+
+    # Prefix matches followed by fuzzy matches, each item once, or the first items for an empty query
+    def search(self, query, limit = 20):
+        if not query.strip():
+            return list(range(min(limit, len(self))))
+        found = self.prefix(query, limit)
+        seen = set(found)
+        for i in self.fuzzy(query, limit):
+            if len(found) >= limit:
+                break
+            if i not in seen:
+                found.append(i)
+                seen.add(i)
+        return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Build or search the item drop rate catalog.')
+    parser.add_argument('mode', choices = ['build', 'search'])
+    parser.add_argument('query', nargs = '?', default = '')
+    parser.add_argument('--source', default = SOURCE_PATH)
+    parser.add_argument('--path', default = DEFAULT_PATH)
+    parser.add_argument('--limit', type = int, default = 20)
+    args = parser.parse_args()
+
+    if args.mode == 'build':
+        start = time.perf_counter()
+        catalog = build_catalog(args.source, args.path)
+        print(f'Built {args.path} with {len(catalog):,} items in {time.perf_counter() - start:.2f}s')
+        return
+
+    catalog = load_catalog(args.path, args.source)
+    for i in catalog.search(args.query, args.limit):
+        item = catalog.item(i)
+        source = ', '.join(part for part in (item['monster'], item['map']) if part)
+        print(f"{item['name']:<40} {item['rate']:>7.2f}%  median {item['stats']['median']:>6}" + (f'  ({source})' if source else ''))
+
+
+if __name__ == '__main__':
+    main()
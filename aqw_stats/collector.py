@@ -0,0 +1,129 @@
+import math
+
+import numpy as np
+
+
+# "Collect them all" statistics for several items dropping from the same monster at different rates.
+# Every function takes the per-kill drop probabilities of the k items as an array, and none of them
+# enumerate subsets of items, so the cost grows linearly in k instead of as 2^k.
+
+# Probability of still missing an item below which the remaining tail is ignored
+TAIL_TOL = 1e-12
+
+# Number of kill counts evaluated at once, keeps memory bounded for very rare drops
+BLOCK_SIZE = 2 ** 14
+
+# Farming sessions simulated at once, keeps memory bounded for 10^6 sessions of many items
+SESSION_CHUNK = 2 ** 16
+
+# Gauss-Legendre nodes per panel and number of log-spaced panels for the Poisson integral
+GL_NODES = 16
+GL_PANELS = 256
+
+
+def _log_miss(probs):
+    probs = np.asarray(probs, dtype = float)
+    if probs.size == 0 or np.any((probs <= 0) | (probs > 1)):
+        raise ValueError('Drop probabilities must be in (0, 1]')
+    # Guaranteed drops get a large finite log so 0 kills still give a probability of zero
+    with np.errstate(divide = 'ignore'):
+        return np.maximum(np.log1p(-probs), -745.0)
+
+
+# Log of P(all items obtained by kill n) when every item drops independently on each kill
+def _log_independent_cdf(n, log_miss):
+    with np.errstate(divide = 'ignore'):
+        return np.log(-np.expm1(np.multiply.outer(n, log_miss))).sum(axis = -1)
+
+
+# Kill count after which every item is obtained except with probability TAIL_TOL
+def independent_upper(probs):
+    log_miss = _log_miss(probs)
+    return max(int(math.ceil(math.log(TAIL_TOL / len(log_miss)) / log_miss.max())), 1)
+
+
+# P(all items obtained by kill n), independent drops: the product of the single-item CDFs
+def independent_cdf(n, probs):
+    log_miss = _log_miss(probs)
+    n = np.asarray(n, dtype = float)
+    out = np.empty(n.shape)
+    flat_n, flat_out = n.reshape(-1), out.reshape(-1)
+    for start in range(0, flat_n.size, BLOCK_SIZE):
+        block = flat_n[start:start + BLOCK_SIZE]
+        flat_out[start:start + BLOCK_SIZE] = np.where(block >= 1, np.exp(_log_independent_cdf(np.floor(block), log_miss)), 0.0)
+    return out[()]
+
+
+# Expected kills to obtain every item with independent drops, E[N] = sum over n >= 0 of P(N > n)
+def independent_expected(probs):
+    log_miss = _log_miss(probs)
+    upper = independent_upper(probs)
+
+    total = 0.0
+    for start in range(0, upper + 1, BLOCK_SIZE):
+        n = np.arange(start, min(start + BLOCK_SIZE, upper + 1), dtype = float)
+        total += -np.expm1(_log_independent_cdf(n, log_miss)).sum()
+    return total
+
+
+# Smallest kill count by which every item is obtained with probability of at least q, independent drops.
+# q may be an array, all quantiles then share one binary search.
+def independent_ppf(q, probs):
+    log_miss = _log_miss(probs)
+    q = np.asarray(q, dtype = float)
+    lo = np.ones(q.shape, dtype = np.int64)
+    hi = np.full(q.shape, independent_upper(probs), dtype = np.int64)
+    while np.any(lo < hi):
+        mid = (lo + hi) // 2
+        reached = np.exp(_log_independent_cdf(mid.astype(float), log_miss)) >= q
+        hi = np.where(reached, mid, hi)
+        lo = np.where(reached, lo, mid + 1)
+    return int(lo) if lo.ndim == 0 else lo
+
+
+# Expected kills to obtain every item when a kill drops at most one item (so the rates sum to at most 1).
+# Embedding the kills in a rate-1 Poisson process makes the items arrive independently at rates p_i, so
+# E[N] = integral from 0 to infinity of 1 - prod(1 - exp(-p_i t)) dt, evaluated by Gauss-Legendre quadrature.
+def one_drop_expected(probs):
+    probs = np.asarray(probs, dtype = float)
+    _log_miss(probs)
+    if probs.sum() > 1 + 1e-9:
+        raise ValueError('Drop rates must sum to at most 100% when only one item can drop per kill')
+
+    # The integrand is 1 up to about 1/p_max and has decayed below TAIL_TOL by t_max
+    t0 = 1e-6 / probs.max()
+    t_max = math.log(len(probs) / TAIL_TOL) / probs.min()
+    edges = np.geomspace(t0, t_max, GL_PANELS + 1)
+
+    nodes, weights = np.polynomial.legendre.leggauss(GL_NODES)
+    half = (edges[1:] - edges[:-1])[:, None] / 2
+    t = ((edges[1:] + edges[:-1])[:, None] / 2 + half * nodes).reshape(-1)
+    w = (half * weights).reshape(-1)
+
+    with np.errstate(divide = 'ignore'):
+        log_all = np.log(-np.expm1(-np.multiply.outer(t, probs))).sum(axis = -1)
+    return t0 + float(np.dot(w, -np.expm1(log_all)))
+
+
+# Simulated farming sessions with independent drops, each ending once every item has dropped. The kill on
+# which each item first drops is drawn directly from its geometric distribution, so the cost does not depend
+# on how rare the items are. Kill times follow a gamma distribution with mean seconds_per_kill and standard
+# deviation kill_time_sd (fixed when 0), so the time of n kills is drawn from a single gamma as well.
+# Returns (kills, seconds) with one entry per session.
+def simulate_sessions(probs, n_sessions, seconds_per_kill, kill_time_sd = 0, seed = None):
+    probs = np.asarray(probs, dtype = float)
+    _log_miss(probs)
+    rng = np.random.default_rng(seed)
+
+    kills = np.empty(n_sessions, dtype = np.int64)
+    for start in range(0, n_sessions, SESSION_CHUNK):
+        stop = min(start + SESSION_CHUNK, n_sessions)
+        kills[start:stop] = rng.geometric(probs, size = (stop - start, len(probs))).max(axis = 1)
+
+    if kill_time_sd > 0:
+        # Sum of n gamma kill times with shape k and scale theta is gamma with shape n * k
+        theta = kill_time_sd ** 2 / seconds_per_kill
+        seconds = rng.gamma(kills * (seconds_per_kill / theta), theta)
+    else:
+        seconds = kills * float(seconds_per_kill)
+    return kills, seconds
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# Probability mass below which the remaining tail is treated as zero
+TAIL_TOL = 1e-15
+
+# Probability below which a number of days is left out of the reported range of possible days
+SUPPORT_TOL = 1e-12
+
+
+# Smallest power of two that holds at least n points, so the FFTs stay fast
+def _fft_size(n):
+    return 1 << max(int(n) - 1, 0).bit_length()
+
+
+# Removes the negative round-off noise left behind by the FFT and renormalises
+def _clean(pmf):
+    pmf = np.clip(pmf, 0, None)
+    return pmf / pmf.sum()
+
+
+# Returns the pmf of the total reward from n independent draws of a reward table, indexed by the total
+def sum_pmf(rewards, probs, n):
+    rewards = np.asarray(rewards, dtype = int)
+    single = np.zeros(rewards.max() + 1)
+    np.add.at(single, rewards, probs)
+
+    if n == 0:
+        return np.ones(1)
+
+    size = n * rewards.max() + 1
+    nfft = _fft_size(size)
+    return _clean(np.fft.irfft(np.fft.rfft(single, nfft) ** n, nfft)[:size])
+
+
+# Returns the pmf of the total reward earned in a single day, indexed by the total
+def daily_pmf(rewards, probs, quests_per_day, daily_bonus = 0):
+    return np.concatenate([np.zeros(daily_bonus), sum_pmf(rewards, probs, quests_per_day)])
+
+
+# Yields, for each day d = 1, 2, ..., the pmf of the total earned after d days restricted to totals below target
+def totals_below(target, day_pmf):
+    nfft = _fft_size(target + len(day_pmf) - 1)
+    kernel = np.fft.rfft(day_pmf, nfft)
+
+    state = np.zeros(target)
+    state[0] = 1.0
+    while True:
+        state = np.fft.irfft(np.fft.rfft(state, nfft) * kernel, nfft)[:target]
+        np.clip(state, 0, None, out = state)
+        yield state
+
+
+@dataclass(frozen = True)
+class DaysDistribution:
+    days: np.ndarray
+    pmf: np.ndarray
+
+    @property
+    def cdf(self):
+        return np.cumsum(self.pmf)
+
+    def mean(self):
+        return float(np.dot(self.days, self.pmf))
+
+    def std(self):
+        return float(np.sqrt(max(np.dot(self.days ** 2, self.pmf) - self.mean() ** 2, 0)))
+
+    # Smallest number of days by which the target is reached with probability of at least q
+    def percentile(self, q):
+        idx = np.searchsorted(self.cdf, q - 1e-12)
+        return int(self.days[min(idx, len(self.days) - 1)])
+
+    def median(self):
+        return self.percentile(0.5)
+
+    def min(self):
+        return int(self.days[np.argmax(self.cdf > SUPPORT_TOL)])
+
+    def max(self):
+        return int(self.days[np.argmax(self.cdf >= 1 - SUPPORT_TOL)])
+
+
+# Exact distribution of the number of days needed to earn at least target from a reward table
+def days_to_target(target, rewards, probs, quests_per_day, daily_bonus = 0):
+    if target <= 0:
+        return DaysDistribution(np.zeros(1, dtype = int), np.ones(1))
+
+    min_daily = quests_per_day * min(rewards) + daily_bonus
+    if min_daily <= 0:
+        raise ValueError('At least one reward must be earned every day to reach the target')
+
+    # Every path has reached the target by this day, whatever the draws
+    last_day = -(-target // min_daily)
+
+    survival = [1.0]
+    for day, state in enumerate(totals_below(target, daily_pmf(rewards, probs, quests_per_day, daily_bonus)), start = 1):
+        if day == last_day:
+            survival.append(0.0)
+            break
+        survival.append(min(state.sum(), survival[-1]))
+        if survival[-1] < TAIL_TOL:
+            survival[-1] = 0.0
+            break
+
+    survival = np.array(survival)
+    return DaysDistribution(np.arange(1, len(survival)), survival[:-1] - survival[1:])
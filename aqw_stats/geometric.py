@@ -0,0 +1,62 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+# Closed-form geometric distribution X ~ Geo(p) on {1, 2, ...}, computed in log-space so tiny
+# drop rates and large try numbers don't lose precision. Same conventions as scipy.stats.geom.
+
+
+# P(X = x) = (1 - p)^(x - 1) * p
+def pmf(x, p):
+    x = np.asarray(x, dtype = float)
+    k = np.floor(x)
+    out = np.where((x == k) & (k >= 1), np.exp((k - 1) * math.log1p(-p) + math.log(p)), 0.0)
+    return out[()]
+
+
+# P(X <= x) = 1 - (1 - p)^x
+def cdf(x, p):
+    k = np.floor(np.asarray(x, dtype = float))
+    out = np.where(k >= 1, -np.expm1(k * math.log1p(-p)), 0.0)
+    return out[()]
+
+
+# P(X > x) = (1 - p)^x
+def sf(x, p):
+    k = np.floor(np.asarray(x, dtype = float))
+    out = np.where(k >= 1, np.exp(k * math.log1p(-p)), 1.0)
+    return out[()]
+
+
+# Smallest x with P(X <= x) >= q
+def ppf(q, p):
+    q = np.asarray(q, dtype = float)
+    vals = np.ceil(np.log1p(-q) / math.log1p(-p))
+    # Step back where floating point pushed the ceiling one try too far
+    vals = np.where((vals > 1) & (cdf(vals - 1, p) >= q), vals - 1, vals)
+    return np.maximum(vals, 1)[()]
+
+
+# Summary statistics shown for a drop rate, computed once per p
+@lru_cache(maxsize = 256)
+def summary(p):
+    return {'mean': 1 / p,
+            'std': math.sqrt(1 - p) / p,
+            'p25': int(ppf(0.25, p)),
+            'median': int(ppf(0.5, p)),
+            'p75': int(ppf(0.75, p)),
+            'p99': int(ppf(0.99, p)),
+            'p975': int(ppf(0.975, p)),
+            'upper': int(ppf(0.999, p))}
+
+
+# Try numbers 1 to the 99.9th percentile with their pmf and cdf, computed once per p
+@lru_cache(maxsize = 64)
+def curve(p):
+    x = np.arange(1, summary(p)['upper'])
+    arrays = (x, pmf(x, p), cdf(x, p))
+    for a in arrays:
+        a.setflags(write = False)
+    return arrays
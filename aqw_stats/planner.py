@@ -0,0 +1,111 @@
+import numpy as np
+
+from aqw_stats.reputation import MAX_RANK, MAX_REP, RANK_START, total_rep
+
+
+# Minimum-time reputation farming plan over a catalog of quests. Each quest takes some minutes and credits
+# base rep to one or more factions (e.g. a shared kill map), every faction needs a certain amount of rep:
+#
+#     minimise  sum_q minutes_q * x_q   subject to   sum_q rep_fq * multiplier * x_q >= need_f,   x_q >= 0 integer
+#
+# The LP relaxation is solved with HiGHS, rounded up (always feasible as rep is never negative) and the
+# rounding trimmed. If that plan is noticeably slower than the LP bound and scipy has a MILP solver, the
+# integer program is solved too within a time limit, and the faster of the two plans is kept.
+
+# Seconds the MILP solver may spend before returning its best plan so far
+TIME_LIMIT = 0.3
+
+# Relative gap to the LP bound below which the rounded plan is accepted as is
+GAP_TOL = 1e-3
+
+
+# Rep needed in a faction to reach target_rank from the current rank and rep
+def rep_needed(rank, rep, target_rank):
+    if not (1 <= rank <= MAX_RANK and 1 <= target_rank <= MAX_RANK):
+        raise ValueError(f'Ranks must be from 1 to {MAX_RANK}, got rank {rank} and target rank {target_rank}')
+    return max(int(RANK_START[target_rank - 1]) - int(total_rep(rank, rep)), 0)
+
+
+def _solve_milp(minutes, gains, needs):
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    result = milp(minutes, constraints = LinearConstraint(gains, lb = needs, ub = np.inf),
+                  integrality = np.ones(len(minutes)), bounds = Bounds(0, np.inf),
+                  options = {'time_limit': TIME_LIMIT})
+    if result.x is None:
+        return None
+    return np.round(result.x).astype(int)
+
+
+def _solve_rounded_lp(minutes, gains, needs):
+    from scipy.optimize import linprog
+
+    result = linprog(minutes, A_ub = -gains, b_ub = -needs, bounds = (0, None), method = 'highs')
+    if result.status != 0:
+        return None, None
+    counts = np.ceil(result.x - 1e-9).astype(int)
+
+    # Take back completions of the slowest quests first while every faction still gets enough rep
+    for q in np.argsort(-minutes):
+        while counts[q] > 0 and np.all(gains @ counts - gains[:, q] >= needs - 1e-9):
+            counts[q] -= 1
+    return counts, result.fun
+
+
+# Plans how many times to complete each quest. quest_minutes has one entry per quest, quest_rep is a
+# (factions x quests) array of base rep, needs the rep still needed per faction and multiplier the boost
+# from boosted_quest_rep(1, ...). Returns the completions per quest, or raises ValueError if impossible.
+def plan(quest_minutes, quest_rep, needs, multiplier = 1):
+    minutes = np.asarray(quest_minutes, dtype = float)
+    gains = np.atleast_2d(np.asarray(quest_rep, dtype = float)) * multiplier
+    needs = np.minimum(np.asarray(needs, dtype = float), MAX_REP)
+
+    if gains.shape != (len(needs), len(minutes)):
+        raise ValueError('quest_rep must have one row per faction and one column per quest')
+    if not (np.all(np.isfinite(minutes)) and np.all(np.isfinite(gains)) and np.all(np.isfinite(needs))):
+        raise ValueError('Quest times, quest rep and the rep needed must all be numbers')
+    if np.any(minutes <= 0) or np.any(gains < 0):
+        raise ValueError('Quest times must be positive and quest rep cannot be negative')
+
+    stuck = (needs > 0) & (gains.max(axis = 1, initial = 0) <= 0)
+    if stuck.any():
+        raise ValueError(f'No quest gives rep for faction(s) {", ".join(str(f) for f in np.flatnonzero(stuck))}')
+
+    if not np.any(needs > 0):
+        return np.zeros(len(minutes), dtype = int)
+
+    counts, bound = _solve_rounded_lp(minutes, gains, needs)
+    if counts is None:
+        raise ValueError('No farming plan reaches every target rank')
+
+    if minutes @ counts > bound * (1 + GAP_TOL):
+        try:
+            exact = _solve_milp(minutes, gains, needs)
+        except ImportError:
+            exact = None
+        if exact is not None and np.all(gains @ exact >= needs - 1e-9) and minutes @ exact < minutes @ counts:
+            counts = exact
+    return counts
+
+
+# Farming plan for a catalog DataFrame with 'quest' and 'minutes' columns plus one column of base rep per
+# faction, and targets mapping each faction to (rank, rep, target_rank). Returns (plan table, total minutes).
+def plan_catalog(catalog, targets, multiplier = 1):
+    factions = list(targets)
+    missing = [col for col in ['quest', 'minutes'] + factions if col not in catalog.columns]
+    if missing:
+        raise ValueError(f'Missing column(s) in the quest catalog: {", ".join(missing)}')
+
+    needs = [rep_needed(*targets[f]) for f in factions]
+    quest_rep = catalog[factions].fillna(0).to_numpy(dtype = float).T
+
+    stuck = [f for f, need, row in zip(factions, needs, quest_rep) if need > 0 and not np.any(row > 0)]
+    if stuck:
+        raise ValueError(f'No quest in the catalog gives rep for {", ".join(stuck)}')
+    counts = plan(catalog['minutes'].to_numpy(), quest_rep, needs, multiplier)
+
+    table = catalog[['quest', 'minutes']].copy()
+    table['completions'] = counts
+    table['total_minutes'] = counts * table['minutes']
+    table = table[table['completions'] > 0].reset_index(drop = True)
+    return table, float(table['total_minutes'].sum())
@@ -0,0 +1,143 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+from aqw_stats.reputation import MAX_REP
+
+
+# Opt-in log of (player, faction, total rep) samples in a local SQLite file. Per-faction aggregates are
+# updated on every insert, so forecasts never rescan the samples, and charts read a bounded number of
+# points through the (player, faction, ts) index however long the log gets. Player names are not
+# authenticated, so the app only offers the log where the deployment allows it with AQW_TRACKER_ALLOWED=1,
+# and each player can log at most AQW_TRACKER_MAX_SAMPLES samples across their factions.
+DEFAULT_PATH = os.environ.get('AQW_PROGRESS_DB', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'progress.sqlite3'))
+
+# Half-life in days of the exponentially weighted rep/day rate, older intervals count half as much per half-life
+RATE_HALF_LIFE = 7.0
+
+SECONDS_PER_DAY = 86400
+
+MAX_SAMPLES_PER_PLAYER = int(os.environ.get('AQW_TRACKER_MAX_SAMPLES', 1000))
+
+
+# Whether the deployment offers the progress log to its visitors
+def tracker_allowed():
+    return os.environ.get('AQW_TRACKER_ALLOWED') == '1'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS samples (
+    player TEXT NOT NULL,
+    faction TEXT NOT NULL,
+    ts REAL NOT NULL,
+    total_rep INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_player_faction_ts ON samples (player, faction, ts);
+CREATE TABLE IF NOT EXISTS faction_stats (
+    player TEXT NOT NULL,
+    faction TEXT NOT NULL,
+    n_samples INTEGER NOT NULL,
+    first_ts REAL NOT NULL,
+    first_rep INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    last_rep INTEGER NOT NULL,
+    rate REAL,
+    PRIMARY KEY (player, faction)
+) WITHOUT ROWID;
+'''
+
+
+class ProgressLog:
+    def __init__(self, path = DEFAULT_PATH, max_samples = MAX_SAMPLES_PER_PLAYER):
+        self.max_samples = max_samples
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+        self._conn = sqlite3.connect(path, check_same_thread = False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode = WAL')
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # Records a sample and folds it into the faction's aggregates in the same transaction. Raises ValueError
+    # once the player has logged max_samples samples.
+    def add(self, player, faction, total_rep, ts = None):
+        ts = time.time() if ts is None else ts
+        with self._lock, self._conn:
+            logged, = self._conn.execute('SELECT COALESCE(SUM(n_samples), 0) FROM faction_stats WHERE player = ?', (player,)).fetchone()
+            if logged >= self.max_samples:
+                raise ValueError(f'{player} has already logged the maximum of {self.max_samples:,} samples')
+
+            self._conn.execute('INSERT INTO samples VALUES (?, ?, ?, ?)', (player, faction, ts, total_rep))
+            row = self._conn.execute('SELECT n_samples, first_ts, first_rep, last_ts, last_rep, rate FROM faction_stats '
+                                     'WHERE player = ? AND faction = ?', (player, faction)).fetchone()
+
+            if row is None:
+                self._conn.execute('INSERT INTO faction_stats VALUES (?, ?, 1, ?, ?, ?, ?, NULL)',
+                                   (player, faction, ts, total_rep, ts, total_rep))
+                return
+
+            n_samples, first_ts, first_rep, last_ts, last_rep, rate = row
+            if ts <= last_ts:
+                # Samples older than the latest one are kept for the chart but don't change the rate
+                if ts < first_ts:
+                    first_ts, first_rep = ts, total_rep
+                last_ts_new, last_rep_new = last_ts, last_rep
+            else:
+                days = (ts - last_ts) / SECONDS_PER_DAY
+                interval_rate = (total_rep - last_rep) / days
+                weight = 1 - 0.5 ** (days / RATE_HALF_LIFE)
+                rate = interval_rate if rate is None else weight * interval_rate + (1 - weight) * rate
+                last_ts_new, last_rep_new = ts, total_rep
+
+            self._conn.execute('UPDATE faction_stats SET n_samples = ?, first_ts = ?, first_rep = ?, last_ts = ?, last_rep = ?, rate = ? '
+                               'WHERE player = ? AND faction = ?',
+                               (n_samples + 1, first_ts, first_rep, last_ts_new, last_rep_new, rate, player, faction))
+
+    # Aggregates of one player's faction, or None if nothing was logged
+    def stats(self, player, faction):
+        with self._lock:
+            row = self._conn.execute('SELECT n_samples, first_ts, first_rep, last_ts, last_rep, rate FROM faction_stats '
+                                     'WHERE player = ? AND faction = ?', (player, faction)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(['n_samples', 'first_ts', 'first_rep', 'last_ts', 'last_rep', 'rate'], row))
+
+    def factions(self, player):
+        with self._lock:
+            return [f for f, in self._conn.execute('SELECT faction FROM faction_stats WHERE player = ? ORDER BY faction', (player,))]
+
+    # Estimated date of reaching Rank 10 from the recent rep/day rate, or None without a positive rate
+    def forecast(self, player, faction):
+        stats = self.stats(player, faction)
+        if stats is None:
+            return None
+
+        rep_left = max(MAX_REP - stats['last_rep'], 0)
+        if rep_left == 0:
+            return {'rep_left': 0, 'rate': stats['rate'], 'days_left': 0.0,
+                    'date': datetime.date.fromtimestamp(stats['last_ts'])}
+        if not stats['rate'] or stats['rate'] <= 0:
+            return None
+
+        days_left = rep_left / stats['rate']
+        return {'rep_left': rep_left, 'rate': stats['rate'], 'days_left': days_left,
+                'date': datetime.date.fromtimestamp(stats['last_ts'] + days_left * SECONDS_PER_DAY)}
+
+    # Up to max_points (ts, total_rep) pairs for a chart, the latest sample of each equal-width time bucket
+    def history(self, player, faction, since = None, max_points = 500):
+        stats = self.stats(player, faction)
+        if stats is None:
+            return []
+
+        start = stats['first_ts'] if since is None else max(since, stats['first_ts'])
+        width = max((stats['last_ts'] - start) / max_points, 1e-9)
+        with self._lock:
+            # SQLite returns total_rep from the row holding MAX(ts) in each bucket
+            rows = self._conn.execute('SELECT MAX(ts), total_rep FROM samples WHERE player = ? AND faction = ? AND ts >= ? '
+                                      'GROUP BY CAST((ts - ?) / ? AS INTEGER) ORDER BY 1',
+                                      (player, faction, start, start, width)).fetchall()
+        return rows
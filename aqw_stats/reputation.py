@@ -0,0 +1,125 @@
+import numpy as np
+
+
+# Reputation required to reach the next rank from each rank, rank 10 being the maximum
+REP_RANK = {1: 900,
+            2: 2700,
+            3: 6400,
+            4: 12500,
+            5: 21600,
+            6: 34300,
+            7: 51200,
+            8: 72900,
+            9: 100000}
+
+MAX_RANK = 10
+
+# Total rep earned at the start of each rank, RANK_START[r - 1] being the total needed to reach rank r
+RANK_START = np.concatenate([[0], np.cumsum(list(REP_RANK.values()))])
+MAX_REP = int(RANK_START[-1])
+
+# Columns accepted by batch_progress, with defaults for the optional ones
+BATCH_REQUIRED = ['player', 'faction', 'rank', 'rep', 'quest_rep']
+BATCH_DEFAULTS = {'item_boost': 0, 'rep_boost': False, 'server_boost': 1}
+
+
+# Total rep earned from the current rank and the rep within that rank
+def total_rep(rank, rep):
+    return RANK_START[np.asarray(rank) - 1] + rep
+
+
+# Rank reached with a total amount of rep
+def rank_of(total):
+    return np.searchsorted(RANK_START, total, side = 'right')
+
+
+# Rep given by one quest completion after item boosts (in %), a rep boost and a server boost multiplier
+def boosted_quest_rep(quest_rep, item_boost = 0, rep_boost = False, server_boost = 1):
+    return quest_rep * (1 + np.asarray(item_boost) / 100) * (1 + np.asarray(rep_boost, dtype = int)) * server_boost
+
+
+# Rep still required to reach each of ranks 2 to 10, one column per rank and zero once reached
+def rep_to_ranks(total):
+    return np.maximum(RANK_START[1:] - np.asarray(total)[..., None], 0)
+
+
+# Number of quest completions needed to reach each of ranks 2 to 10
+def quests_to_ranks(total, quest_rep):
+    return np.ceil(rep_to_ranks(total) / np.asarray(quest_rep)[..., None]).astype(int)
+
+
+# Progress of one faction from the current rank and rep, with the quests needed to each rank still ahead when
+# the rep of the quest being repeated is given. Plain Python values, for the pages and the batch CLI.
+def progress(rank, rep, quest_rep = None, item_boost = 0, rep_boost = False, server_boost = 1):
+    total = int(total_rep(rank, rep))
+    result = {'rank': int(rank),
+              'rep': int(rep),
+              'total_rep': total,
+              'progress_pct': total / MAX_REP * 100,
+              'rep_left': MAX_REP - total,
+              'rep_to_rank': {r: int(need) for r, need in zip(range(2, MAX_RANK + 1), rep_to_ranks(total)) if need > 0}}
+
+    if quest_rep is not None:
+        boosted = float(boosted_quest_rep(quest_rep, item_boost, rep_boost, server_boost))
+        result['boosted_quest_rep'] = boosted
+        result['quests_to_rank'] = {r: int(n) for r, n in zip(range(2, MAX_RANK + 1), quests_to_ranks(total, boosted))
+                                    if r in result['rep_to_rank']}
+        result['quests_left'] = result['quests_to_rank'].get(MAX_RANK, 0)
+    return result
+
+
+def _as_bool(values):
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        return np.nan_to_num(values.astype(float)) != 0
+    return np.isin(np.char.lower(values.astype(str)), ['yes', 'true', '1', 'y'])
+
+
+# Progress of many (player, faction) rows at once. Takes a DataFrame with the columns in BATCH_REQUIRED
+# and optionally those in BATCH_DEFAULTS, and returns it with progress, rep left and quests to each rank.
+# Rows with blank, non-numeric or out of range values are rejected with one ValueError naming them.
+def batch_progress(df):
+    # Only the batch upload needs pandas, so it is kept out of the pages' startup
+    import pandas as pd
+
+    missing = [col for col in BATCH_REQUIRED if col not in df.columns]
+    if missing:
+        raise ValueError(f'Missing column(s): {", ".join(missing)}')
+
+    def numeric(col):
+        if col not in df.columns:
+            return np.full(len(df), float(BATCH_DEFAULTS[col]))
+        return pd.to_numeric(df[col], errors = 'coerce').to_numpy(dtype = float)
+
+    rank, rep, quest_rep = numeric('rank'), numeric('rep'), numeric('quest_rep')
+    item_boost, server_boost = numeric('item_boost'), numeric('server_boost')
+    rep_boost = _as_bool(df['rep_boost'].to_numpy()) if 'rep_boost' in df.columns else False
+
+    # Ranks are whole numbers from 1 to 10. Rank 10 is only valid with 0 rep, otherwise the rep must be below
+    # what the rank requires. Comparisons with NaN are false, so blank and non-numeric cells fail too.
+    rank_limit = np.append(list(REP_RANK.values()), 1)
+    valid = np.isin(rank, np.arange(1, MAX_RANK + 1))
+    rank = np.where(valid, rank, 1).astype(int)
+    valid &= (rep >= 0) & (rep < rank_limit[rank - 1]) & (rep == np.round(rep))
+    valid &= (quest_rep > 0) & np.isfinite(quest_rep) & (server_boost >= 1) & np.isfinite(server_boost)
+    with np.errstate(invalid = 'ignore'):
+        boosted = boosted_quest_rep(quest_rep, item_boost, rep_boost, server_boost)
+    valid &= np.isfinite(boosted) & (boosted > 0)
+    if not valid.all():
+        bad_rows = np.flatnonzero(~valid)
+        shown = ', '.join(str(i + 1) for i in bad_rows[:10]) + (', ...' if len(bad_rows) > 10 else '')
+        raise ValueError(f'Invalid values on {len(bad_rows)} row(s): {shown}. Each row needs a whole rank from 1 to '
+                         f'{MAX_RANK}, whole rep from 0 up to what the rank requires, a quest_rep above 0 and a '
+                         f'server_boost of at least 1.')
+
+    total = total_rep(rank, rep.astype(int))
+    quests = quests_to_ranks(total, boosted)
+
+    out = df[['player', 'faction', 'rank', 'rep']].copy()
+    out['total_rep'] = total
+    out['progress_pct'] = total / MAX_REP * 100
+    out['rep_left'] = MAX_REP - total
+    out['boosted_quest_rep'] = boosted
+    for i, r in enumerate(range(2, MAX_RANK + 1)):
+        out[f'quests_to_rank_{r}'] = quests[:, i]
+    return out
@@ -0,0 +1,211 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from aqw_stats.compound import DaysDistribution, _clean, _fft_size, days_to_target, sum_pmf
+
+
+# Void Auras given by one quest turn-in, each reward being equally likely
+AURA_REWARDS = {False: np.array([5, 6, 7]),
+                True: np.array([5, 10, 20])}
+
+# Number of sample paths drawn at once, keeps memory bounded for 10^6 samples
+CHUNK_SIZE = 2 ** 16
+
+
+# Returns the mean number of Void Auras over n quest turn-ins for each of n_samples independent paths
+def sample_mean_aura(n, n_samples, boost_status, seed = None):
+    rng = np.random.default_rng(seed)
+    rewards = AURA_REWARDS[boost_status]
+
+    means = np.empty(n_samples)
+    for start in range(0, n_samples, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n_samples)
+        draws = rng.integers(0, len(rewards), size = (stop - start, n), dtype = np.uint8)
+        means[start:stop] = rewards[draws].sum(axis = 1) / n
+
+    return means
+
+
+# Days to farm amt_farm Void Auras for each of n_samples paths, assuming every quest gives the mean of 10
+# simulated turn-ins (the original Monte Carlo estimate of the Void Aura page)
+def sample_days(amt_farm, quests_per_day, daily_bonus, boost_status, n_samples, seed = None):
+    return amt_farm / (quests_per_day * sample_mean_aura(10, n_samples, boost_status, seed = seed) + daily_bonus)
+
+
+# Ways of drawing the 10 turn-ins behind each sample of sample_days, as uniforms mapped onto the reward table:
+#
+#     random        independent uniforms, the plain Monte Carlo estimate
+#     antithetic    every draw u is paired with 1 - u, so a high reward in one path is a low one in its twin
+#     stratified    Latin hypercube, each turn-in of a chunk covering every reward equally often
+#     sobol         scrambled Sobol points (randomised quasi-Monte Carlo), balanced over all 10 turn-ins at once
+SAMPLING_METHODS = ('random', 'antithetic', 'stratified', 'sobol')
+
+
+# Returns a function giving uniforms of shape (size, n) for a sampling method, sizes being powers of 2
+def _uniform_source(method, n, rng):
+    if method == 'random':
+        return lambda size: rng.random((size, n))
+    if method == 'antithetic':
+        def antithetic(size):
+            u = rng.random((size // 2, n))
+            return np.concatenate([u, 1 - u])
+        return antithetic
+    if method == 'stratified':
+        return lambda size: (rng.random((size, n)).argsort(axis = 0) + rng.random((size, n))) / size
+    if method == 'sobol':
+        # Only imported when quasi-Monte Carlo is asked for
+        from scipy.stats import qmc
+        return qmc.Sobol(n, scramble = True, seed = rng).random
+    raise ValueError(f'Unknown sampling method {method!r}, expected one of {", ".join(SAMPLING_METHODS)}')
+
+
+# Median of sample_days, drawn in doubling rounds until the distribution-free confidence interval of the median
+# (between the order statistics n/2 -+ z * sqrt(n) / 2) is at most tol days wide or max_samples is reached.
+# The interval treats the draws as independent, which makes it conservative for the variance-reduced methods.
+# The sample counts are rounded up to powers of 2, as the Sobol and antithetic draws need them.
+# Returns the median, interval, number of samples and whether it converged, with the samples themselves.
+def median_days(amt_farm, quests_per_day, daily_bonus, boost_status, tol = 1, confidence = 0.95, method = 'sobol',
+                min_samples = 2 ** 10, max_samples = 2 ** 20, seed = None):
+    rewards = AURA_REWARDS[boost_status]
+    min_samples, max_samples = _fft_size(min_samples), _fft_size(max_samples)
+    uniforms = _uniform_source(method, 10, np.random.default_rng(seed))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    chunks, n_samples, size = [], 0, min_samples
+    while True:
+        for start in range(0, size, CHUNK_SIZE):
+            u = uniforms(min(CHUNK_SIZE, size - start))
+            draws = np.minimum((u * len(rewards)).astype(np.int64), len(rewards) - 1)
+            chunks.append(amt_farm / (quests_per_day * rewards[draws].mean(axis = 1) + daily_bonus))
+        n_samples += size
+
+        days = np.concatenate(chunks)
+        chunks = [days]
+        half_width = z * math.sqrt(n_samples) / 2
+        lo = max(int(math.floor(n_samples / 2 - half_width)), 0)
+        hi = min(int(math.ceil(n_samples / 2 + half_width)), n_samples - 1)
+        mid = (n_samples - 1) // 2
+        ordered = np.partition(days, [lo, mid, hi])
+        converged = ordered[hi] - ordered[lo] <= tol
+        if converged or n_samples >= max_samples:
+            break
+        # Doubling keeps the sample count a power of 2, which the Sobol points need to stay balanced
+        size = min(n_samples, max_samples - n_samples)
+
+    return {'median': float(np.median(days)), 'ci_low': float(ordered[lo]), 'ci_high': float(ordered[hi]),
+            'n_samples': n_samples, 'converged': bool(converged), 'method': method, 'samples': days}
+
+
+# Exact distribution of the days needed to farm amt_farm Void Auras, see aqw_stats.compound
+def exact_days(amt_farm, quests_per_day, daily_bonus, boost_status):
+    rewards = AURA_REWARDS[boost_status]
+    probs = np.full(len(rewards), 1 / len(rewards))
+    return days_to_target(amt_farm, rewards, probs, quests_per_day, daily_bonus)
+
+
+# Per-day settings of a farm. quests_per_day, aura_boost (the Void Aura boost reward table) and multiplier
+# (e.g. 2 on server boost days) may each be a scalar or one value per day; the calendar repeats once it ends.
+def boost_calendar(quests_per_day, aura_boost = False, multiplier = 1):
+    quests, boost, mult = np.broadcast_arrays(np.asarray(quests_per_day, dtype = np.int64),
+                                              np.asarray(aura_boost, dtype = bool),
+                                              np.asarray(multiplier, dtype = np.int64))
+    return np.atleast_1d(quests), np.atleast_1d(boost), np.atleast_1d(mult)
+
+
+# Calendar of n_days starting on a Monday with different quest counts on weekdays and weekends, an optional
+# reward multiplier on weekends (server boost) and a Void Aura boost event lasting boost_days from boost_start
+def weekly_calendar(n_days, weekday_quests, weekend_quests, weekend_multiplier = 1, boost_start = 0, boost_days = 0):
+    day = np.arange(n_days)
+    weekend = day % 7 >= 5
+    quests = np.where(weekend, weekend_quests, weekday_quests)
+    multiplier = np.where(weekend, weekend_multiplier, 1)
+    aura_boost = (day >= boost_start) & (day < boost_start + boost_days)
+    return boost_calendar(quests, aura_boost, multiplier)
+
+
+# Walker alias table of a pmf, so that many draws cost O(1) each instead of a binary search of the cdf
+def _alias_table(pmf):
+    k = len(pmf)
+    scaled = np.asarray(pmf, dtype = float) * k / np.sum(pmf)
+    prob = np.ones(k)
+    alias = np.arange(k)
+
+    small = [i for i in range(k) if scaled[i] < 1]
+    large = [i for i in range(k) if scaled[i] >= 1]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] -= 1 - scaled[s]
+        (small if scaled[l] < 1 else large).append(l)
+    return prob, alias
+
+
+def _alias_draw(rng, table, n):
+    prob, alias = table
+    u = rng.random(n) * len(prob)
+    idx = u.astype(np.int64)
+    return np.where(u - idx < prob[idx], idx, alias[idx])
+
+
+# Advances n_paths independent farms one day at a time following the calendar, each path dropping out on the
+# day it reaches amt_farm, and returns the completion days as a DaysDistribution. Each day's auras are drawn
+# from the exact pmf of that day's total (see aqw_stats.compound) with an alias table, so a step costs one
+# uniform per active path however many quests are done. The days before any path could possibly finish are
+# skipped in one draw from the pmf of their summed total.
+def simulate_days(amt_farm, calendar, daily_bonus, n_paths, seed = None):
+    quests, boost, mult = calendar
+    rng = np.random.default_rng(seed)
+
+    # Pmf of the auras earned on each distinct (quests, boost, multiplier) day, indexed by the amount
+    day_pmfs = {}
+    for q, b, m in set(zip(quests.tolist(), boost.tolist(), mult.tolist())):
+        rewards = AURA_REWARDS[b]
+        total = sum_pmf(rewards, np.full(len(rewards), 1 / len(rewards)), q)
+        pmf = np.zeros(daily_bonus + m * (len(total) - 1) + 1)
+        pmf[daily_bonus + m * np.arange(len(total))] = total
+        day_pmfs[q, b, m] = pmf
+    calendar_keys = list(zip(quests.tolist(), boost.tolist(), mult.tolist()))
+
+    # Fewest auras a full pass over the calendar can give, which bounds the number of days needed
+    min_cycle = sum(daily_bonus + m * q * AURA_REWARDS[b].min() for q, b, m in calendar_keys)
+    if min_cycle <= 0:
+        raise ValueError('No Void Auras are earned over the calendar')
+    max_days = len(quests) * -(-amt_farm // min_cycle)
+
+    # Days during which even the luckiest path stays below amt_farm
+    skip, most = 0, 0
+    while most + len(day_pmfs[calendar_keys[skip % len(quests)]]) - 1 < amt_farm:
+        most += len(day_pmfs[calendar_keys[skip % len(quests)]]) - 1
+        skip += 1
+
+    if skip > 0:
+        nfft = _fft_size(amt_farm)
+        day_spectra = [np.fft.rfft(day_pmfs[key], nfft) for key in calendar_keys]
+        spectrum = np.prod(day_spectra, axis = 0) ** (skip // len(quests))
+        for day in range(skip % len(quests)):
+            spectrum *= day_spectra[day]
+        start_pmf = _clean(np.fft.irfft(spectrum, nfft)[:most + 1])
+        totals = _alias_draw(rng, _alias_table(start_pmf), n_paths)
+    else:
+        totals = np.zeros(n_paths, dtype = np.int64)
+
+    tables = {key: _alias_table(pmf) for key, pmf in day_pmfs.items()}
+    completion = np.zeros(n_paths, dtype = np.int64)
+    active = np.arange(n_paths)
+
+    for day in range(skip + 1, max_days + 1):
+        totals += _alias_draw(rng, tables[calendar_keys[(day - 1) % len(quests)]], len(active))
+
+        done = totals >= amt_farm
+        if done.any():
+            completion[active[done]] = day
+            active = active[~done]
+            totals = totals[~done]
+            if len(active) == 0:
+                break
+
+    counts = np.bincount(completion)
+    days = np.flatnonzero(counts)
+    return DaysDistribution(days, counts[days] / n_paths)
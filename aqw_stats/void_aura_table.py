@@ -0,0 +1,166 @@
+import argparse
+import os
+import time
+from contextlib import nullcontext
+from multiprocessing import Pool
+
+import numpy as np
+
+from aqw_stats.compound import SUPPORT_TOL, TAIL_TOL, daily_pmf, totals_below
+from aqw_stats.void_aura import AURA_REWARDS, exact_days
+
+
+# Input space of the Void Aura page
+AMT_REQ = 7500
+MAX_QUESTS_PER_DAY = 500
+DAILY_BONUSES = (0, 50, 100, 150)
+BOOST_STATUSES = (False, True)
+
+PERCENTILES = {'p05': 0.05, 'p25': 0.25, 'p50': 0.5, 'p75': 0.75, 'p95': 0.95}
+
+# One record per (boost status, daily bonus, quests per day, current auras), days fit in 16 bits
+TABLE_DTYPE = np.dtype([('mean', '<f4'), ('std', '<f4'), ('min', '<u2'), ('max', '<u2')] +
+                       [(name, '<u2') for name in PERCENTILES])
+TABLE_SHAPE = (len(BOOST_STATUSES), len(DAILY_BONUSES), MAX_QUESTS_PER_DAY, AMT_REQ)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'void_aura_table.npy')
+
+
+# Summary statistics of a DaysDistribution, using the same fields as the table
+def days_summary(dist):
+    summary = {'mean': dist.mean(), 'std': dist.std(), 'min': dist.min(), 'max': dist.max()}
+    summary.update({name: dist.percentile(q) for name, q in PERCENTILES.items()})
+    return summary
+
+
+# Statistics for every amount of current auras at once, for one boost status, daily bonus and quest count
+def summarise_config(config):
+    boost_status, daily_bonus, quests_per_day = config
+    rewards = AURA_REWARDS[boost_status]
+    probs = np.full(len(rewards), 1 / len(rewards))
+
+    # Index i holds the statistics for i current auras
+    targets = np.arange(AMT_REQ, 0, -1)
+    last_day = -(-targets // (quests_per_day * rewards.min() + daily_bonus))
+
+    # Accumulates E[D] and E[D^2] from the survival function P(D > d), starting with the d = 0 term
+    survival = np.ones(AMT_REQ)
+    first = np.ones(AMT_REQ)
+    second = np.ones(AMT_REQ)
+
+    out = np.zeros(AMT_REQ, dtype = TABLE_DTYPE)
+    for day, state in enumerate(totals_below(AMT_REQ, daily_pmf(rewards, probs, quests_per_day, daily_bonus)), start = 1):
+        survival = np.minimum(np.cumsum(state)[targets - 1], survival)
+        survival[(day >= last_day) | (survival < TAIL_TOL)] = 0
+
+        first += survival
+        second += (2 * day + 1) * survival
+
+        out['min'][(out['min'] == 0) & (survival < 1 - SUPPORT_TOL)] = day
+        out['max'][(out['max'] == 0) & (survival <= SUPPORT_TOL)] = day
+        for name, q in PERCENTILES.items():
+            out[name][(out[name] == 0) & (survival <= 1 - q + 1e-12)] = day
+
+        if not survival.any():
+            break
+
+    out['mean'] = first
+    out['std'] = np.sqrt(np.maximum(second - first ** 2, 0))
+    return config, out
+
+
+def _index(quests_per_day, daily_bonus, boost_status):
+    return BOOST_STATUSES.index(boost_status), DAILY_BONUSES.index(daily_bonus), quests_per_day - 1
+
+
+# Computes every cell of the table in parallel and writes it to path, or in this process if workers is 1
+def build_table(path = DEFAULT_PATH, workers = None):
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    table = np.lib.format.open_memmap(path + '.tmp', mode = 'w+', dtype = TABLE_DTYPE, shape = TABLE_SHAPE)
+
+    # Fewer quests per day means more days to step through, so those are handed out first
+    configs = [(boost_status, daily_bonus, quests_per_day) for quests_per_day in range(1, MAX_QUESTS_PER_DAY + 1)
+               for boost_status in BOOST_STATUSES for daily_bonus in DAILY_BONUSES]
+
+    with Pool(workers) if workers != 1 else nullcontext() as pool:
+        results = map(summarise_config, configs) if pool is None else pool.imap_unordered(summarise_config, configs, chunksize = 4)
+        for (boost_status, daily_bonus, quests_per_day), out in results:
+            table[_index(quests_per_day, daily_bonus, boost_status)] = out
+
+    table.flush()
+    del table
+    os.replace(path + '.tmp', path)
+
+
+# Memory-maps the table, or returns None if it has not been built
+def load_table(path = DEFAULT_PATH):
+    if not os.path.exists(path):
+        return None
+    table = np.load(path, mmap_mode = 'r')
+    if table.dtype != TABLE_DTYPE or table.shape != TABLE_SHAPE:
+        return None
+    return table
+
+
+# Returns the statistics for one set of page inputs as a dict
+def lookup(table, current, quests_per_day, daily_bonus, boost_status):
+    record = table[_index(quests_per_day, daily_bonus, boost_status) + (current,)]
+    return {name: record[name].item() for name in TABLE_DTYPE.names}
+
+
+# Exact statistics for one set of inputs, read from the table when it covers them and computed otherwise
+def days_stats(current, quests_per_day, daily_bonus, boost_status, table = None):
+    if (table is not None and 0 <= current < AMT_REQ and 1 <= quests_per_day <= MAX_QUESTS_PER_DAY
+            and daily_bonus in DAILY_BONUSES):
+        return lookup(table, current, quests_per_day, daily_bonus, boost_status)
+    return days_summary(exact_days(AMT_REQ - current, quests_per_day, daily_bonus, boost_status))
+
+
+# Compares random cells of the table against the live exact computation, returns the mismatching cells
+def verify_table(table, n_cells = 100, seed = None):
+    rng = np.random.default_rng(seed)
+    mismatches = []
+    for _ in range(n_cells):
+        current = int(rng.integers(0, AMT_REQ))
+        quests_per_day = int(rng.integers(1, MAX_QUESTS_PER_DAY + 1))
+        daily_bonus = DAILY_BONUSES[rng.integers(0, len(DAILY_BONUSES))]
+        boost_status = BOOST_STATUSES[rng.integers(0, len(BOOST_STATUSES))]
+
+        stored = lookup(table, current, quests_per_day, daily_bonus, boost_status)
+        live = days_summary(exact_days(AMT_REQ - current, quests_per_day, daily_bonus, boost_status))
+
+        if not all(np.isclose(stored[name], live[name], rtol = 1e-4, atol = 1e-4) for name in TABLE_DTYPE.names):
+            mismatches.append(((current, quests_per_day, daily_bonus, boost_status), stored, live))
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Build or verify the precomputed Void Aura days table.')
+    parser.add_argument('mode', choices = ['build', 'verify'])
+    parser.add_argument('--path', default = DEFAULT_PATH)
+    parser.add_argument('--workers', type = int, default = None, help = 'worker processes for build (default: all cores, 1 builds without a pool)')
+    parser.add_argument('--cells', type = int, default = 100, help = 'random cells to check in verify mode')
+    parser.add_argument('--seed', type = int, default = None)
+    args = parser.parse_args()
+
+    if args.mode == 'build':
+        start = time.perf_counter()
+        build_table(args.path, args.workers)
+        print(f'Built {args.path} in {time.perf_counter() - start:.1f}s')
+        return
+
+    table = load_table(args.path)
+    if table is None:
+        raise SystemExit(f'No valid table found at {args.path}, run the build mode first')
+
+    mismatches = verify_table(table, args.cells, args.seed)
+    for cell, stored, live in mismatches:
+        print(f'Mismatch at {cell}: stored {stored}, live {live}')
+    print(f'{args.cells - len(mismatches)}/{args.cells} cells match the live computation')
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
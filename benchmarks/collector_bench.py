@@ -0,0 +1,62 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from aqw_stats.collector import independent_cdf, independent_expected, independent_upper, one_drop_expected
+
+
+# Expected kills for the one-drop-per-kill case by naive inclusion-exclusion over all 2^k subsets of items
+def inclusion_exclusion_expected(probs):
+    total = 0.0
+    for r in range(1, len(probs) + 1):
+        for subset in itertools.combinations(probs, r):
+            total += (-1) ** (r + 1) / sum(subset)
+    return total
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Benchmark the multi-item drop calculator as the number of items grows.')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [2, 4, 8, 12, 16, 20, 32, 64, 128])
+    parser.add_argument('--min-rate', type = float, default = 0.0001, help = 'lowest drop rate as a probability')
+    parser.add_argument('--max-rate', type = float, default = 0.05)
+    parser.add_argument('--max-naive', type = int, default = 20, help = 'largest k to run inclusion-exclusion for')
+    parser.add_argument('--seed', type = int, default = 0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'k':>4} {'max kills':>10} {'indep E[N]':>11} {'indep cdf':>10} {'one-drop':>10} {'naive 2^k':>10} {'rel err':>9}")
+
+    for k in args.sizes:
+        probs = rng.uniform(args.min_rate, args.max_rate, k)
+        # Scaled so at most one item drops per kill
+        one_drop = probs / max(probs.sum(), 1)
+
+        _, t_ind = timed(independent_expected, probs)
+        kills = np.arange(1, independent_upper(probs) + 1)
+        _, t_cdf = timed(independent_cdf, kills, probs)
+        expected, t_one = timed(one_drop_expected, one_drop)
+
+        if k <= args.max_naive:
+            naive, t_naive = timed(inclusion_exclusion_expected, one_drop)
+            naive_cols = f'{t_naive * 1000:>8.1f}ms {abs(expected - naive) / naive:>9.1e}'
+        else:
+            naive_cols = f"{'-':>10} {'-':>9}"
+
+        print(f'{k:>4} {kills[-1]:>10,} {t_ind * 1000:>9.1f}ms {t_cdf * 1000:>8.1f}ms {t_one * 1000:>8.1f}ms {naive_cols}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import gc
+import os
+import resource
+import runpy
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import streamlit as st
+import streamlit.logger
+
+from benchmarks.page_bench import DROP_PAGE, REP_PAGE, VOID_PAGE, _clear_caches, _widgets
+from aqw_stats.reputation import REP_RANK
+
+
+# Soak test for figure memory. Reruns the pages thousands of times with random inputs, clearing every cache
+# first so each rerun draws and encodes its figures again, and samples the process's resident memory and
+# the matplotlib figures still alive. Figures that are never released, or styles and caches that keep
+# growing, show up as memory climbing after the warmup. The allocator makes RSS move up and down by tens of
+# MiB from one sample to the next, so the growth is the mean of the later half of the samples minus the
+# mean of the earlier half. Exits with an error if that is above the allowed amount, if any figure outlived
+# its rerun, or if pyplot was imported.
+#
+#     python benchmarks/figure_soak.py --reruns 3000
+
+
+# Inputs of one rerun of a random page, always drawing at least one matplotlib figure
+def random_case(rng):
+    page = rng.choice(['drop', 'multi', 'reputation', 'void_aura'])
+    if page == 'drop':
+        return DROP_PAGE, {'Item Drop Rate': float(np.round(10 ** rng.uniform(-2, 2), 2)),
+                           'Choose how the plots are drawn': 'Static image'}
+    if page == 'multi':
+        return DROP_PAGE, {'Select a topic': 'Multi-item Drop Calculator',
+                           'Items': [],
+                           'Drop rates of other items': ', '.join(f'{r:.2f}' for r in 10 ** rng.uniform(-1, 1.5, rng.integers(1, 6))),
+                           'Choose how the plots are drawn': 'Static image'}
+    if page == 'reputation':
+        rank = int(rng.integers(1, 10))
+        return REP_PAGE, {'Input current rank': rank, 'Input current rep': int(rng.integers(0, REP_RANK[rank])),
+                          'Calculate': True}
+    return VOID_PAGE, {'Void Auras you currently have': int(rng.integers(0, 7000)),
+                       'Enter the number of times': int(rng.integers(1, 501)),
+                       'Choose the method used': rng.choice(['Exact distribution', 'Monte Carlo simulation']),
+                       'View Plot': True}
+
+
+# Resident memory of the process in MiB, or its peak where /proc is not available
+def rss_mib():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def live_figures():
+    from matplotlib.figure import Figure
+
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Rerun the pages many times and check that memory stays flat.')
+    parser.add_argument('--reruns', type = int, default = 2000)
+    parser.add_argument('--warmup', type = int, default = 200, help = 'reruns before memory is first sampled')
+    parser.add_argument('--every', type = int, default = 100, help = 'reruns between memory samples')
+    parser.add_argument('--max-growth', type = float, default = 16, help = 'allowed memory growth after the warmup, in MiB')
+    parser.add_argument('--seed', type = int, default = 0)
+    args = parser.parse_args()
+
+    st.get_option('logger.level')
+    streamlit.logger.set_log_level('error')
+    warnings.simplefilter('ignore')
+    os.chdir(ROOT)
+    rng = np.random.default_rng(args.seed)
+
+    start = time.perf_counter()
+    samples = []
+    print(f"{'reruns':>8} {'rss':>10} {'growth':>10} {'figures':>8} {'elapsed':>9}")
+    for i in range(1, args.warmup + args.reruns + 1):
+        page, widgets = random_case(rng)
+        _clear_caches()
+        with _widgets(widgets):
+            runpy.run_path(os.path.join(ROOT, page), run_name = '__main__')
+
+        if i == args.warmup or (i > args.warmup and (i - args.warmup) % args.every == 0) or i == args.warmup + args.reruns:
+            gc.collect()
+            rss, figures = rss_mib(), live_figures()
+            samples.append(rss)
+            print(f'{i:>8} {rss:>7.1f}MiB {rss - samples[0]:>+7.1f}MiB {figures:>8} {time.perf_counter() - start:>8.0f}s')
+
+    half = len(samples) // 2
+    growth = np.mean(samples[-half:]) - np.mean(samples[:half]) if half else 0.0
+    failures = []
+    if growth > args.max_growth:
+        failures.append(f'memory grew by {growth:.1f}MiB over {args.reruns:,} reruns, more than {args.max_growth:g}MiB')
+    if figures:
+        failures.append(f'{figures} matplotlib figure(s) still alive after their rerun')
+    if 'matplotlib.pyplot' in sys.modules:
+        failures.append('matplotlib.pyplot was imported')
+    for failure in failures:
+        print(f'Failed: {failure}')
+    if failures:
+        raise SystemExit(1)
+    print(f'Memory grew by {growth:+.1f}MiB over {args.reruns:,} reruns after the warmup, no figures left alive.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import runpy
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import streamlit as st
+import streamlit.logger
+
+from aqw_app import figures, shared_cache
+from aqw_stats import geometric, reputation
+from aqw_stats.reputation import REP_RANK
+from aqw_stats.void_aura import exact_days, sample_days
+
+
+# Rerun benchmark for the pages. Each case runs a page script headlessly, the way Streamlit re-executes it
+# on every interaction, with the widgets returning the case's inputs. Recorded per case:
+#
+#     compute_ms      the aqw_stats calls behind the case, with their caches cleared
+#     rerun_ms        the whole script with Streamlit's and our caches cleared, excluding figure encoding
+#     warm_rerun_ms   the same script run again straight after, so caches are hit
+#     render_ms       drawing and encoding the figures the page sends (aqw_app.figures, JSON for plotly)
+#     encoded_bytes   size of everything the page sends as figures or images
+#     peak_kib        peak Python memory of a cold rerun, from tracemalloc
+#
+# Results are written as JSON, and compared against a baseline file with a regression threshold:
+#
+#     python benchmarks/page_bench.py --output baseline.json
+#     python benchmarks/page_bench.py --baseline baseline.json --threshold 0.2
+
+DROP_PAGE = 'pages/2_⚔️_Drop Rate Guide.py'
+REP_PAGE = 'pages/3_📚_Reputation Guide.py'
+VOID_PAGE = 'pages/4_☠️_Void Aura Guide.py'
+
+METRICS = ['compute_ms', 'rerun_ms', 'warm_rerun_ms', 'render_ms', 'encoded_bytes', 'peak_kib']
+
+# Differences below these are noise whatever the threshold
+MIN_CHANGE = {'compute_ms': 2, 'rerun_ms': 5, 'warm_rerun_ms': 5, 'render_ms': 5, 'encoded_bytes': 1024, 'peak_kib': 256}
+
+WIDGETS = ['selectbox', 'number_input', 'slider', 'select_slider', 'radio', 'button', 'checkbox',
+           'multiselect', 'text_input']
+
+
+def drop_cases(quick = False):
+    rates = [0.01, 1, 25] if quick else [0.01, 0.1, 1, 5, 25, 95]
+    for rate in rates:
+        for mode in ['Interactive (in browser)', 'Static image']:
+            yield {'name': f'drop rate={rate}% {mode.split()[0].lower()}',
+                   'page': DROP_PAGE,
+                   'widgets': {'Item Drop Rate': rate, 'Choose how the plots are drawn': mode},
+                   'compute': lambda p = rate / 100: (geometric.summary(p), geometric.curve(p))}
+
+
+def reputation_cases(quick = False):
+    for rank in ([1, 5, 9] if quick else range(1, 10)):
+        rep = REP_RANK[rank] // 2
+        yield {'name': f'reputation rank={rank}',
+               'page': REP_PAGE,
+               'widgets': {'Input current rank': rank, 'Input current rep': rep, 'Calculate': True},
+               'compute': lambda rank = rank, rep = rep: reputation.progress(rank, rep, 400)}
+
+
+def void_aura_cases(quick = False):
+    for quests in ([5, 500] if quick else [1, 5, 50, 500]):
+        yield {'name': f'void aura exact quests={quests}',
+               'page': VOID_PAGE,
+               'widgets': {'Void Auras you currently have': 0, 'Enter the number of times': quests,
+                           'Choose the method used': 'Exact distribution', 'View Plot': True},
+               'compute': lambda q = quests: (exact_days(7500, q, 0, False), exact_days(7500, q, 0, True))}
+
+    for quests in ([5] if quick else [5, 500]):
+        yield {'name': f'void aura monte carlo quests={quests}',
+               'page': VOID_PAGE,
+               'widgets': {'Void Auras you currently have': 0, 'Enter the number of times': quests,
+                           'Choose the method used': 'Monte Carlo simulation', 'View Plot': True},
+               'compute': lambda q = quests: (sample_days(7500, q, 0, False, 10 ** 5, seed = 0),
+                                              sample_days(7500, q, 0, True, 10 ** 5, seed = 1))}
+
+    yield {'name': 'void aura calendar quests=5',
+           'page': VOID_PAGE,
+           'widgets': {'Select a topic': 'Boost Calendar Simulator', 'Void Auras you currently have': 0}}
+
+
+CASES = {'drop': drop_cases, 'reputation': reputation_cases, 'void_aura': void_aura_cases}
+
+
+def _clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    shared_cache.cache.clear()
+    geometric.summary.cache_clear()
+    geometric.curve.cache_clear()
+
+
+# Makes every widget whose label contains one of the keys return that value, other widgets keep their defaults
+@contextlib.contextmanager
+def _widgets(values):
+    saved = []
+    for target in [st, st.sidebar]:
+        for name in WIDGETS:
+            original = getattr(target, name)
+            saved.append((target, name, original))
+
+            def widget(label, *args, _original = original, **kwargs):
+                for key, value in values.items():
+                    if key in label:
+                        return value
+                return _original(label, *args, **kwargs)
+            setattr(target, name, widget)
+    try:
+        yield
+    finally:
+        for target, name, original in saved:
+            setattr(target, name, original)
+
+
+# Replaces the figure outputs with encoders that time and measure what Streamlit would send. Figures shown
+# through aqw_app.figures are measured where they are encoded, and not again when passed to st.image.
+@contextlib.contextmanager
+def _outputs(sent):
+    encoded = []
+
+    def encode(fig, *args, **kwargs):
+        data, stats = original_encode(fig, *args, **kwargs)
+        encoded.append(data)
+        sent.append((stats['encode_ms'] / 1000, stats['bytes']))
+        return data, stats
+
+    def plotly_chart(fig, **kwargs):
+        start = time.perf_counter()
+        size = len(fig.to_json())
+        sent.append((time.perf_counter() - start, size))
+
+    def image(image, **kwargs):
+        if any(image is data for data in encoded):
+            return
+        sent.append((0.0, len(image) if isinstance(image, bytes) else 0))
+
+    original_encode = figures.encode
+    saved = [(name, getattr(st, name)) for name in ['plotly_chart', 'image']]
+    st.plotly_chart, st.image = plotly_chart, image
+    figures.encode = encode
+    try:
+        yield
+    finally:
+        for name, original in saved:
+            setattr(st, name, original)
+        figures.encode = original_encode
+
+
+# Runs the page once and returns (seconds excluding encoding, seconds encoding, bytes sent)
+def _rerun(case):
+    sent = []
+    with _widgets(case.get('widgets', {})), _outputs(sent):
+        start = time.perf_counter()
+        runpy.run_path(os.path.join(ROOT, case['page']), run_name = '__main__')
+        elapsed = time.perf_counter() - start
+    encode = sum(t for t, _ in sent)
+    return elapsed - encode, encode, sum(size for _, size in sent)
+
+
+def run_case(case, repeats = 3):
+    # Lazy imports happen on the first run, and belong to the cold-start budget instead
+    _rerun(case)
+
+    compute, cold, warm, render = [], [], [], []
+    for _ in range(repeats):
+        if 'compute' in case:
+            _clear_caches()
+            start = time.perf_counter()
+            case['compute']()
+            compute.append(time.perf_counter() - start)
+
+        _clear_caches()
+        script, encode, size = _rerun(case)
+        cold.append(script)
+        render.append(encode)
+        warm.append(_rerun(case)[0])
+
+    _clear_caches()
+    tracemalloc.start()
+    try:
+        _rerun(case)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'compute_ms': statistics.median(compute) * 1000 if compute else None,
+            'rerun_ms': statistics.median(cold) * 1000,
+            'warm_rerun_ms': statistics.median(warm) * 1000,
+            'render_ms': statistics.median(render) * 1000,
+            'encoded_bytes': size,
+            'peak_kib': peak / 1024}
+
+
+# Cases whose metrics grew by more than threshold (as a fraction) compared with the baseline
+def regressions(results, baseline, threshold):
+    found = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in METRICS:
+            new, old = metrics.get(metric), base.get(metric)
+            if new is None or old is None:
+                continue
+            if new > old * (1 + threshold) and new - old > MIN_CHANGE[metric]:
+                found.append((name, metric, old, new))
+    return found
+
+
+def _fmt(value, metric):
+    if value is None:
+        return '-'
+    if metric == 'encoded_bytes':
+        return f'{value / 1024:.0f}KiB'
+    if metric == 'peak_kib':
+        return f'{value / 1024:.1f}MiB'
+    return f'{value:.1f}ms'
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Benchmark page reruns with representative inputs.')
+    parser.add_argument('--pages', nargs = '+', choices = list(CASES), default = list(CASES))
+    parser.add_argument('--repeats', type = int, default = 3, help = 'runs per case, the median is reported')
+    parser.add_argument('--quick', action = 'store_true', help = 'use a smaller grid of inputs')
+    parser.add_argument('--output', help = 'write the results to this JSON file')
+    parser.add_argument('--baseline', help = 'JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type = float, default = 0.2, help = 'allowed relative growth of any metric')
+    args = parser.parse_args()
+
+    # Reading an option parses Streamlit's config, which would reset the log level afterwards
+    st.get_option('logger.level')
+    streamlit.logger.set_log_level('error')
+    warnings.simplefilter('ignore')
+    os.chdir(ROOT)
+
+    results = {}
+    print(f"{'case':<42} " + ' '.join(f'{m:>14}' for m in METRICS))
+    for page in args.pages:
+        for case in CASES[page](args.quick):
+            results[case['name']] = run_case(case, args.repeats)
+            print(f"{case['name']:<42} " + ' '.join(f'{_fmt(results[case["name"]][m], m):>14}' for m in METRICS))
+
+    report = {'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': platform.python_version(),
+                       'numpy': np.__version__,
+                       'streamlit': st.__version__,
+                       'machine': platform.machine(),
+                       'repeats': args.repeats,
+                       'quick': args.quick},
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent = 2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        found = regressions(results, baseline, args.threshold)
+        for name, metric, old, new in found:
+            print(f'Regression: {name} {metric} {_fmt(old, metric)} -> {_fmt(new, metric)}')
+        if found:
+            raise SystemExit(1)
+        print(f'No metric grew by more than {args.threshold:.0%} compared with the baseline.')
+
+
+if __name__ == '__main__':
+    main()
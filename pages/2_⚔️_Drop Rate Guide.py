@@ -1,10 +1,41 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 
-from scipy.stats import geom
+from aqw_app import figures
+from aqw_app.derived import derived, show_counters
+from aqw_app.lazy import lazy_import
+from aqw_app.profiling import profiled, timed
+from aqw_app.shared_cache import shared, show_stats
+from aqw_stats import geometric
+from aqw_stats.catalog import MAX_RATE, MIN_RATE, load_catalog
+from aqw_stats.collector import independent_cdf, independent_expected, independent_ppf, one_drop_expected, simulate_sessions
 
+# Plotting libraries are only imported once a plot is drawn
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
+subplots = lazy_import('plotly.subplots')
 
+
+# Most items offered by the item selectors at once, the rest are found by searching
+MAX_MATCHES = 50
+
+# Items chosen on the multi-item calculator until the user picks their own
+DEFAULT_MULTI_ITEMS = ['Dark Unicorn Rib', 'Runes of Awe']
+
+
+# Shared by every session, the catalog is read only
+@st.cache_resource
+def item_catalog():
+    return load_catalog()
+
+
+def item_label(catalog, i):
+    item = catalog.item(i)
+    source = ', '.join(part for part in (item['monster'], item['map']) if part)
+    return f"{item['name']} ({item['rate']:g}%" + (f', {source})' if source else ')')
+
+
+@profiled('Drop Rate Guide')
 def main(): # Main title
     st.title('AQWorlds Drop Rate Guide')
     st.markdown('### Statistics of Drop Rates in AQWorlds')
@@ -12,6 +43,7 @@ def main(): # Main title
     st.markdown('This web app is for the data visualisation of the drop rates in the MMORPG, AdventureQuest Worlds. Users can input the drop rate of an item and use a slider/number input to see how the probability of obtaining an item changes as the number of tries increases. Players may also view an in-depth explanation of how the drop rate probabilities are calculated by selecting the other box from the banner below.')
 
     topics = ['Drop Rate Calculations', 
+              'Multi-item Drop Calculator',
               'In-depth explanation behind probability calculations']
 
     topic = st.selectbox('Select a topic: ', topics)
@@ -19,104 +51,324 @@ def main(): # Main title
     if topic == topics[0]:
         calc()
     elif topic == topics[1]:
+        multi()
+    elif topic == topics[2]:
         expl()
 
+    show_counters()
+    show_stats()
+
 
 def calc():
     st.markdown('---')
     st.markdown('## Drop Rate Calculations')
     
-    st.markdown('Choose an item from the list below to get its drop rate: ')
-    
-    low_drop_dict = {'Burning Blade of Abezeth': 5.0,
-                     "Axeros' Brooch": 4.0,
-                     'Dark Unicorn Rib': 2.0,
-                     'Runes of Awe': 1.0,
-                     'Doom Heart': 0.5}
-    
-    chosen_idr = st.selectbox('Item', ['N/A'] + list(low_drop_dict.keys()))
+    st.markdown('Search for an item and choose it from the list below to get its drop rate: ')
+
+    catalog = item_catalog()
+    query = st.text_input('Search items by name:', value = '')
+    chosen_idr = st.selectbox('Item', ['N/A'] + catalog.search(query, MAX_MATCHES),
+                              format_func = lambda i: i if i == 'N/A' else item_label(catalog, i))
+    item = None if chosen_idr == 'N/A' else catalog.item(chosen_idr)
     
     st.markdown('**OR** directly input the drop rate of an item:')
     
     prob_percent = st.number_input('Item Drop Rate (in %):', 
-                           min_value = 0.01, max_value = 95.00, 
-                           value = 25.00 if chosen_idr == 'N/A' else low_drop_dict[chosen_idr], 
+                           min_value = MIN_RATE, max_value = MAX_RATE, 
+                           value = 25.00 if item is None else item['rate'], 
                            step = 0.01, format = "%.2f")
     
     p = prob_percent / 100  
+    # The catalog holds the statistics of its items, so choosing one needs no distribution math
+    if item is not None and prob_percent == item['rate']:
+        stats = item['stats']
+    else:
+        with timed('geom.summary'):
+            stats = geometric.summary(p)
  
-    interact_type = st.sidebar.radio('Choose the method which you would like to interact with the plots:', ['Slider', 'Number Input'])
+    render_modes = ['Interactive (in browser)', 'Static image']
+    render_mode = st.sidebar.radio('Choose how the plots are drawn:', render_modes)
+
+    # The interactive plots have their own slider, so only the static plots need the sidebar inputs
+    if render_mode == render_modes[1]:
+        interact_type = st.sidebar.radio('Choose the method which you would like to interact with the plots:', ['Slider', 'Number Input'])
     
-    if interact_type == 'Slider':
-        xi = st.sidebar.slider('Choose number of tries:', 
-                               min_value = 1, 
-                               max_value = int(geom.ppf(0.999, p) - 1), 
-                               value = int(1/p),
-                               step = 1)
+        if interact_type == 'Slider':
+            xi = st.sidebar.slider('Choose number of tries:', 
+                                   min_value = 1, 
+                                   max_value = stats['upper'] - 1, 
+                                   value = int(1/p),
+                                   step = 1)
+
+        else:
+            xi = st.sidebar.number_input('Choose number of tries:', 
+                                         min_value = 1, 
+                                         max_value = stats['upper'] - 1,
+                                         value = int(1/p),
+                                         step = 1)
 
-    else:
-        xi = st.sidebar.number_input('Choose number of tries:', 
-                                     min_value = 1, 
-                                     max_value = int(geom.ppf(0.999, p) - 1),
-                                     value = int(1/p),
-                                     step = 1)
-        
     st.sidebar.markdown('**Statistics:**')
-    st.sidebar.markdown(f'Expected No. of Tries: &emsp;**{int(1/p)}**  \nStandard Deviation: &emsp;**{round(np.sqrt((1-p))/p, 2)}**  \n25th Percentile: &emsp;**{int(geom.ppf(0.25, p))}**  \nMedian: &emsp;**{int(geom.ppf(0.5, p))}**  \n75th Percentile: &emsp;**{int(geom.ppf(0.75, p))}**  \n99th Percentile: &emsp;**{int(geom.ppf(0.99, p))}**')
+    st.sidebar.markdown(f'Expected No. of Tries: &emsp;**{int(1/p)}**  \nStandard Deviation: &emsp;**{round(stats["std"], 2)}**  \n25th Percentile: &emsp;**{stats["p25"]}**  \nMedian: &emsp;**{stats["median"]}**  \n75th Percentile: &emsp;**{stats["p75"]}**  \n99th Percentile: &emsp;**{stats["p99"]}**')
+    
+    if render_mode == render_modes[0]:
+        with timed('plotly.interactive_plot'):
+            fig = interactive_plot(p)
+        with timed('st.plotly_chart'):
+            st.plotly_chart(fig, use_container_width = True)
+    else:
+        figures.display(*pmf_image(p, xi))
+        figures.display(*cdf_image(p, xi))
     
-    #@st.cache(allow_output_mutation = True, suppress_st_warning = True)
-    def pmf():
-        plt.style.use('seaborn-whitegrid')
-        fig, ax = plt.subplots(figsize = (12, 6), dpi = 300)
-       
-        x = np.arange(1, geom.ppf(0.999, p))
-        yi = geom.pmf(xi, p)
+    st.markdown('---')
 
-        plt.plot(x, geom.pmf(x, p), color = 'blue')
-        plt.scatter(xi, yi, color = 'blue')
-        plt.text(xi, yi, f'~ {round(yi, 4)}', ha = 'left', va = 'bottom', color = 'blue')
+
+# Static PMF plot with a marker on try number xi, only redrawn when the drop rate or try number changes
+@derived
+@shared
+def pmf_image(p, xi):
+    stats = geometric.summary(p)
+    with figures.figure((12, 6), 'seaborn-whitegrid') as fig:
+        with timed('figure.subplots'):
+            ax = fig.subplots()
+
+        with timed('geom.curve'):
+            x, y, _ = geometric.curve(p)
+            yi = geometric.pmf(xi, p)
+
+        ax.plot(x, y, color = 'blue')
+        ax.scatter(xi, yi, color = 'blue')
+        ax.text(xi, yi, f'~ {round(yi, 4)}', ha = 'left', va = 'bottom', color = 'blue')
 
         ryi = round(yi, 6)
         textstr = "\n".join([r'Probability of obtaining item on try no. $\bf{%s}$:' % str(xi),
                              f'{ryi}' + ' (around ' + r"$\bf" + str(round(yi * 100, 2)) + "\%}$" + ')'])
         props = dict(boxstyle = 'round', facecolor = 'azure')
-        plt.text(geom.ppf(0.975, p), p, textstr, fontsize = 12, va = 'top', bbox = props)
+        ax.text(stats['p975'], p, textstr, fontsize = 12, va = 'top', bbox = props)
+
+        ax.set_title('Individual probability of obtaining item with a ' + r"$\bf{" + str(round(p*100, 2)) + "\%}$" + ' drop rate')
+        ax.set_ylabel('Probability of obtaining item')
+        ax.set_xlabel('Try Number')
+        with timed('figure.encode'):
+            return figures.encode(fig)
 
-        plt.title('Individual probability of obtaining item with a ' + r"$\bf{" + str(round(p*100, 2)) + "\%}$" + ' drop rate')
-        plt.ylabel('Probability of obtaining item')
-        plt.xlabel('Try Number')
-        return st.pyplot(fig)
-    
-    #@st.cache(allow_output_mutation = True, suppress_st_warning = True)
-    def cdf():
-        plt.style.use('seaborn-whitegrid')
-        fig, ax = plt.subplots(figsize = (12, 6), dpi = 300)
 
-        x = np.arange(1, geom.ppf(0.999, p))
-        yi = geom.cdf(xi, p)
+# Static CDF plot with a marker on try number xi
+@derived
+@shared
+def cdf_image(p, xi):
+    stats = geometric.summary(p)
+    with figures.figure((12, 6), 'seaborn-whitegrid') as fig:
+        with timed('figure.subplots'):
+            ax = fig.subplots()
 
-        plt.plot(x, geom.cdf(x, p), color = 'red')
-        plt.scatter(xi, yi, color = 'red')
-        plt.ylim(0, 1)
+        with timed('geom.curve'):
+            x, _, y = geometric.curve(p)
+            yi = geometric.cdf(xi, p)
 
-        plt.text(xi, yi, f'~ {round(yi, 4)}', ha = 'left', va = 'top', color = 'red')
+        ax.plot(x, y, color = 'red')
+        ax.scatter(xi, yi, color = 'red')
+        ax.set_ylim(0, 1)
+
+        ax.text(xi, yi, f'~ {round(yi, 4)}', ha = 'left', va = 'top', color = 'red')
 
         ryi = round(yi, 6)
         textstr = "\n".join([r'Probability of obtaining item by try no. $\bf{%s}$:' % str(xi),
                              f'{ryi}' + ' (around ' + r"$\bf" + str(round(yi * 100, 2)) + "\%}$" + ')'])
         props = dict(boxstyle = 'round', facecolor = 'mistyrose')
-        plt.text(geom.ppf(0.975, p), 0.15, textstr, fontsize = 12, va = 'top', bbox = props)
+        ax.text(stats['p975'], 0.15, textstr, fontsize = 12, va = 'top', bbox = props)
 
-        plt.title('Cumulative probability of obtaining item with a ' + r"$\bf{" + str(round(p*100, 2)) + "\%}$" + ' drop rate')
-        plt.ylabel('Probability of obtaining item')
-        plt.xlabel('Cumulative Number of Tries')
-        return st.pyplot(fig)
-    
-    pmf()
-    cdf()
-    
+        ax.set_title('Cumulative probability of obtaining item with a ' + r"$\bf{" + str(round(p*100, 2)) + "\%}$" + ' drop rate')
+        ax.set_ylabel('Probability of obtaining item')
+        ax.set_xlabel('Cumulative Number of Tries')
+        with timed('figure.encode'):
+            return figures.encode(fig)
+
+
+# Maximum number of positions on the slider and points per curve sent to the browser
+MAX_SLIDER_STEPS = 200
+MAX_CURVE_POINTS = 2000
+
+
+# PMF and CDF with a try-number slider that moves the markers in the browser, built once per drop rate
+@st.cache_data(max_entries = 64)
+def interactive_plot(p):
+    x, y_pmf, y_cdf = geometric.curve(p)
+
+    fig = subplots.make_subplots(rows = 2, cols = 1, vertical_spacing = 0.12,
+                        subplot_titles = [f'Individual probability of obtaining item with a <b>{round(p * 100, 2)}%</b> drop rate',
+                                          f'Cumulative probability of obtaining item with a <b>{round(p * 100, 2)}%</b> drop rate'])
+
+    # The curves are smooth, so very rare drops are thinned out to keep the payload small
+    shown = np.unique(np.linspace(0, len(x) - 1, min(MAX_CURVE_POINTS, len(x))).round().astype(int))
+
+    fig.add_trace(go.Scatter(x = x[shown], y = y_pmf[shown], mode = 'lines', line = dict(color = 'blue'), name = 'PMF',
+                             hovertemplate = 'Try no. %{x}: %{y:.6f}<extra></extra>'), row = 1, col = 1)
+    fig.add_trace(go.Scatter(x = x[shown], y = y_cdf[shown], mode = 'lines', line = dict(color = 'red'), name = 'CDF',
+                             hovertemplate = 'By try no. %{x}: %{y:.6f}<extra></extra>'), row = 2, col = 1)
+
+    # Marker traces moved by the slider, indices 2 and 3
+    xi = min(int(1 / p), len(x))
+    fig.add_trace(go.Scatter(x = [xi], y = [y_pmf[xi - 1]], mode = 'markers+text', marker = dict(color = 'blue', size = 10),
+                             text = [f'~ {round(y_pmf[xi - 1], 4)}'], textposition = 'top right', textfont = dict(color = 'blue'),
+                             hoverinfo = 'skip'), row = 1, col = 1)
+    fig.add_trace(go.Scatter(x = [xi], y = [y_cdf[xi - 1]], mode = 'markers+text', marker = dict(color = 'red', size = 10),
+                             text = [f'~ {round(y_cdf[xi - 1], 4)}'], textposition = 'bottom right', textfont = dict(color = 'red'),
+                             hoverinfo = 'skip'), row = 2, col = 1)
+
+    def info_boxes(i):
+        pmf_text = f'Probability of obtaining item on try no. <b>{i}</b>:<br>{round(y_pmf[i - 1], 6)} (around <b>{round(y_pmf[i - 1] * 100, 2)}%</b>)'
+        cdf_text = f'Probability of obtaining item by try no. <b>{i}</b>:<br>{round(y_cdf[i - 1], 6)} (around <b>{round(y_cdf[i - 1] * 100, 2)}%</b>)'
+        return [dict(text = pmf_text, xref = 'x domain', yref = 'y domain', x = 0.98, y = 0.95, showarrow = False, align = 'left',
+                     bgcolor = 'azure', bordercolor = 'black', borderpad = 6),
+                dict(text = cdf_text, xref = 'x2 domain', yref = 'y2 domain', x = 0.98, y = 0.15, showarrow = False, align = 'left',
+                     bgcolor = 'mistyrose', bordercolor = 'black', borderpad = 6)]
+
+    # Evenly spaced slider positions, always including the expected number of tries
+    titles = [a.to_plotly_json() for a in fig.layout.annotations]
+    positions = np.unique(np.append(np.linspace(1, len(x), min(MAX_SLIDER_STEPS, len(x))).round().astype(int), xi))
+    steps = [dict(method = 'update', label = str(i),
+                  args = [{'x': [[i], [i]],
+                           'y': [[y_pmf[i - 1]], [y_cdf[i - 1]]],
+                           'text': [[f'~ {round(y_pmf[i - 1], 4)}'], [f'~ {round(y_cdf[i - 1], 4)}']]},
+                          {'annotations': titles + info_boxes(i)},
+                          [2, 3]])
+             for i in positions]
+
+    fig.update_layout(height = 900, showlegend = False, template = 'plotly_white',
+                      annotations = titles + info_boxes(xi),
+                      sliders = [dict(active = int(np.searchsorted(positions, xi)), steps = steps, pad = dict(t = 50),
+                                      currentvalue = dict(prefix = 'Number of tries: '))])
+    fig.update_xaxes(title_text = 'Try Number', row = 1, col = 1)
+    fig.update_xaxes(title_text = 'Cumulative Number of Tries', row = 2, col = 1)
+    fig.update_yaxes(title_text = 'Probability of obtaining item')
+    fig.update_yaxes(range = [0, 1], row = 2, col = 1)
+    return fig
+
+
+def multi():
     st.markdown('---')
- 
+    st.markdown('## Multi-item Drop Calculator')
+
+    st.markdown('Farming several items from the same monster? Search for the items and choose them from the list below and/or input their drop rates to see how many kills it takes to obtain **all** of them.')
+
+    # Items already chosen stay among the options whatever is searched for next
+    catalog = item_catalog()
+    chosen = st.session_state.setdefault('multi_items', [i for name in DEFAULT_MULTI_ITEMS for i in catalog.find(name)[:1]])
+    query = st.text_input('Search items to add:', value = '')
+    options = list(dict.fromkeys(chosen + catalog.search(query, MAX_MATCHES)))
+    chosen_items = st.multiselect('Items', options, format_func = lambda i: item_label(catalog, i), key = 'multi_items')
+    other_rates = st.text_input('Drop rates of other items (in %, separated by commas):', value = '')
+
+    try:
+        rates = [catalog.item(i)['rate'] for i in chosen_items] + [float(r) for r in other_rates.split(',') if r.strip()]
+    except ValueError:
+        st.error('Drop rates must be numbers, e.g. 2.5, 0.75, 10')
+        return
+
+    if not rates:
+        st.markdown('Choose at least one item or input at least one drop rate to get started.')
+        return
+
+    if any(r <= 0 or r > 100 for r in rates):
+        st.error('Drop rates must be greater than 0% and at most 100%.')
+        return
+
+    probs = np.array(rates) / 100
+
+    models = ['Every item can drop on the same kill', 'At most one item drops per kill']
+    model = st.radio('How do the items drop?', models)
+
+    if model == models[1]:
+        if probs.sum() > 1:
+            st.error('The drop rates add up to more than 100%, so more than one item must be able to drop per kill.')
+            return
+
+        st.markdown(f'Expected No. of Kills to obtain all **{len(probs)}** item(s): &emsp;**{int(np.ceil(one_drop_expected(probs)))}**')
+        st.markdown('---')
+        return
+
+    probs = tuple(probs)
+    expected, median, p75, p99 = all_items_summary(probs)
+    st.markdown(f'Expected No. of Kills to obtain all **{len(probs)}** item(s): &emsp;**{expected}**  \nMedian: &emsp;**{median}**  \n75th Percentile: &emsp;**{p75}**  \n99th Percentile: &emsp;**{p99}**')
+
+    figures.display(*all_cdf_image(probs))
+
+    session_sim(probs)
+
+    st.markdown('---')
+
+
+# Expected kills and percentiles for obtaining all items, probs being a tuple of drop rates
+@derived
+@shared
+def all_items_summary(probs):
+    median, p75, p99 = independent_ppf([0.5, 0.75, 0.99], probs)
+    return int(np.ceil(independent_expected(probs))), median, p75, p99
+
+
+@derived
+@shared
+def all_cdf_image(probs):
+    with figures.figure((12, 6), 'seaborn-whitegrid') as fig:
+        with timed('figure.subplots'):
+            ax = fig.subplots()
+
+        x = np.arange(1, independent_ppf(0.999, probs))
+        ax.plot(x, independent_cdf(x, probs), color = 'red')
+        ax.set_ylim(0, 1)
+
+        ax.set_title(r'Cumulative probability of obtaining all $\bf{%s}$ item(s)' % len(probs))
+        ax.set_ylabel('Probability of obtaining all items')
+        ax.set_xlabel('Cumulative Number of Kills')
+        with timed('figure.encode'):
+            return figures.encode(fig)
+
+
+# Readable duration from a number of seconds, e.g. 2h 05m 09s
+def duration(seconds):
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}h {minutes:02d}m {secs:02d}s' if hours else f'{minutes}m {secs:02d}s'
+
+
+def session_sim(probs):
+    st.markdown('### Farming Session Simulator')
+    st.markdown('Simulate whole farming sessions which stop once every item has dropped, to see how long they take in kills and in real time.')
+
+    seconds_per_kill = st.number_input('Average time per kill (in seconds):', min_value = 0.5, max_value = 600.0, value = 5.0, step = 0.5)
+    kill_time_sd = st.number_input('Variation in time per kill (standard deviation, in seconds):', min_value = 0.0, max_value = 600.0, value = 0.0, step = 0.5)
+
+    n_sessions = st.select_slider('Number of simulated sessions:', 
+                                  options = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], 
+                                  value = 10 ** 5,
+                                  format_func = lambda n: f'{n:,}')
+    seed = st.number_input('Random seed:', min_value = 0, max_value = 2 ** 32 - 1, value = 0, step = 1)
+
+    mean_kills, mean_seconds, kill_q, time_q, finish_minutes = session_summary(probs, n_sessions, seconds_per_kill, kill_time_sd, seed)
+
+    st.markdown(f'Average session: &emsp;**{mean_kills:,.1f}** kills, **{duration(mean_seconds)}**')
+    st.markdown('\n'.join(f'- {int(q * 100)}% of sessions are over within **{int(np.ceil(k)):,}** kills, or **{duration(t)}**'
+                          for q, k, t in zip(SESSION_QUANTILES, kill_q, time_q)))
+
+    st.line_chart(pd.DataFrame({'Share of sessions finished': FINISH_LEVELS},
+                               index = pd.Index(finish_minutes, name = 'Minutes farming')))
+
+
+SESSION_QUANTILES = [0.5, 0.75, 0.9, 0.99]
+
+# Share of sessions finished over time is drawn from 200 quantiles of the simulated times
+FINISH_LEVELS = np.linspace(0, 1, 201)
+
+
+# Only the summaries of the simulated sessions are kept in the session state, not the sessions themselves
+@derived
+@shared
+def session_summary(probs, n_sessions, seconds_per_kill, kill_time_sd, seed):
+    with timed('simulate_sessions'):
+        kills, seconds = simulate_sessions(probs, n_sessions, seconds_per_kill, kill_time_sd, seed = seed)
+    return (kills.mean(), seconds.mean(), np.quantile(kills, SESSION_QUANTILES), np.quantile(seconds, SESSION_QUANTILES),
+            np.quantile(seconds, FINISH_LEVELS) / 60)
+
     
 def expl():
     st.markdown('---')
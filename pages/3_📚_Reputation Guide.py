@@ -1,12 +1,23 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
 
-import math
+from aqw_app import figures
+from aqw_app.derived import derived, show_counters
+from aqw_app.lazy import lazy_import
+from aqw_app.prerender import chart_bytes
+from aqw_app.profiling import profiled, timed
+from aqw_app.shared_cache import shared, show_stats
+from aqw_stats import planner as farm_planner
+from aqw_stats import reputation
+from aqw_stats.progress_log import ProgressLog, tracker_allowed
+from aqw_stats.reputation import REP_RANK
 
+# Plotting libraries are only imported once a plot or table is drawn
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
 
+
+@profiled('Reputation Guide')
 def main():
     st.title('AQWorlds Reputation Guide')
     st.markdown('### Reputation Statistics in AQWorlds')
@@ -15,6 +26,8 @@ def main():
     st.markdown('Players may also view an in-depth visualisation of the reputation system in AQWorlds by selecting the other box from the banner below.')
     
     topics = ['Reputation Progress & Quest Requirement Calculator', 
+              'Batch Reputation Progress (Guilds & Multiple Factions)',
+              'Multi-faction Farming Planner',
               'Reputation in AQWorlds: A Comprehensive Visualisation']
 
     topic = st.selectbox('Select a topic: ', topics)
@@ -22,7 +35,14 @@ def main():
     if topic == topics[0]:
         calc()
     elif topic == topics[1]:
+        batch()
+    elif topic == topics[2]:
+        planner()
+    elif topic == topics[3]:
         desc()
+
+    show_counters()
+    show_stats()
     
     
 def calc():
@@ -31,120 +51,23 @@ def calc():
      
     st.markdown('Select the rank and the current amount of reputation you currently have for that rank: ')
     
-    # Dictionaries for each rep rank for rep required to reach next rank
-    rep_rank = {1: 900,
-                2: 2700, 
-                3: 6400,
-                4: 12500,
-                5: 21600,
-                6: 34300,
-                7: 51200,
-                8: 72900,
-                9: 100000}
-
-    # Calculates the reputation up to previous rank confirmed to have been earned
-    def rank_rec(num):
-        if num == 1:
-            return 0
-        else:
-            return rep_rank[num - 1] + rank_rec(num - 1)
-    
     # User input
     rank = st.number_input('Input current rank: ', min_value = 1, max_value = 9, value = 6, step = 1)
-    rep = st.number_input('Input current rep: ', min_value = 0, max_value = rep_rank[rank] - 1, value = 100, step = 1)
+    rep = st.number_input('Input current rep: ', min_value = 0, max_value = REP_RANK[rank] - 1, value = 100, step = 1)
     
     # Calculating percentage completion
-    total_rep = rank_rec(rank) + rep
-    
-    rep_left = sum(rep_rank.values()) - total_rep
-
-    rep_percent = total_rep / sum(rep_rank.values())*100
-    
-    quest_series = pd.Series(index = ['Percent completed', 'Percent left'], data = [rep_percent, 100 - rep_percent])
-    
-    def progress_bar():
-        plt.style.use('default')
-        fig, ax = plt.subplots(figsize = (12, 1), dpi = 300)
-
-        # Plotting (1st argument is y-value, so any value can be used as long as they are both the same) 
-        b1 = plt.barh(1, quest_series[0], color = 'green', alpha = 0.7, height = 0.3)
-        b2 = plt.barh(1, quest_series[1], left = quest_series[0], color = 'red', alpha = 0.7, height = 0.3)
-
-        plt.legend([b1, b2], 
-                   quest_series.index,
-                   ncol = 2,
-                   loc = 'lower left', 
-                   bbox_to_anchor = (0.33, -1.1))
-
-        plt.xlim(0, 100)
-        plt.xticks(np.arange(0, 101, 10))
-        
-        # Formatting text in horizontal bar
-        fmt = '%.2f%%'
-        fontweight = 'bold'
-        remove_percent = 2.5
-        
-        # Formatting bar labels and percentages
-        if quest_series[0] < remove_percent:
-            ax.bar_label(b2, label_type = 'center', fmt = fmt, fontweight = fontweight)
-
-        elif quest_series[1] < remove_percent:
-            ax.bar_label(b1, label_type = 'center', fmt = fmt, fontweight = fontweight)
-
-        else:
-            ax.bar_label(b1, label_type = 'center', fmt = fmt, fontweight = fontweight)
-            ax.bar_label(b2, label_type = 'center', fmt = fmt, fontweight = fontweight)
-
-        # Removing x-axis
-        frame1 = plt.gca()
-        frame1.axes.get_yaxis().set_visible(False)
-
-        return st.pyplot(fig)
+    result = reputation.progress(rank, rep)
+    total_rep, rep_left, rep_percent = result['total_rep'], result['rep_left'], result['progress_pct']
     
     st.subheader('Rate of Completion')
-    progress_bar()
+    figures.display(*progress_bar_image(rep_percent))
     
     st.markdown(f'You are **{round(rep_percent, 2)}%** of the way to reaching the maximum rep rank.')
     st.markdown(f'There is still **{round(100 - rep_percent, 2)}%** to go before reaching the maximum rep rank.')
     
-    # Creating table of results
-    def progress_table():
-        rep_dict = {'Reputation Points': [round(total_rep, 0), round(rep_left, 0)],
-                    'Percentage (%)': list(quest_series)}
-        rep_df = pd.DataFrame(index = ['Rep amount completed', 'Rep amount left'], data = rep_dict)
-
-        # Adjust formatting of cells
-        rep_df['Reputation Points'] = rep_df['Reputation Points'].astype(int)
-        bold_headers = [f'<b>{item}<b>' for item in (['Total Rep Amount'] + list(rep_df.columns))]
-        
-        # Create figure
-        fig = go.Figure(data = [go.Table(columnwidth = [1, 1, 1],
-                                         
-                                         header = dict(values = bold_headers,
-                                                       fill_color = 'paleturquoise',
-                                                       line_color = 'darkslategray',
-                                                       align = 'center',
-                                                       font = dict(color = 'black', 
-                                                                   size = 14, 
-                                                                   family = 'Georgia')),
-                           
-                                         cells = dict(values = [rep_df.index,
-                                                                rep_df['Reputation Points'],
-                                                                rep_df['Percentage (%)']], 
-                                                      fill_color = 'lavender',
-                                                      line_color = 'darkslategray',
-                                                      align = ['left', 'center'],
-                                                      font = dict(color = ['black'], 
-                                                                  size = [14, 14], 
-                                                                  family = 'Georgia'),
-                                                      height = 25,
-                                                      format = ['', ',', ',.2f']))])
-        
-        fig.update_layout(height = 95, width = 700, margin = dict(l = 5, r = 5, t = 5, b = 5))
-        return st.plotly_chart(fig, use_container_width = True)
-    
     st.subheader('Table of Results')
-    progress_table()
+    with timed('st.plotly_chart'):
+        st.plotly_chart(progress_table(total_rep, rep_left, rep_percent), use_container_width = True)
     
     st.markdown(f'You are currently at **Rank {int(rank)}** out of 10.')
     st.markdown('You have earned **{:,}** reputation point(s) so far.'.format(int(total_rep)))
@@ -182,150 +105,313 @@ def calc():
     else:
         server_boost = 1
 
-    quest_rep = quest_rep * (1 + item_boost / 100)
-    quest_rep = quest_rep * (1 + rep_boost)
-    quest_rep = quest_rep * (server_boost)
-
-    total_quests = math.ceil(rep_left / quest_rep)
+    result = reputation.progress(rank, rep, quest_rep, item_boost, rep_boost, server_boost)
+    quest_rep, total_quests = result['boosted_quest_rep'], result['quests_left']
     
     if st.button('Calculate'):    
-        def quest_table():
-            
-            # Create table to see amount of quests to reach particular rank
-            rq_dict = {}
-            for i in range(2, 11):
-                if rank_rec(i) > total_rep:
-                    rq_dict.update({f'Rank {i}': rank_rec(i) - total_rep})
-                else:
-                    continue
-                    
-            q_klist = list(rq_dict.keys())       
-            q_vlist = list(rq_dict.values())
-            quest_array = np.ceil(np.array(list(rq_dict.values())) / quest_rep)
-
-            fig = go.Figure(data = [go.Table(columnwidth = [1, 1, 1],
-
-                                                     header = dict(values = ['To reach:', 
-                                                                             'Rep required',
-                                                                             'No. of Quests required'],
-                                                                   fill_color = 'lightcoral',
-                                                                   line_color = 'darkslategray',
-                                                                   align = 'center',
-                                                                   font = dict(color = 'black', 
-                                                                               size = 14, 
-                                                                               family = 'Georgia')),
-
-                                                     cells = dict(values = [q_klist, q_vlist, quest_array], 
-                                                                  fill_color = 'wheat',
-                                                                  line_color = 'darkslategray',
-                                                                  align = ['left', 'center'],
-                                                                  font = dict(color = ['black'], 
-                                                                              size = [14, 14], 
-                                                                              family = 'Georgia'),
-                                                                  height = 25,
-                                                                  format = ['', ',', ',']))]) 
-            fig.update_layout(height = 300, width = 700, margin = dict(l = 5, r = 5, t = 5, b = 5))
-            return st.plotly_chart(fig, use_container_width = True)
-        
         st.subheader('Results')
-        quest_table()
+        with timed('st.plotly_chart'):
+            st.plotly_chart(quest_table(tuple(result['rep_to_rank'].items()), tuple(result['quests_to_rank'].values())),
+                            use_container_width = True)
         
         st.subheader('Result Summary')
         st.markdown(f'One quest completion gives **{int(quest_rep)}** rep after accounting for all possible boosts.')
         st.markdown(f'You need to complete the same quest **{total_quests}** time(s) to reach Rank 10.')
         
     st.markdown('---')
+    tracker(total_rep)
+
+
+# Progress bar to the maximum rank, not redrawn when only the quest or boost inputs change
+@derived
+@shared
+def progress_bar_image(rep_percent):
+    quest_series = pd.Series(index = ['Percent completed', 'Percent left'], data = [rep_percent, 100 - rep_percent])
+
+    with figures.figure((12, 1), 'default') as fig:
+        with timed('figure.subplots'):
+            ax = fig.subplots()
+
+        # Plotting (1st argument is y-value, so any value can be used as long as they are both the same) 
+        b1 = ax.barh(1, quest_series[0], color = 'green', alpha = 0.7, height = 0.3)
+        b2 = ax.barh(1, quest_series[1], left = quest_series[0], color = 'red', alpha = 0.7, height = 0.3)
+
+        ax.legend([b1, b2], 
+                  quest_series.index,
+                  ncol = 2,
+                  loc = 'lower left', 
+                  bbox_to_anchor = (0.33, -1.1))
+
+        ax.set_xlim(0, 100)
+        ax.set_xticks(np.arange(0, 101, 10))
+
+        # Formatting text in horizontal bar
+        fmt = '%.2f%%'
+        fontweight = 'bold'
+        remove_percent = 2.5
+
+        # Formatting bar labels and percentages
+        if quest_series[0] < remove_percent:
+            ax.bar_label(b2, label_type = 'center', fmt = fmt, fontweight = fontweight)
+
+        elif quest_series[1] < remove_percent:
+            ax.bar_label(b1, label_type = 'center', fmt = fmt, fontweight = fontweight)
 
-        
-def desc():
-    st.markdown('---')
-    st.markdown('## Reputation in AQWorlds: A Comprehensive Visualisation')
-    st.markdown('Reputation in AdventureQuest Worlds consitutes a total of 10 ranks, with each rank requiring an increasing amount of reputation to reach the next rank. This aims to be a visual guide to the reputation required to reach rank 10 for anyone interested.')
-    
-    # Required calculations
-    rep_rank = {1: 900,
-                2: 2700, 
-                3: 6400,
-                4: 12500,
-                5: 21600,
-                6: 34300,
-                7: 51200,
-                8: 72900,
-                9: 100000}
-    
-    rep_comp = {i: rep_rank[i] / sum(rep_rank.values()) * 100 for i in rep_rank.keys()}
-    
-    def rank_cum_percent(num):
-        if num == 1:
-            return rep_comp[num]
         else:
-            return rep_comp[num] + rank_cum_percent(num - 1)
-        
-    rep_cum_comp = {'Rank 1': 0.0}
-    rep_cum_comp.update({f'Rank {i + 1}': rank_cum_percent(i) for i in rep_comp})
-    rep_cum_comp.update({'Rank 10': 100.0})    
-    
-    # Obtain plots
-    def original_plot():
-        plt.style.use('ggplot')
-        fig, ax = plt.subplots(figsize = (12, 6), dpi = 300)
+            ax.bar_label(b1, label_type = 'center', fmt = fmt, fontweight = fontweight)
+            ax.bar_label(b2, label_type = 'center', fmt = fmt, fontweight = fontweight)
 
-        plt.bar(rep_rank.keys(), rep_rank.values(), color = 'g', alpha = 0.65)
-        ax.bar_label(ax.containers[0])
+        # Removing x-axis
+        ax.get_yaxis().set_visible(False)
 
-        plt.xticks(ticks = list(rep_rank.keys()), 
-                   labels = [f'Rank {num} - {num + 1}' for num in list(rep_rank.keys())])
+        with timed('figure.encode'):
+            return figures.encode(fig)
 
-        plt.title('Amount of Reputation to get from each rep rank to the next', fontsize = 15)
-        plt.ylabel('Reputation Points', fontsize = 15, labelpad = 10)
-        plt.xlabel('Rank Increments', fontsize = 15, labelpad = 10)
-        return st.pyplot(fig)
 
-    def percent_plot():
-        plt.style.use('ggplot')
-        fig, ax = plt.subplots(figsize = (12, 6), dpi = 300)
+# Table of the rep completed and left
+@derived
+@shared
+def progress_table(total_rep, rep_left, rep_percent):
+    quest_series = pd.Series(index = ['Percent completed', 'Percent left'], data = [rep_percent, 100 - rep_percent])
+    rep_dict = {'Reputation Points': [round(total_rep, 0), round(rep_left, 0)],
+                'Percentage (%)': list(quest_series)}
+    rep_df = pd.DataFrame(index = ['Rep amount completed', 'Rep amount left'], data = rep_dict)
 
-        plt.bar(rep_comp.keys(), rep_comp.values(), color = 'b', alpha = 0.5)
-        ax.bar_label(ax.containers[0], fmt = '%.2f%%')
+    # Adjust formatting of cells
+    rep_df['Reputation Points'] = rep_df['Reputation Points'].astype(int)
+    bold_headers = [f'<b>{item}<b>' for item in (['Total Rep Amount'] + list(rep_df.columns))]
 
-        plt.xticks(ticks = list(rep_comp.keys()), 
-                   labels = [f'Rank {num} - {num + 1}' for num in list(rep_comp.keys())])
+    # Create figure
+    with timed('plotly.progress_table'):
+        fig = go.Figure(data = [go.Table(columnwidth = [1, 1, 1],
 
-        plt.title('Percentage of total rep contained in each rank increment', fontsize = 15)
-        plt.ylabel('Percentage', fontsize = 15, labelpad = 10)
-        plt.xlabel('Rank Increments', fontsize = 15, labelpad = 10)
-        return st.pyplot(fig)
-    
-    def cumulative_plot():
-        plt.style.use('seaborn-whitegrid')
-        fig, ax = plt.subplots(figsize = (12, 6), dpi = 300)
+                                         header = dict(values = bold_headers,
+                                                       fill_color = 'paleturquoise',
+                                                       line_color = 'darkslategray',
+                                                       align = 'center',
+                                                       font = dict(color = 'black', 
+                                                                   size = 14, 
+                                                                   family = 'Georgia')),
+
+                                         cells = dict(values = [rep_df.index,
+                                                                rep_df['Reputation Points'],
+                                                                rep_df['Percentage (%)']], 
+                                                      fill_color = 'lavender',
+                                                      line_color = 'darkslategray',
+                                                      align = ['left', 'center'],
+                                                      font = dict(color = ['black'], 
+                                                                  size = [14, 14], 
+                                                                  family = 'Georgia'),
+                                                      height = 25,
+                                                      format = ['', ',', ',.2f']))])
+
+        fig.update_layout(height = 95, width = 700, margin = dict(l = 5, r = 5, t = 5, b = 5))
+    return fig
 
-        plt.plot(rep_cum_comp.keys(), rep_cum_comp.values(), color = 'orange', alpha = 0.75, marker = 'X')
 
-        plt.xticks(ticks = list(rep_cum_comp.keys()))
+# Table of the rep and number of quests needed to reach each rank not reached yet, from the (rank, rep) pairs
+# and quest counts of reputation.progress
+@derived
+@shared
+def quest_table(rep_to_rank, quests_to_rank):
+    q_klist = [f'Rank {i}' for i, _ in rep_to_rank]
+    q_vlist = [need for _, need in rep_to_rank]
+    quest_array = list(quests_to_rank)
 
-        for x, y in zip(rep_cum_comp.keys(), rep_cum_comp.values()):
-            label = f'{round(y, 2)}%'
-            plt.annotate(label, (x, y), xycoords = 'data', textcoords = 'offset points', 
-                         xytext = (0, 5), ha = 'center', fontsize = 10)
+    with timed('plotly.quest_table'):
+        fig = go.Figure(data = [go.Table(columnwidth = [1, 1, 1],
 
-        plt.title('Cumulative Percentage of total rep earned at end of each rank', fontsize = 15)
-        plt.ylabel('Cumulative Percentage', fontsize = 15, labelpad = 10)
-        plt.xlabel('% of total rep earned at start of:', fontsize = 15, labelpad = 10)
-        return st.pyplot(fig)
+                                         header = dict(values = ['To reach:', 
+                                                                 'Rep required',
+                                                                 'No. of Quests required'],
+                                                       fill_color = 'lightcoral',
+                                                       line_color = 'darkslategray',
+                                                       align = 'center',
+                                                       font = dict(color = 'black', 
+                                                                   size = 14, 
+                                                                   family = 'Georgia')),
+
+                                         cells = dict(values = [q_klist, q_vlist, quest_array], 
+                                                      fill_color = 'wheat',
+                                                      line_color = 'darkslategray',
+                                                      align = ['left', 'center'],
+                                                      font = dict(color = ['black'], 
+                                                                  size = [14, 14], 
+                                                                  family = 'Georgia'),
+                                                      height = 25,
+                                                      format = ['', ',', ',']))]) 
+        fig.update_layout(height = 300, width = 700, margin = dict(l = 5, r = 5, t = 5, b = 5))
+    return fig
+
+
+# Shared by every session, the log keeps its own lock around the SQLite connection
+@st.cache_resource
+def progress_log():
+    return ProgressLog()
+
+
+# Samples one session may log, on top of the per-player limit of the log itself
+MAX_LOGS_PER_SESSION = 50
+
+
+def tracker(total_rep):
+    # Player names are not authenticated, so the tracker is only offered where the deployment allows it
+    if not tracker_allowed():
+        return
+    st.markdown('## Progress Tracker')
+
+    if not st.checkbox('Save my progress on this server to forecast when I reach Rank 10'):
+        st.markdown('Progress tracking is off, nothing you enter on this page is stored.')
+        return
+
+    log = progress_log()
+    player = st.text_input('Player name: ').strip()
+    faction = st.text_input('Faction name: ').strip()
+    if not player or not faction:
+        st.info('Enter a player and faction name to log and view progress.')
+        return
+
+    if st.button('Log current progress'):
+        logged = st.session_state.setdefault('tracker_logs', 0)
+        if logged >= MAX_LOGS_PER_SESSION:
+            st.warning(f'You can log progress at most {MAX_LOGS_PER_SESSION} times per session.')
+        else:
+            try:
+                log.add(player, faction, int(total_rep))
+            except ValueError as e:
+                st.warning(str(e))
+            else:
+                st.session_state['tracker_logs'] = logged + 1
+                st.success('Logged **{:,}** total rep for {} ({}).'.format(int(total_rep), faction, player))
+
+    stats = log.stats(player, faction)
+    if stats is None:
+        st.markdown('Nothing logged yet for this faction.')
+        return
+
+    last_rank = int(reputation.rank_of(stats['last_rep']))
+    st.markdown('Last logged: **Rank {}** with **{:,}** total rep, from {} sample(s).'.format(last_rank, stats['last_rep'], stats['n_samples']))
+
+    forecast = log.forecast(player, faction)
+    if forecast is None:
+        st.markdown('Log progress on at least two different occasions with rep gained in between to get a forecast.')
+    elif forecast['rep_left'] == 0:
+        st.markdown('This faction is already at **Rank 10**.')
+    else:
+        st.markdown('At your recent rate of **{:,.0f}** rep per day, you should reach Rank 10 in about **{:,.1f}** day(s), around **{}**.'
+                    .format(forecast['rate'], forecast['days_left'], forecast['date'].strftime('%d %B %Y')))
+
+    history = pd.DataFrame(log.history(player, faction), columns = ['Time', 'Total rep'])
+    if len(history) > 1:
+        history['Time'] = pd.to_datetime(history['Time'], unit = 's')
+        st.line_chart(history, x = 'Time', y = 'Total rep')
+
+
+def batch():
+    st.markdown('---')
+    st.markdown('## Batch Reputation Progress')
+
+    st.markdown('Track the reputation progress of many players across many factions at once by uploading a CSV file with one row per player and faction. The file needs the following columns:')
+    st.markdown('- `player`, `faction`: Names of the player and the reputation faction')
+    st.markdown('- `rank`, `rep`: Current rank and the current amount of rep within that rank')
+    st.markdown('- `quest_rep`: Reputation points provided by the quest(s) the player plans to repeat')
+    st.markdown('- *(Optional)* `item_boost` (in %), `rep_boost` (Yes/No) and `server_boost` (1, 2 or 3)')
+
+    uploaded = st.file_uploader('Upload CSV file', type = ['csv'])
+    if uploaded is None:
+        st.markdown('---')
+        return
+
+    try:
+        results = reputation.batch_progress(pd.read_csv(uploaded))
+    except (ValueError, pd.errors.ParserError) as e:
+        st.error(f'Could not read the file: {e}')
+        return
+
+    st.subheader('Results')
+    st.markdown(f'Progress for **{len(results):,}** row(s), with the number of quests required to reach each rank:')
+    st.dataframe(results, use_container_width = True)
+
+    st.download_button('Download results as CSV', results.to_csv(index = False).encode(), 
+                       file_name = 'reputation_progress.csv', mime = 'text/csv')
+    st.markdown('---')
+
+
+def planner():
+    st.markdown('---')
+    st.markdown('## Multi-faction Farming Planner')
+
+    st.markdown('Plan the fastest way to reach your target ranks in several factions at once. List the quests you can farm with the time each completion takes (in minutes) and the reputation it gives to each faction. Quests on shared maps can give reputation to several factions at once. The planner then finds how many times to complete each quest so that every target is reached in the least amount of time.')
+
+    # Quest catalog: one column of base rep per faction
+    st.subheader('Quest Catalog')
+    uploaded = st.file_uploader('Upload a quest catalog as a CSV file (columns: quest, minutes, then one column per faction)', type = ['csv'])
+    if uploaded is not None:
+        try:
+            catalog = pd.read_csv(uploaded)
+        except (ValueError, pd.errors.ParserError) as e:
+            st.error(f'Could not read the file: {e}')
+            return
+    else:
+        catalog = pd.DataFrame({'quest': ['Quest A', 'Quest B', 'Quest C (shared map)'],
+                                'minutes': [2.0, 3.0, 4.0],
+                                'Faction 1': [400, 0, 300],
+                                'Faction 2': [0, 500, 300]})
+
+    catalog = st.data_editor(catalog, num_rows = 'dynamic', use_container_width = True, key = 'planner_catalog')
+    factions = [col for col in catalog.columns if col not in ['quest', 'minutes']]
+    if not factions:
+        st.error('The quest catalog needs at least one faction column.')
+        return
+
+    # Current and target rank for each faction
+    st.subheader('Targets')
+    targets = pd.DataFrame({'faction': factions, 'rank': 1, 'rep': 0, 'target_rank': reputation.MAX_RANK})
+    targets = st.data_editor(targets, disabled = ['faction'], hide_index = True, use_container_width = True, key = 'planner_targets',
+                             column_config = {'rank': st.column_config.NumberColumn(min_value = 1, max_value = 10, step = 1),
+                                              'rep': st.column_config.NumberColumn(min_value = 0, step = 1),
+                                              'target_rank': st.column_config.NumberColumn(min_value = 1, max_value = 10, step = 1)})
+
+    st.subheader('Rep-boosting inputs')
+    item_boost = st.number_input('Input the reputation percentage increase from rep-boosting items (in %): ', 
+                                 min_value = 0, max_value = 100, value = 0, step = 1, key = 'planner_item_boost')
+    rep_boost = st.selectbox('Are you using a reputation boost right now?', ['No', 'Yes'], key = 'planner_rep_boost') == 'Yes'
+    server_boost = {'No': 1, 'Yes (2x)': 2, 'Yes (3x)': 3}[st.selectbox('Is there a server boost going on right now?', 
+                                                                        ['No', 'Yes (2x)', 'Yes (3x)'], key = 'planner_server_boost')]
+
+    if st.button('Plan'):
+        try:
+            plan, total_minutes = farm_planner.plan_catalog(catalog.dropna(subset = ['quest', 'minutes']),
+                                                            {row.faction: (int(row.rank), int(row.rep), int(row.target_rank)) for row in targets.itertuples()},
+                                                            reputation.boosted_quest_rep(1, item_boost, rep_boost, server_boost))
+        except ValueError as e:
+            st.error(f'Could not plan: {e}')
+            return
+
+        st.subheader('Results')
+        st.dataframe(plan, hide_index = True, use_container_width = True)
+        st.markdown(f'Following this plan takes about **{total_minutes / 60:,.1f}** hour(s) of farming, with **{int(plan["completions"].sum()):,}** quest completion(s) in total.')
+
+    st.markdown('---')
+
+        
+def desc():
+    st.markdown('---')
+    st.markdown('## Reputation in AQWorlds: A Comprehensive Visualisation')
+    st.markdown('Reputation in AdventureQuest Worlds consitutes a total of 10 ranks, with each rank requiring an increasing amount of reputation to reach the next rank. This aims to be a visual guide to the reputation required to reach rank 10 for anyone interested.')
     
     # User view
     st.markdown('### Quick View: Basic graph')
     st.markdown('This graph shows the raw amount of reputation required to reach the next rank, based on in-game data. From the graph it is clear that the bulk of the reputation required increases at an increasing rate.')
-    original_plot()
+    st.image(chart_bytes('original'), use_column_width = True)
     
     st.markdown('### Quick View: Basic graph with percentages')
     st.markdown('This shows a more comprehsive view of the reputation required to reach Rank 10 in a reputation as it shows the percentage that the transition between each rank up takes up compared to the total amount of reputation required. From the graph we can observe that the reputation gained from Ranks 1 to 7 is less than half of the total reputation required to reach rank 10, with the reputation gained from Ranks 8 to 10 having the bulk of the reputation required to reach the maximum rank.')
-    percent_plot()
+    st.image(chart_bytes('percent'), use_column_width = True)
     
     st.markdown('### Cumulative percentage of reputation')
     st.markdown('Finally, this shows the cumulative percentage of rep earned at the start of each rank. For example, the point for Rank 4 on this graph will include the reputations earned from only Ranks 1 to 3 as a percentage of the total reputation required to reach Rank 10. This graph really puts the grind for reputation into perspective, as it shows the median (or 50%) of all total reputation required to reach Rank 10 in between Ranks 8 and 9. We can hence conclude that farming reputation to Rank 10 in AQWorlds gets exponentially more time-consuming as the reputation rank increases.')
-    cumulative_plot()
+    st.image(chart_bytes('cumulative'), use_column_width = True)
         
     st.markdown('*All reputation information, calculations are graphs may be subject to future changes. This website may have not been updated to the latest information about reputation in-game.*')
     
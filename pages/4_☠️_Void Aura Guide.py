@@ -1,10 +1,20 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import numpy.random as rd
-import seaborn as sns
 
+from aqw_app import figures
+from aqw_app.derived import derived, show_counters
+from aqw_app.lazy import lazy_import
+from aqw_app.profiling import profiled, timed
+from aqw_app.shared_cache import shared, show_stats
+from aqw_stats.density import kde
+from aqw_stats.void_aura import exact_days, median_days, sample_days, simulate_days, weekly_calendar
+from aqw_stats.void_aura_table import days_stats, days_summary, load_table
 
+# Plotting libraries are only imported once the plot is viewed
+pd = lazy_import('pandas')
+
+
+@profiled('Void Aura Guide')
 def main():
     st.title('AQWorlds Void Aura Guide')
     st.markdown('### Void Aura Statistics in AQWorlds')
@@ -15,6 +25,7 @@ def main():
     st.markdown("- Whether the Daily Quest **_'The Encroaching Shadows (Daily)'_**,  **_'Glimpse Into The Dark (Daily)'_** or both quests are completed every day")
 
     topics = ['Void Aura Days Estimator', 
+              'Boost Calendar Simulator',
               'FAQ']
 
     topic = st.selectbox('Select a topic: ', topics)
@@ -24,8 +35,123 @@ def main():
     if topic == topics[0]:
         analysis()
     elif topic == topics[1]:
+        calendar()
+    elif topic == topics[2]:
         faq()
 
+    show_counters()
+    show_stats()
+
+
+SAMPLING_LABELS = {'sobol': 'Quasi-Monte Carlo (scrambled Sobol)',
+                   'stratified': 'Stratified (Latin hypercube)',
+                   'antithetic': 'Antithetic pairs',
+                   'random': 'Independent random draws'}
+
+
+# Precomputed statistics for every input combination, memory-mapped once per process (None if not built)
+@st.cache_resource
+def days_table():
+    return load_table()
+
+
+# Exact statistics with and without the boost, read from the precomputed table when it has been built
+@shared
+def exact_stats(current, quests_per_day, dq_bonus):
+    with timed('exact.days_stats'):
+        return (days_stats(current, quests_per_day, dq_bonus, False, days_table()),
+                days_stats(current, quests_per_day, dq_bonus, True, days_table()))
+
+
+# Statistics and density curves of the days to reach the goal from the mean of 10 simulated quest turn-ins,
+# with and without the boost, both drawn from a single seeded generator. The simulation is either
+# ('fixed', n_samples, seed) or ('converged', sampling method, tolerance in days, seed), the latter drawing
+# samples until the median's 95% confidence interval is narrow enough. The samples themselves are dropped.
+@shared
+def simulated_stats(amt_farm, quests_per_day, dq_bonus, simulation):
+    kind, *settings, seed = simulation
+    rng = np.random.default_rng(seed)
+    with timed('mean_aura simulation'):
+        if kind == 'fixed':
+            runs = [{'samples': sample_days(amt_farm, quests_per_day, dq_bonus, boost, settings[0], seed = rng)}
+                    for boost in (False, True)]
+        else:
+            sampling_method, tol = settings
+            runs = [median_days(amt_farm, quests_per_day, dq_bonus, boost, tol = tol, method = sampling_method, seed = rng)
+                    for boost in (False, True)]
+
+    summaries = []
+    for run in runs:
+        days = run.pop('samples')
+        # Same curves as seaborn's kdeplot, computed from the samples
+        with timed('density.kde'):
+            grid, density = kde(days)
+        summaries.append({**run, 'p50': np.median(days), 'std': np.std(days), 'min': np.min(days), 'max': np.max(days),
+                          'grid': grid, 'density': density})
+    return tuple(summaries)
+
+
+# Plotting the 2 graphs: With and without Void Aura Boosts, from the exact distributions or, given the
+# settings of simulated_stats, from simulated ones. Everything is computed before the figure is created, as
+# figures are drawn one at a time across sessions.
+@derived
+@shared
+def days_image(current, quests_per_day, dq_bonus, simulation = None):
+    amt_farm = 7500 - current
+
+    if simulation is None:
+        stats_ord, stats_boost = exact_stats(current, quests_per_day, dq_bonus)
+        xi, xi2 = stats_ord['p50'], stats_boost['p50']
+
+        # Exact probability of reaching the goal on each day, from the distribution of auras earned per quest
+        with timed('exact.exact_days'):
+            dist_ord = exact_days(amt_farm, quests_per_day, dq_bonus, False)
+            dist_boost = exact_days(amt_farm, quests_per_day, dq_bonus, True)
+
+        curves = [(dist_ord.days, dist_ord.pmf), (dist_boost.days, dist_boost.pmf)]
+        style = {'marker': '.'}
+        ylabel = 'Probability Mass Function (PMF)'
+        yi = dist_ord.pmf[xi - dist_ord.days[0]]
+        yi2 = dist_boost.pmf[xi2 - dist_boost.days[0]]
+
+    else:
+        stats_ord, stats_boost = simulated_stats(amt_farm, quests_per_day, dq_bonus, simulation)
+        xi, xi2 = stats_ord['p50'], stats_boost['p50']
+
+        curves = [(stats_ord['grid'], stats_ord['density']), (stats_boost['grid'], stats_boost['density'])]
+        style = {}
+        ylabel = 'Probability Density Function (PDF)'
+        # Density at the median of each curve
+        yi = np.interp(xi, stats_ord['grid'], stats_ord['density'])
+        yi2 = np.interp(xi2, stats_boost['grid'], stats_boost['density'])
+
+    with figures.figure((12, 10), 'seaborn-whitegrid') as fig:
+        with timed('figure.subplots'):
+            ax = fig.subplots()
+
+        for (x, y), label, color in zip(curves, ['Without Void Aura Boost', 'With Void Aura Boost'], ['red', 'blue']):
+            ax.plot(x, y, label = label, color = color, **style)
+        ax.set_ylabel(ylabel, fontsize = 15, labelpad = 10)
+
+        ax.set_title(f'Expected number of days to reach 7500 Void Auras from {current} Void Auras', fontsize = 18)
+        ax.set_xlabel('Estimated number of days to reach goal', fontsize = 15, labelpad = 10)
+
+        # Marking the median number of days on each curve
+        ax.plot(xi, yi, marker = 'o', color = 'black')
+        ax.plot(xi2, yi2, marker = 'o', color = 'black')
+
+        # Labelling maximum points
+        ax.text(xi, yi, '~ {} day(s)'.format(int(np.ceil(xi))), fontsize = 15, color = 'r', ha = 'left', va = 'bottom')
+        ax.text(xi2, yi2, '~ {} day(s)'.format(int(np.ceil(xi2))), fontsize = 15, color = 'b', ha = 'left', va = 'bottom')
+
+        # Adjusting Plot Legend
+        legend = ax.legend(loc = 'upper left', frameon = 1, framealpha = 1, fontsize = 15)
+        frame = legend.get_frame()
+        frame.set_facecolor('lightcyan')
+        frame.set_edgecolor('black')
+        with timed('figure.encode'):
+            return figures.encode(fig)
+
 
 def analysis():
     st.markdown('### User Inputs:')
@@ -39,21 +165,7 @@ def analysis():
     dq_options = ['The Encroaching Shadows (Daily) - [Non-Member]', 'Glimpse Into The Dark (Daily) - [Member Only]', 'Both Daily Quests', 'None']
     dq_choice = st.selectbox('Which Daily Quest do you plan to do every day?', dq_options)
 
-    # Define a function to return the mean number of Void Auras from a sample of n, depending on whether there is a Void Aura boost
-    def mean_aura(n, boost_status):
-
-        aura_list = []
-        if boost_status == True:
-            for i in range(0, n):
-                x = np.random.choice(np.array([5, 10, 20]), p = [1/3, 1/3, 1/3])
-                aura_list.append(x)
-
-        elif boost_status == False:
-            for i in range(0, n):
-                x = np.random.choice(np.array([5, 6, 7]), p = [1/3, 1/3, 1/3])
-                aura_list.append(x)
-
-        return np.mean(aura_list)
+    dq_bonus = {dq_options[0]: 50, dq_options[1]: 100, dq_options[2]: 150, dq_options[3]: 0}[dq_choice]
 
     amt_req = 7500
     amt_farm = amt_req - current
@@ -63,66 +175,43 @@ def analysis():
     plot_graph = st.button('View Plot')
     st.markdown('---')
 
-    # Simulation of the mean number of auras among 10 quest turn-ins with a sample size of n = 100
-    x_ord = np.array([mean_aura(10, False) for i in range(0, 100)])
-    y_ord = np.ceil(amt_farm / x_ord)
-
-    x_boost = np.array([mean_aura(10, True) for i in range(0, 100)])
-    y_boost = np.ceil(amt_farm / x_boost)
-
-    # Obtaining values used for the KDE Plots
-    if dq_choice == dq_options[0]:
-        exp_days_ord = amt_farm / ((quests_per_day *  x_ord) + 50)
-        exp_days_boost = amt_farm / ((quests_per_day * x_boost) + 50)
-        
-    elif dq_choice == dq_options[1]:
-        exp_days_ord = amt_farm / ((quests_per_day *  x_ord) + 100)
-        exp_days_boost = amt_farm / ((quests_per_day * x_boost) + 100)
-
-    elif dq_choice == dq_options[2]:
-        exp_days_ord = amt_farm / ((quests_per_day *  x_ord) + 150)
-        exp_days_boost = amt_farm / ((quests_per_day * x_boost) + 150)
-
-    elif dq_choice == dq_options[3]:
-        exp_days_ord = amt_farm / (quests_per_day *  x_ord)
-        exp_days_boost = amt_farm / (quests_per_day * x_boost)
-        
-    st.markdown('### Data Visualisation')
-
-    # Plotting the 2 graphs: With and without Void Aura Boosts
-    plt.style.use('seaborn-whitegrid')
-    fig, ax = plt.subplots(figsize = (12, 10), dpi = 300)
-
-    ax = sns.kdeplot(data = exp_days_ord, label = 'Without Void Aura Boost', color = 'red')
-    ax2 = sns.kdeplot(data = exp_days_boost, label = 'With Void Aura Boost', color = 'blue')
-
-    plt.title(f'Expected number of days to reach 7500 Void Auras from {current} Void Auras', fontsize = 18)
-    plt.xlabel('Estimated number of days to reach goal', fontsize = 15, labelpad = 10)
-    plt.ylabel('Probability Density Function (PDF)', fontsize = 15, labelpad = 10) 
-
-    # Obtain x and y values of maximum points to plot the expected number of days
-    data_x, data_y = ax.lines[0].get_data()
-    xi = np.median(exp_days_ord)
-    yi = np.interp(xi, data_x, data_y)
-    plt.plot(xi, yi, marker = 'o', color = 'black')
+    methods = ['Exact distribution', 'Monte Carlo simulation']
+    method = st.sidebar.radio('Choose the method used to estimate the number of days:', methods)
 
-    data_x2, data_y2 = ax2.lines[1].get_data()
-    xi2 = np.median(exp_days_boost)
-    yi2 = np.interp(xi2, data_x2, data_y2)
-    plt.plot(xi2, yi2, marker = 'o', color = 'black')
+    # Statistics are computed without matplotlib, the figure is only built when it is shown
+    if method == methods[0]:
+        simulation = None
+        stats_ord, stats_boost = exact_stats(current, quests_per_day, dq_bonus)
 
-    # Labelling maximum points
-    plt.text(xi, yi, '~ {} day(s)'.format(int(np.ceil(xi))), fontsize = 15, color = 'r', ha = 'left', va = 'bottom')
-    plt.text(xi2, yi2, '~ {} day(s)'.format(int(np.ceil(xi2))), fontsize = 15, color = 'b', ha = 'left', va = 'bottom')
+    else:
+        # Simulation settings
+        st.sidebar.markdown('**Simulation Settings:**')
+        sampling = st.sidebar.radio('How many samples are drawn:', ['A fixed number', 'Until the median is precise'])
+
+        if sampling == 'A fixed number':
+            n_samples = st.sidebar.select_slider('Number of simulated samples:', 
+                                                 options = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], 
+                                                 value = 10 ** 5,
+                                                 format_func = lambda n: f'{n:,}')
+            settings = ('fixed', n_samples)
+        else:
+            sampling_method = st.sidebar.selectbox('Sampling method:', list(SAMPLING_LABELS), format_func = SAMPLING_LABELS.get)
+            tol = st.sidebar.number_input("Widest 95% confidence interval of the median (in days):", min_value = 0.01, max_value = 100.0, value = 0.5, step = 0.1)
+            settings = ('converged', sampling_method, tol)
+        seed = st.sidebar.number_input('Random seed:', min_value = 0, max_value = 2 ** 32 - 1, value = 0, step = 1)
+
+        simulation = settings + (seed,)
+        stats_ord, stats_boost = simulated_stats(amt_farm, quests_per_day, dq_bonus, simulation)
+
+    xi, xi2 = stats_ord['p50'], stats_boost['p50']
+    std_ord, std_boost = stats_ord['std'], stats_boost['std']
+    range_ord = (stats_ord['min'], stats_ord['max'])
+    range_boost = (stats_boost['min'], stats_boost['max'])
 
-    # Adjusting Plot Legend
-    legend = plt.legend(loc = 'upper left', frameon = 1, framealpha = 1, fontsize = 15)
-    frame = legend.get_frame()
-    frame.set_facecolor('lightcyan')
-    frame.set_edgecolor('black')
+    st.markdown('### Data Visualisation')
 
     if plot_graph:
-        st.pyplot(fig)
+        figures.display(*days_image(current, quests_per_day, dq_bonus, simulation))
     else:
         st.markdown('Click the *View Plot* button to view the visualisation for the approximate number of days to reach 7,500 Void Auras.')
 
@@ -132,13 +221,15 @@ def analysis():
 
     st.markdown('#### Without Void Aura Boost')
     st.markdown('Expected Number of Days: **{}**'.format(int(np.ceil(xi))))
-    st.markdown('Standard Deviation: **{}**'.format(round(np.std(exp_days_ord), 3)))
-    st.markdown(f'Range of possible days to complete all quests: **[{round(np.min(exp_days_ord), 2)}, {round(np.max(exp_days_ord), 2)}]**')
+    st.markdown('Standard Deviation: **{}**'.format(round(std_ord, 3)))
+    precision(stats_ord)
+    st.markdown(f'Range of possible days to complete all quests: **[{round(range_ord[0], 2)}, {round(range_ord[1], 2)}]**')
 
     st.markdown('#### With Void Aura Boost')
     st.markdown('Expected Number of Days: **{}**'.format(int(np.ceil(xi2))))
-    st.markdown('Standard Deviation: **{}**'.format(round(np.std(exp_days_boost), 3)))
-    st.markdown(f'Range of possible days to complete all quests: **[{round(np.min(exp_days_boost), 2)}, {round(np.max(exp_days_boost), 2)}]**')
+    st.markdown('Standard Deviation: **{}**'.format(round(std_boost, 3)))
+    precision(stats_boost)
+    st.markdown(f'Range of possible days to complete all quests: **[{round(range_boost[0], 2)}, {round(range_boost[1], 2)}]**')
 
     dif = int(np.ceil(xi)) - int(np.ceil(xi2))
 
@@ -147,6 +238,69 @@ def analysis():
     st.markdown('Time spent farming reduced by **{}%**'.format(round(dif/int(np.ceil(xi))*100, 2)))
     st.markdown('---')
 
+
+# Confidence interval of the simulated median, for simulations run until it is precise enough
+def precision(stats):
+    if 'n_samples' not in stats:
+        return
+    note = '' if stats['converged'] else ' (stopped at the sample limit before reaching the requested width)'
+    st.markdown(f"Median: **{stats['median']:.2f}** days, 95% confidence interval **[{stats['ci_low']:.2f}, {stats['ci_high']:.2f}]** from **{stats['n_samples']:,}** samples{note}")
+
+
+def calendar():
+    st.markdown('### Farming Schedule:')
+    st.markdown('Real farms mix normal days with Void Aura Boost events and server boost weekends. Set up a weekly schedule below and many farms are simulated day by day, each stopping on the day it reaches 7,500 Void Auras.')
+
+    current = st.number_input('Choose the amount of Void Auras you currently have:', min_value = 0, max_value = 7499, 
+                        value = 500, step = 1)
+    amt_farm = 7500 - current
+
+    weekday_quests = st.number_input('Quests completed per weekday (Monday to Friday):', min_value = 0, max_value = 500, value = 5, step = 1)
+    weekend_quests = st.number_input('Quests completed per weekend day:', min_value = 0, max_value = 500, value = 10, step = 1)
+
+    dq_options = ['The Encroaching Shadows (Daily) - [Non-Member]', 'Glimpse Into The Dark (Daily) - [Member Only]', 'Both Daily Quests', 'None']
+    dq_choice = st.selectbox('Which Daily Quest do you plan to do every day?', dq_options)
+    dq_bonus = {dq_options[0]: 50, dq_options[1]: 100, dq_options[2]: 150, dq_options[3]: 0}[dq_choice]
+
+    server_boost = st.selectbox('Is there a server boost on weekends?', ['No', 'Yes (2x)', 'Yes (3x)'])
+    weekend_multiplier = {'No': 1, 'Yes (2x)': 2, 'Yes (3x)': 3}[server_boost]
+
+    boost_event = st.checkbox('A Void Aura Boost event is scheduled')
+    boost_start, boost_days = 0, 0
+    if boost_event:
+        boost_start = st.number_input('Days from today until the boost starts:', min_value = 0, max_value = 365, value = 7, step = 1)
+        boost_days = st.number_input('Length of the boost (in days):', min_value = 1, max_value = 30, value = 3, step = 1)
+
+    st.sidebar.markdown('**Simulation Settings:**')
+    n_paths = st.sidebar.select_slider('Number of simulated farms:', 
+                                       options = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], 
+                                       value = 10 ** 5,
+                                       format_func = lambda n: f'{n:,}')
+    seed = st.sidebar.number_input('Random seed:', min_value = 0, max_value = 2 ** 32 - 1, value = 0, step = 1)
+
+    if weekday_quests == 0 and weekend_quests == 0 and dq_bonus == 0:
+        st.warning('No Void Auras are earned with this schedule.')
+        return
+
+    # The calendar covers the slowest possible farm, so the boost event is never repeated
+    min_week = 5 * (weekday_quests * 5 + dq_bonus) + 2 * (weekend_quests * 5 * weekend_multiplier + dq_bonus)
+    n_days = max(7 * -(-amt_farm // min_week), boost_start + boost_days)
+    with timed('simulate_days'):
+        dist = simulate_days(amt_farm, weekly_calendar(n_days, weekday_quests, weekend_quests, weekend_multiplier, boost_start, boost_days), dq_bonus, n_paths, seed = seed)
+    stats = days_summary(dist)
+
+    st.markdown('---')
+    st.markdown('### Days to reach 7,500 Void Auras')
+    st.bar_chart(pd.DataFrame({'Probability': dist.pmf}, index = pd.Index(dist.days, name = 'Day')))
+
+    st.markdown('Median Number of Days: **{}**'.format(stats['p50']))
+    st.markdown('Mean Number of Days: **{}**'.format(round(stats['mean'], 2)))
+    st.markdown('Standard Deviation: **{}**'.format(round(stats['std'], 3)))
+    st.markdown(f"90% of farms finish between day **{stats['p05']}** and day **{stats['p95']}**, the fastest after **{stats['min']}** and the slowest after **{stats['max']}** day(s).")
+    st.markdown('Days count from today, which is taken to be a Monday.')
+    st.markdown('---')
+
+
 def faq():                                                                                                     
     st.markdown('## Frequently Asked Questions (FAQ):')
 
@@ -156,8 +310,15 @@ def faq():
     st.markdown('**What does the horizontal axis measure?**')
     st.markdown('- It measures the days it will take to obtain all the necessary resources. A graph with a wider range indicates that there is a greater possible range of days that it may take to obtain all the necessary resources.') 
             
-    st.markdown('**How did you create this simulation?**')
-    st.markdown('- I simulated the completion of the basic quest (which gave 5/6/7 Void Auras each time) 10 times and took the mean. Then I repeated this until I had a sample size of 100, and then I found the average number of days for each of those 100 instances before grouping the data into kernel density estimate **(KDE)** plots to visualise the distribution of observations in my dataset. I repeat this twice, once for normal rates and once during a Void Aura Boost (5/10/20).')
+    st.markdown('**How is the exact distribution calculated?**')
+    st.markdown('- Every quest turn-in gives 5/6/7 Void Auras (or 5/10/20 during a Void Aura Boost) with equal probability, so the number of Void Auras earned in a day is the sum of that many turn-ins plus the Daily Quest reward. Its distribution is obtained by convolving the reward probabilities with each other, and then convolving day after day until the target is reached. This gives the exact probability of reaching 7,500 Void Auras on each day, so the results are the same every time you visit the page.')
+
+    st.markdown('**How does the Boost Calendar Simulator work?**')
+    st.markdown("- Each simulated farm follows the schedule one day at a time. A day's Void Auras are drawn from the exact distribution of that day's quest turn-ins, with the Void Aura Boost rewards on event days and the server boost multiplier on weekends, and a farm stops on the day it reaches 7,500. The chart shows the share of farms finishing on each day.")
+
+    st.markdown('**How did you create the Monte Carlo simulation?**')
+    st.markdown('- I simulated the completion of the basic quest (which gave 5/6/7 Void Auras each time) 10 times and took the mean. Then I repeated this until I had the sample size chosen in the sidebar (100,000 by default), and then I found the average number of days for each of those instances before grouping the data into kernel density estimate **(KDE)** plots to visualise the distribution of observations in my dataset. I repeat this twice, once for normal rates and once during a Void Aura Boost (5/10/20).')
+    st.markdown("- Instead of a fixed sample size, the sidebar can keep drawing samples until the median number of days is known precisely: the sample size doubles until the median's 95% confidence interval is narrower than the width you ask for. The turn-ins can then be drawn as quasi-random (Sobol) points, stratified or in antithetic pairs, which spread the draws over the 5/6/7 and 5/10/20 rewards more evenly than independent draws do. The interval and the number of samples used are shown under each statistical summary.")
                                                                                                         
     st.markdown('---')
 
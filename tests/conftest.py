@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The tests import aqw_stats and aqw_app from the repository root, however pytest is started
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,60 @@
+import io
+import json
+
+import pytest
+
+from aqw_stats import geometric
+from aqw_stats.batch import run_csv, run_jsonl
+from aqw_stats.reputation import progress
+
+
+def _jsonl(*queries):
+    out = io.StringIO()
+    run_jsonl([json.dumps(query) + '\n' for query in queries], out, table_path = None)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_drop():
+    [result] = _jsonl({'id': 7, 'query': 'drop', 'rate': 2})
+    stats = geometric.summary(0.02)
+    assert result['id'] == 7
+    assert result['mean'] == pytest.approx(stats['mean'])
+    assert result['median'] == stats['median']
+
+
+# Rates the pages don't accept are errors, 100% used to fail inside geometric with a math domain error
+@pytest.mark.parametrize('rate', [100, 0, 0.001, 96, -1])
+def test_drop_rejects_rates_outside_the_page_range(rate):
+    [result] = _jsonl({'query': 'drop', 'rate': rate})
+    assert result == {'error': 'rate must be a percentage from 0.01 to 95'}
+
+
+def test_reputation_matches_progress():
+    [result] = _jsonl({'query': 'reputation', 'rank': '6', 'rep': 100, 'quest_rep': 400, 'server_boost': 2})
+    expected = progress(6, 100, 400, server_boost = 2)
+    assert result['total_rep'] == expected['total_rep']
+    assert result['quests_left'] == expected['quests_left']
+    assert result['quests_to_rank_7'] == expected['quests_to_rank'][7]
+
+
+@pytest.mark.parametrize('field, value', [('rank', 6.5), ('rank', '6.5'), ('rep', 0.5), ('server_boost', 1.5)])
+def test_whole_number_fields_are_not_truncated(field, value):
+    query = {'query': 'reputation', 'rank': 6, 'rep': 0, field: value}
+    [result] = _jsonl(query)
+    assert result['error'].startswith(f"Field '{field}'")
+
+
+def test_errors_do_not_stop_the_batch():
+    results = _jsonl({'query': 'drop', 'rate': 'abc'}, {'query': 'nope'}, {'query': 'reputation', 'rank': 6},
+                     {'query': 'drop', 'rate': 5})
+    assert [sorted(result) == ['error'] for result in results] == [True, True, True, False]
+    assert "Missing field 'rep'" in results[2]['error']
+
+
+def test_csv():
+    out = io.StringIO()
+    run_csv(io.StringIO('player,rank,rep,quest_rep\na,6,100,400\nb,6.5,0,400\n'), out, 'reputation', table_path = None)
+    rows = out.getvalue().splitlines()
+    assert rows[0].startswith('player,rank,rep,quest_rep,total_rep')
+    assert rows[1].startswith('a,6,100,400,44200,')
+    assert 'is not a whole number' in rows[2]
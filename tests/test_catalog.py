@@ -0,0 +1,57 @@
+import pytest
+
+from aqw_stats import geometric
+from aqw_stats.catalog import MAX_RATE, MIN_RATE, Catalog, build_arrays, build_catalog, load_catalog, read_source
+
+ITEMS = [('Dark Unicorn Rib', 2.0, 'Dark Unicorn', 'Ashfall'),
+         ('Runes of Awe', 1.0, '', ''),
+         ('Burning Blade of Abezeth', 5.0, '', ''),
+         ('Doom Heart', 0.5, '', '')]
+
+
+def _write(path, rows):
+    path.write_text('name,drop_rate,monster,map\n' + ''.join(f'{row}\n' for row in rows), encoding = 'utf-8')
+    return str(path)
+
+
+def test_read_source(tmp_path):
+    path = _write(tmp_path / 'items.csv', ['  Doom   Heart ,0.5,,', 'Dark Unicorn Rib,2,Dark Unicorn,Ashfall'])
+    assert read_source(path) == [('Doom Heart', 0.5, '', ''), ('Dark Unicorn Rib', 2.0, 'Dark Unicorn', 'Ashfall')]
+
+
+# Each bad row is reported with its line in the file, the header being line 1
+@pytest.mark.parametrize('row', [',5,,', 'Item,,,', 'Item,abc,,', 'Item,0,,', 'Item,100,,', f'Item,{MAX_RATE + 0.01},,',
+                                 f'Item,{MIN_RATE / 2},,', 'Item,nan,,'])
+def test_read_source_rejects_bad_rows(tmp_path, row):
+    path = _write(tmp_path / 'items.csv', ['Doom Heart,0.5,,', row])
+    with pytest.raises(ValueError, match = r':3: '):
+        read_source(path)
+
+
+def test_records_hold_the_summary_statistics():
+    catalog = Catalog(build_arrays(ITEMS))
+    item = catalog.item(catalog.find('dark unicorn  RIB')[0])
+    assert (item['name'], item['rate'], item['monster'], item['map']) == ITEMS[0]
+    stats = geometric.summary(0.02)
+    assert item['stats'] == pytest.approx(stats)
+
+
+def test_search():
+    catalog = Catalog(build_arrays(ITEMS))
+    names = lambda found: [catalog.names[i] for i in found]
+    assert names(catalog.prefix('d')) == ['Dark Unicorn Rib', 'Doom Heart']
+    assert names(catalog.search('blade')) == ['Burning Blade of Abezeth']
+    assert names(catalog.search('unicron')) == ['Dark Unicorn Rib']
+    assert names(catalog.search('rubes of awe'))[0] == 'Runes of Awe'
+    assert len(catalog.search('')) == len(ITEMS)
+    assert catalog.search('zzzz') == []
+
+
+def test_load_catalog_rebuilds_when_the_source_changes(tmp_path):
+    source = _write(tmp_path / 'items.csv', ['Doom Heart,0.5,,'])
+    path = str(tmp_path / 'items.npz')
+    build_catalog(source, path)
+    assert load_catalog(path, source).names == ['Doom Heart']
+
+    _write(tmp_path / 'items.csv', ['Doom Heart,0.5,,', 'Runes of Awe,1,,'])
+    assert load_catalog(path, source).names == ['Doom Heart', 'Runes of Awe']
@@ -0,0 +1,41 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from aqw_stats.collector import independent_cdf, independent_expected, independent_ppf, one_drop_expected
+
+PROBS = [0.05, 0.2, 0.01]
+
+
+def _subsets(probs):
+    for r in range(1, len(probs) + 1):
+        for subset in itertools.combinations(probs, r):
+            yield (-1) ** (r + 1), np.array(subset)
+
+
+def test_independent_cdf_is_the_product_of_single_item_cdfs():
+    n = np.arange(0, 500)
+    expected = np.prod([np.where(n >= 1, 1 - (1 - p) ** n, 0) for p in PROBS], axis = 0)
+    np.testing.assert_allclose(independent_cdf(n, PROBS), expected, atol = 1e-14)
+
+
+# Inclusion-exclusion over the subsets of items, fine for a few items
+def test_expected_kills_match_inclusion_exclusion():
+    independent = sum(sign / (1 - np.prod(1 - subset)) for sign, subset in _subsets(PROBS))
+    one_drop = sum(sign / subset.sum() for sign, subset in _subsets(PROBS))
+    assert independent_expected(PROBS) == pytest.approx(independent, rel = 1e-9)
+    assert one_drop_expected(PROBS) == pytest.approx(one_drop, rel = 1e-9)
+
+
+def test_independent_ppf_is_the_smallest_n_reaching_q():
+    q = np.array([0.1, 0.5, 0.9, 0.99])
+    n = independent_ppf(q, PROBS)
+    assert np.all(independent_cdf(n, PROBS) >= q)
+    assert np.all(independent_cdf(n - 1, PROBS) < q)
+
+
+@pytest.mark.parametrize('probs', [[], [0.1, 0], [1.5]])
+def test_invalid_probabilities(probs):
+    with pytest.raises(ValueError):
+        independent_expected(probs)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from aqw_stats.compound import daily_pmf, days_to_target, sum_pmf
+
+REWARDS = [1, 2, 5]
+PROBS = [0.5, 0.3, 0.2]
+
+
+def _single():
+    single = np.zeros(max(REWARDS) + 1)
+    single[REWARDS] = PROBS
+    return single
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 5, 12])
+def test_sum_pmf_matches_repeated_convolution(n):
+    expected = np.ones(1)
+    for _ in range(n):
+        expected = np.convolve(expected, _single())
+    np.testing.assert_allclose(sum_pmf(REWARDS, PROBS, n), expected, atol = 1e-12)
+
+
+def test_daily_pmf_shifts_by_the_daily_bonus():
+    pmf = daily_pmf(REWARDS, PROBS, 2, daily_bonus = 3)
+    assert pmf[:3].sum() == 0
+    np.testing.assert_allclose(pmf[3:], sum_pmf(REWARDS, PROBS, 2), atol = 1e-12)
+
+
+# P(days > d) is the probability that the total after d days is still below the target
+@pytest.mark.parametrize('target, quests_per_day, daily_bonus', [(40, 2, 0), (75, 3, 2), (1, 1, 0)])
+def test_days_to_target_matches_brute_force(target, quests_per_day, daily_bonus):
+    day = daily_pmf(REWARDS, PROBS, quests_per_day, daily_bonus)
+    survival, total = [1.0], np.ones(1)
+    while survival[-1] > 1e-15:
+        total = np.convolve(total, day)
+        survival.append(total[:target].sum())
+    expected = -np.diff(survival)
+
+    dist = days_to_target(target, REWARDS, PROBS, quests_per_day, daily_bonus)
+    np.testing.assert_allclose(dist.pmf, expected[:len(dist.pmf)], atol = 1e-12)
+    assert dist.pmf.sum() == pytest.approx(1)
+    assert dist.mean() == pytest.approx(np.dot(np.arange(1, len(expected) + 1), expected))
+
+
+def test_days_to_target_needs_a_reward_every_day():
+    with pytest.raises(ValueError):
+        days_to_target(10, [0, 1], [0.5, 0.5], 1)
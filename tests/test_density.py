@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+from scipy.stats import gaussian_kde
+
+from aqw_stats.density import kde, scott_bandwidth
+
+SAMPLE = np.array([1, 2, 2.5, 4, 7])
+
+
+# Density of the Gaussian kernel estimate summed directly over the samples
+def _direct_kde(x, grid, bw):
+    z = (grid[:, None] - x[None, :]) / bw
+    return np.exp(-0.5 * z ** 2).sum(axis = 1) / (len(x) * bw * math.sqrt(2 * math.pi))
+
+
+def test_scott_bandwidth_matches_scipy():
+    assert scott_bandwidth(SAMPLE) == pytest.approx(np.std(SAMPLE, ddof = 1) * 5 ** -0.2)
+    assert scott_bandwidth(SAMPLE) == pytest.approx(gaussian_kde(SAMPLE).factor * np.std(SAMPLE, ddof = 1))
+
+
+def test_kde_pins_the_grid_and_density_of_a_fixed_sample():
+    grid, density = kde(SAMPLE)
+
+    assert len(grid) == len(density) == 200
+    np.testing.assert_allclose(grid[[0, 1, -1]], [-4.07604548, -3.9948792, 12.07604548], rtol = 1e-8)
+    np.testing.assert_allclose(np.diff(grid), np.diff(grid)[0])
+    np.testing.assert_allclose(density[[0, 50, 100, 199]], [0.00062389, 0.08092054, 0.1206819, 0.00052443],
+                               rtol = 1e-5)
+    np.testing.assert_allclose(density, _direct_kde(SAMPLE, grid, scott_bandwidth(SAMPLE)), atol = 1e-6)
+
+
+@pytest.mark.parametrize('bw_adjust', [0.5, 1, 2])
+def test_kde_matches_scipy_on_a_large_sample(bw_adjust):
+    x = np.random.default_rng(0).gamma(3, 2, 10_000)
+    grid, density = kde(x, bw_adjust = bw_adjust)
+    expected = gaussian_kde(x, bw_method = gaussian_kde(x).factor * bw_adjust)(grid)
+
+    np.testing.assert_allclose(density, expected, atol = 1e-5 * expected.max())
+
+
+@pytest.mark.parametrize('cut, tol', [(3, 1e-2), (6, 1e-6)])
+def test_kde_integrates_to_about_1(cut, tol):
+    x = np.random.default_rng(1).normal(10, 3, 1000)
+    grid, density = kde(x, gridsize = 2000, cut = cut)
+
+    assert np.trapz(density, grid) == pytest.approx(1, abs = tol)
+    assert (density >= 0).all()
+
+
+@pytest.mark.parametrize('x', [[1], [2, 2, 2]])
+def test_kde_needs_samples_with_spread(x):
+    with pytest.raises(ValueError, match = 'density estimate'):
+        kde(x)
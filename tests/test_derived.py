@@ -0,0 +1,59 @@
+import pytest
+
+from aqw_app import derived as derived_module
+from aqw_app.derived import counters, derived
+
+
+# Outside `streamlit run` every access gives a fresh session state, so the tests use a plain dict
+@pytest.fixture(autouse = True)
+def session_state(monkeypatch):
+    state = {}
+    monkeypatch.setattr(derived_module.st, 'session_state', state)
+    return state
+
+
+def test_recomputes_only_when_inputs_change():
+    calls = []
+
+    @derived
+    def label(value, unit = '%'):
+        calls.append(value)
+        return f'{value}{unit}'
+
+    assert label(5) == '5%'
+    assert label(5) == '5%'
+    assert calls == [5]
+
+    assert label(5, unit = ' rep') == '5 rep'
+    assert label(6, unit = ' rep') == '6 rep'
+    assert label(6, unit = ' rep') == '6 rep'
+    assert calls == [5, 5, 6]
+    assert counters()[label.derived_name] == (2, 3)
+
+
+# Only the latest value is kept, so going back to earlier inputs recomputes
+def test_keeps_only_the_latest_inputs():
+    calls = []
+
+    @derived
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    for value in [1, 2, 1]:
+        double(value)
+    assert calls == [1, 2, 1]
+
+
+def test_values_are_per_session(session_state, monkeypatch):
+    calls = []
+
+    @derived
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    double(1)
+    monkeypatch.setattr(derived_module.st, 'session_state', {})
+    double(1)
+    assert calls == [1, 1]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from aqw_stats import geometric
+
+RATES = [1e-4, 0.01, 0.25, 0.95]
+
+
+@pytest.mark.parametrize('p', RATES)
+def test_pmf_cdf_sf_match_closed_forms(p):
+    x = np.arange(1, 200)
+    np.testing.assert_allclose(geometric.pmf(x, p), (1 - p) ** (x - 1) * p, rtol = 1e-12)
+    np.testing.assert_allclose(geometric.cdf(x, p), 1 - (1 - p) ** x, rtol = 1e-10)
+    np.testing.assert_allclose(geometric.sf(x, p), (1 - p) ** x, rtol = 1e-10)
+
+
+def test_outside_the_support():
+    assert geometric.pmf(0, 0.1) == 0
+    assert geometric.pmf(2.5, 0.1) == 0
+    assert geometric.cdf(0.5, 0.1) == 0
+    assert geometric.sf(0, 0.1) == 1
+
+
+# The ppf is the smallest try number whose cdf reaches q, up to round-off where it lands exactly on q
+@pytest.mark.parametrize('p', RATES)
+def test_ppf_is_the_smallest_x_reaching_q(p):
+    q = np.array([1e-6, 0.25, 0.5, 0.75, 0.975, 0.99, 0.999])
+    x = geometric.ppf(q, p)
+    assert np.all(geometric.cdf(x, p) >= q - 1e-12)
+    below = x > 1
+    assert np.all(geometric.cdf(x[below] - 1, p) < q[below])
+
+
+def test_summary():
+    stats = geometric.summary(0.02)
+    assert stats['mean'] == pytest.approx(50)
+    assert stats['std'] == pytest.approx(np.sqrt(0.98) / 0.02)
+    assert stats['median'] == geometric.ppf(0.5, 0.02)
+    assert stats['upper'] == geometric.ppf(0.999, 0.02)
@@ -0,0 +1,110 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aqw_stats import planner
+from aqw_stats.reputation import MAX_RANK, MAX_REP, RANK_START
+
+MINUTES = [2, 3, 4]
+QUEST_REP = [[400, 0, 300],
+             [0, 500, 300]]
+
+
+# Fastest plan found by trying every number of completions up to max_count for each quest
+def _brute_force(minutes, quest_rep, needs, max_count = 12):
+    best = None
+    for counts in itertools.product(range(max_count + 1), repeat = len(minutes)):
+        if np.all(np.asarray(quest_rep) @ counts >= needs) and (best is None or np.dot(minutes, counts) < best):
+            best = np.dot(minutes, counts)
+    return best
+
+
+@pytest.mark.parametrize('needs', [[1000, 1000], [2000, 600], [0, 1400], [900, 900], [2500, 2600]])
+def test_plan_matches_brute_force(needs):
+    counts = planner.plan(MINUTES, QUEST_REP, needs)
+
+    assert np.all(np.asarray(QUEST_REP) @ counts >= needs)
+    assert np.dot(MINUTES, counts) == _brute_force(MINUTES, QUEST_REP, needs)
+
+
+# Rounding the LP up is 1 minute slower here, which the integer program fixes
+def test_plan_beats_the_rounded_lp():
+    minutes, quest_rep, needs = [5, 6], [[3, 4]], [7]
+
+    rounded, _ = planner._solve_rounded_lp(np.asarray(minutes, dtype = float), np.asarray(quest_rep, dtype = float),
+                                           np.asarray(needs, dtype = float))
+    counts = planner.plan(minutes, quest_rep, needs)
+    assert np.dot(minutes, rounded) == 12
+    assert np.dot(minutes, counts) == _brute_force(minutes, quest_rep, needs) == 11
+
+
+def test_plan_applies_the_multiplier():
+    counts = planner.plan(MINUTES, QUEST_REP, [2000, 2000], multiplier = 2)
+    assert np.dot(MINUTES, counts) == _brute_force(MINUTES, QUEST_REP, [1000, 1000])
+
+
+def test_plan_needs_nothing_when_every_target_is_reached():
+    np.testing.assert_array_equal(planner.plan(MINUTES, QUEST_REP, [0, 0]), [0, 0, 0])
+
+
+def test_plan_caps_needs_at_max_rep():
+    capped = planner.plan([1], [[1000]], [10 * MAX_REP])
+    assert capped[0] == -(-MAX_REP // 1000)
+
+
+def test_plan_rejects_a_faction_no_quest_gives_rep_to():
+    with pytest.raises(ValueError, match = r'No quest gives rep for faction\(s\) 1'):
+        planner.plan([2, 3], [[400, 0], [0, 0]], [1000, 1000])
+
+
+@pytest.mark.parametrize('minutes, quest_rep, needs', [([1, np.nan], [[1, 1]], [10]),
+                                                       ([1, np.inf], [[0, 1]], [10]),
+                                                       ([1], [[np.nan]], [10]),
+                                                       ([1], [[1]], [np.nan])])
+def test_plan_rejects_values_that_are_not_numbers(minutes, quest_rep, needs):
+    with pytest.raises(ValueError, match = 'must all be numbers'):
+        planner.plan(minutes, quest_rep, needs)
+
+
+@pytest.mark.parametrize('minutes, quest_rep', [([0, 3, 4], QUEST_REP), ([2, 3, 4], [[400, -1, 300], [0, 500, 300]])])
+def test_plan_rejects_bad_quests(minutes, quest_rep):
+    with pytest.raises(ValueError, match = 'Quest times must be positive'):
+        planner.plan(minutes, quest_rep, [1000, 1000])
+
+
+def test_plan_rejects_mismatched_shapes():
+    with pytest.raises(ValueError, match = 'one row per faction'):
+        planner.plan(MINUTES, QUEST_REP, [1000])
+
+
+def test_rep_needed():
+    assert planner.rep_needed(1, 0, MAX_RANK) == MAX_REP
+    assert planner.rep_needed(2, 100, 3) == RANK_START[2] - RANK_START[1] - 100
+    assert planner.rep_needed(5, 0, 3) == 0
+
+
+@pytest.mark.parametrize('rank, target_rank', [(1, 0), (1, MAX_RANK + 1), (0, 5), (MAX_RANK + 1, 5)])
+def test_rep_needed_rejects_ranks_that_do_not_exist(rank, target_rank):
+    with pytest.raises(ValueError, match = f'Ranks must be from 1 to {MAX_RANK}'):
+        planner.rep_needed(rank, 0, target_rank)
+
+
+def test_plan_catalog():
+    catalog = pd.DataFrame({'quest': ['A', 'B', 'C'], 'minutes': MINUTES,
+                            'Faction 1': [400, None, 300], 'Faction 2': [0, 500, 300]})
+    table, total_minutes = planner.plan_catalog(catalog, {'Faction 1': (1, 0, 2), 'Faction 2': (1, 0, 2)})
+
+    needs = [RANK_START[1]] * 2
+    assert total_minutes == _brute_force(MINUTES, QUEST_REP, needs)
+    assert list(table.columns) == ['quest', 'minutes', 'completions', 'total_minutes']
+    assert (table['completions'] > 0).all()
+
+
+def test_plan_catalog_names_missing_columns_and_factions_without_rep():
+    catalog = pd.DataFrame({'quest': ['A'], 'minutes': [2], 'Faction 1': [400], 'Faction 2': [0]})
+    with pytest.raises(ValueError, match = 'Missing column'):
+        planner.plan_catalog(catalog, {'Faction 3': (1, 0, 2)})
+    with pytest.raises(ValueError, match = 'No quest in the catalog gives rep for Faction 2'):
+        planner.plan_catalog(catalog, {'Faction 1': (1, 0, 2), 'Faction 2': (1, 0, 2)})
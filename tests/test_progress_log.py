@@ -0,0 +1,94 @@
+import datetime
+
+import pytest
+
+from aqw_stats import progress_log
+from aqw_stats.progress_log import RATE_HALF_LIFE, SECONDS_PER_DAY, ProgressLog
+from aqw_stats.reputation import MAX_REP
+
+DAY = SECONDS_PER_DAY
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = ProgressLog(str(tmp_path / 'progress.sqlite3'))
+    yield log
+    log.close()
+
+
+def test_empty_history(log):
+    assert log.stats('Artix', 'Good') is None
+    assert log.forecast('Artix', 'Good') is None
+    assert log.history('Artix', 'Good') == []
+    assert log.factions('Artix') == []
+
+
+def test_insert(log):
+    log.add('Artix', 'Good', 1000, ts = 0)
+    log.add('Artix', 'Evil', 50, ts = 0)
+    assert log.stats('Artix', 'Good') == {'n_samples': 1, 'first_ts': 0, 'first_rep': 1000, 'last_ts': 0,
+                                          'last_rep': 1000, 'rate': None}
+    assert log.factions('Artix') == ['Evil', 'Good']
+    assert log.factions('Alina') == []
+    # A single sample gives no rate to forecast from
+    assert log.forecast('Artix', 'Good') is None
+
+
+# The rate starts as the first interval's and then moves towards each new interval's rate by a weight set
+# by the half-life, whatever order the samples arrive in
+def test_ewma_rate(log):
+    log.add('Artix', 'Good', 1000, ts = 0)
+    log.add('Artix', 'Good', 2000, ts = 2 * DAY)
+    assert log.stats('Artix', 'Good')['rate'] == pytest.approx(500)
+
+    log.add('Artix', 'Good', 5000, ts = 3 * DAY)
+    weight = 1 - 0.5 ** (1 / RATE_HALF_LIFE)
+    expected = weight * 3000 + (1 - weight) * 500
+    assert log.stats('Artix', 'Good')['rate'] == pytest.approx(expected)
+
+    # An older sample is kept for the chart and can move the first sample, but not the rate
+    log.add('Artix', 'Good', 500, ts = -DAY)
+    stats = log.stats('Artix', 'Good')
+    assert (stats['n_samples'], stats['first_ts'], stats['first_rep'], stats['last_rep']) == (4, -DAY, 500, 5000)
+    assert stats['rate'] == pytest.approx(expected)
+    assert [rep for _, rep in log.history('Artix', 'Good')] == [500, 1000, 2000, 5000]
+
+    forecast = log.forecast('Artix', 'Good')
+    assert forecast['rep_left'] == MAX_REP - 5000
+    assert forecast['days_left'] == pytest.approx((MAX_REP - 5000) / expected)
+    assert forecast['date'] == datetime.date.fromtimestamp(3 * DAY + forecast['days_left'] * DAY)
+
+
+def test_forecast_at_rank_10_and_without_progress(log):
+    log.add('Artix', 'Good', MAX_REP, ts = 0)
+    assert log.forecast('Artix', 'Good')['days_left'] == 0
+    log.add('Artix', 'Evil', 100, ts = 0)
+    log.add('Artix', 'Evil', 100, ts = DAY)
+    assert log.forecast('Artix', 'Evil') is None
+
+
+def test_history_is_bounded(log):
+    for day in range(100):
+        log.add('Artix', 'Good', day * 100, ts = day * DAY)
+    history = log.history('Artix', 'Good', max_points = 10)
+    assert len(history) <= 11
+    assert history[-1] == (99 * DAY, 9900)
+
+
+def test_samples_per_player_are_capped(tmp_path):
+    log = ProgressLog(str(tmp_path / 'progress.sqlite3'), max_samples = 3)
+    log.add('Artix', 'Good', 100, ts = 0)
+    log.add('Artix', 'Evil', 100, ts = 0)
+    log.add('Artix', 'Good', 200, ts = DAY)
+    with pytest.raises(ValueError, match = 'maximum of 3'):
+        log.add('Artix', 'Chaos', 100, ts = DAY)
+    log.add('Alina', 'Good', 100, ts = 0)
+    assert log.stats('Artix', 'Chaos') is None
+    log.close()
+
+
+def test_tracker_is_opt_in(monkeypatch):
+    monkeypatch.delenv('AQW_TRACKER_ALLOWED', raising = False)
+    assert not progress_log.tracker_allowed()
+    monkeypatch.setenv('AQW_TRACKER_ALLOWED', '1')
+    assert progress_log.tracker_allowed()
@@ -0,0 +1,77 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aqw_stats.reputation import MAX_RANK, MAX_REP, REP_RANK, batch_progress, progress, rank_of, total_rep
+
+HEADER = 'player,faction,rank,rep,quest_rep,item_boost,rep_boost,server_boost\n'
+
+
+def _batch(rows):
+    return batch_progress(pd.read_csv(io.StringIO(HEADER + ''.join(f'{row}\n' for row in rows))))
+
+
+# Every rank at its first and last rep, so the prefix sums and searchsorted are checked at each boundary
+def test_batch_matches_progress_across_rank_boundaries():
+    rows = []
+    for rank in range(1, MAX_RANK):
+        for rep in [0, 1, REP_RANK[rank] - 1]:
+            rows.append((rank, rep, 400 + rank, rank * 10, rank % 2, 1 + rank % 3))
+    rows.append((MAX_RANK, 0, 400, 0, 0, 1))
+    result = _batch([f'p,f,{rank},{rep},{quest},{item},{boost},{server}' for rank, rep, quest, item, boost, server in rows])
+
+    for (rank, rep, quest, item, boost, server), (_, out) in zip(rows, result.iterrows()):
+        expected = progress(rank, rep, quest, item, bool(boost), server)
+        assert out['total_rep'] == expected['total_rep']
+        assert out['progress_pct'] == pytest.approx(expected['progress_pct'])
+        assert out['rep_left'] == expected['rep_left']
+        assert out['boosted_quest_rep'] == pytest.approx(expected['boosted_quest_rep'])
+        for r in range(2, MAX_RANK + 1):
+            assert out[f'quests_to_rank_{r}'] == expected['quests_to_rank'].get(r, 0)
+
+
+def test_rank_of_inverts_total_rep():
+    for rank in range(1, MAX_RANK):
+        assert rank_of(total_rep(rank, 0)) == rank
+        assert rank_of(total_rep(rank, REP_RANK[rank] - 1)) == rank
+    assert rank_of(MAX_REP) == MAX_RANK
+
+
+@pytest.mark.parametrize('row', ['p,f,,100,400,0,No,1',          # blank rank
+                                 'p,f,abc,100,400,0,No,1',       # non-numeric rank
+                                 'p,f,2.5,100,400,0,No,1',       # fractional rank
+                                 'p,f,11,0,400,0,No,1',          # rank above 10
+                                 'p,f,10,1,400,0,No,1',          # rep at rank 10
+                                 'p,f,1,900,400,0,No,1',         # rep reaching the next rank
+                                 'p,f,3,-1,400,0,No,1',          # negative rep
+                                 'p,f,3,100.5,400,0,No,1',       # fractional rep
+                                 'p,f,3,100,0,0,No,1',           # quest_rep of 0
+                                 'p,f,3,100,,0,No,1',            # blank quest_rep
+                                 'p,f,3,100,-400,0,No,1',        # negative quest_rep
+                                 'p,f,3,100,400,-100,No,1',      # item boost cancelling the rep
+                                 'p,f,3,100,400,0,No,',          # blank server_boost
+                                 'p,f,3,100,400,0,No,0.5'])      # server_boost below 1
+def test_batch_rejects_invalid_rows(row):
+    with pytest.raises(ValueError, match = r'Invalid values on 1 row\(s\): 2\.'):
+        _batch(['p,f,3,100,400,0,No,1', row, 'p,f,3,100,400,0,No,1'])
+
+
+def test_batch_names_every_invalid_row():
+    rows = ['p,f,3,100,400,0,No,1'] + ['p,f,,100,400,0,No,1'] * 12
+    with pytest.raises(ValueError, match = r'Invalid values on 12 row\(s\): 2, 3, .*, 11, \.\.\.'):
+        _batch(rows)
+
+
+def test_batch_optional_columns_and_missing_ones():
+    df = pd.DataFrame({'player': ['p'], 'faction': ['f'], 'rank': [3], 'rep': [100], 'quest_rep': [400]})
+    assert batch_progress(df)['boosted_quest_rep'].tolist() == [400]
+    with pytest.raises(ValueError, match = 'Missing column'):
+        batch_progress(df.drop(columns = 'quest_rep'))
+
+
+def test_blank_rep_boost_column_is_no_boost():
+    df = pd.DataFrame({'player': ['p'], 'faction': ['f'], 'rank': [3], 'rep': [100], 'quest_rep': [400],
+                       'rep_boost': [np.nan]})
+    assert batch_progress(df)['boosted_quest_rep'].tolist() == [400]
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from aqw_app import shared_cache
+from aqw_app.shared_cache import ResultCache
+
+
+def _value(nbytes):
+    return np.zeros(nbytes, dtype = np.uint8)
+
+
+def test_hits_and_misses():
+    cache = ResultCache(max_bytes = 1000)
+    calls = []
+    compute = lambda: calls.append(1) or _value(10)
+    assert cache.get_or_compute('a', compute) is cache.get_or_compute('a', compute)
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries'], stats['bytes']) == (1, 1, 1, 10)
+    assert stats['hit_rate'] == 0.5
+
+
+# Values are evicted least recently used first once the cache holds more than max_bytes
+def test_lru_eviction_keeps_within_the_byte_cap():
+    cache = ResultCache(max_bytes = 100)
+    for key in 'abc':
+        cache.get_or_compute(key, lambda: _value(40))
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 80
+
+    cache.get_or_compute('b', lambda: _value(40))
+    cache.get_or_compute('d', lambda: _value(40))
+    assert set(cache._entries) == {'b', 'd'}
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+
+def test_values_larger_than_the_cap_are_not_kept():
+    cache = ResultCache(max_bytes = 100)
+    cache.get_or_compute('small', lambda: _value(10))
+    assert cache.get_or_compute('big', lambda: _value(500)).nbytes == 500
+    assert set(cache._entries) == {'small'}
+    assert cache.stats()['bytes'] == 10
+
+
+def test_cached_arrays_are_read_only():
+    cache = ResultCache()
+    value = cache.get_or_compute('a', lambda: {'x': _value(4)})
+    with pytest.raises(ValueError):
+        value['x'][0] = 1
+
+
+def test_failed_computation_is_not_cached():
+    cache = ResultCache()
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('a', lambda: (_ for _ in ()).throw(RuntimeError))
+    assert cache.get_or_compute('a', lambda: 1) == 1
+
+
+# Equal arguments of different types share one entry
+def test_shared_normalises_arguments(monkeypatch):
+    monkeypatch.setattr(shared_cache, 'cache', ResultCache())
+    calls = []
+
+    @shared_cache.shared
+    def square(values, scale = 1.0):
+        calls.append(1)
+        return [v * v * scale for v in values]
+
+    assert square([1, 2], scale = 0.25) == square((1, 2), scale = np.float64(0.25))
+    assert len(calls) == 1
+    square([1, 2], scale = 0.5)
+    assert len(calls) == 2
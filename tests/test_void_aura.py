@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from aqw_stats.compound import days_to_target
+from aqw_stats.void_aura import (AURA_REWARDS, SAMPLING_METHODS, boost_calendar, exact_days, median_days,
+                                 sample_days, sample_mean_aura, simulate_days)
+
+AMT_FARM = 300
+QUESTS_PER_DAY = 5
+DAILY_BONUS = 3
+
+
+# simulate_days draws each day from the exact pmf, so on a constant calendar it samples exact_days itself
+@pytest.mark.parametrize('boost_status', [False, True])
+def test_simulate_days_matches_exact_days(boost_status):
+    exact = exact_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, boost_status)
+    sim = simulate_days(AMT_FARM, boost_calendar(QUESTS_PER_DAY, boost_status), DAILY_BONUS, 100_000, seed = 1)
+
+    assert sim.pmf.sum() == pytest.approx(1)
+    assert sim.mean() == pytest.approx(exact.mean(), abs = 0.01)
+    assert sim.median() == exact.median()
+    assert sim.std() == pytest.approx(exact.std(), rel = 0.02)
+
+
+# A server boost doubles the quest rewards but not the daily bonus
+def test_simulate_days_applies_the_multiplier_to_quests_only():
+    rewards = AURA_REWARDS[False]
+    exact = days_to_target(AMT_FARM, 2 * rewards, np.full(len(rewards), 1 / len(rewards)), QUESTS_PER_DAY, DAILY_BONUS)
+    sim = simulate_days(AMT_FARM, boost_calendar(QUESTS_PER_DAY, multiplier = 2), DAILY_BONUS, 100_000, seed = 2)
+
+    assert sim.mean() == pytest.approx(exact.mean(), abs = 0.01)
+    assert sim.median() == exact.median()
+    assert sim.std() == pytest.approx(exact.std(), rel = 0.02)
+
+
+@pytest.mark.parametrize('boost_status', [False, True])
+def test_sample_mean_aura_matches_the_reward_table(boost_status):
+    rewards = AURA_REWARDS[boost_status]
+    means = sample_mean_aura(10, 100_000, boost_status, seed = 3)
+
+    assert means.mean() == pytest.approx(rewards.mean(), abs = 0.05)
+    assert means.std() == pytest.approx(rewards.std() / np.sqrt(10), rel = 0.02)
+
+
+# sample_days is continuous and fixes the mean of 10 turn-ins for a whole path, so it only agrees with the
+# exact distribution of whole days to within the day that is rounded up
+@pytest.mark.parametrize('boost_status', [False, True])
+def test_sample_days_is_within_a_day_of_exact_days(boost_status):
+    exact = exact_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, boost_status)
+    days = sample_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, boost_status, 100_000, seed = 4)
+
+    assert exact.mean() - 1 <= days.mean() <= exact.mean()
+    assert exact.median() - 1 <= np.median(days) <= exact.median()
+    assert np.median(np.ceil(days)) == exact.median()
+    assert np.ceil(days).mean() == pytest.approx(exact.mean(), abs = 0.5)
+
+
+def test_sample_days_is_reproducible_with_a_seed():
+    first = sample_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, False, 1000, seed = 5)
+    np.testing.assert_array_equal(first, sample_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, False, 1000, seed = 5))
+
+
+@pytest.mark.parametrize('method', SAMPLING_METHODS)
+@pytest.mark.parametrize('boost_status', [False, True])
+def test_median_days_matches_sample_days(method, boost_status):
+    exact = exact_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, boost_status)
+    days = sample_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, boost_status, 100_000, seed = 6)
+    result = median_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, boost_status, tol = 0.1, method = method, seed = 6)
+
+    assert result['converged']
+    assert result['ci_low'] <= result['median'] <= result['ci_high']
+    assert result['median'] == pytest.approx(np.median(days), abs = 0.1)
+    assert np.ceil(result['median']) == exact.median()
+    assert len(result['samples']) == result['n_samples']
+
+
+# Sample counts that are not powers of 2 are rounded up rather than unbalancing the Sobol points
+def test_median_days_rounds_sample_counts_up_to_powers_of_2(recwarn):
+    result = median_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, False, tol = -1, method = 'sobol',
+                         min_samples = 1000, max_samples = 3000, seed = 7)
+
+    assert not result['converged']
+    assert result['n_samples'] == 4096
+    assert len(recwarn) == 0
+
+
+def test_median_days_rejects_unknown_methods():
+    with pytest.raises(ValueError, match = 'Unknown sampling method'):
+        median_days(AMT_FARM, QUESTS_PER_DAY, DAILY_BONUS, False, method = 'halton')
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from aqw_stats import void_aura_table as vat
+from aqw_stats.void_aura import exact_days
+
+AMT_REQ = 60
+MAX_QUESTS_PER_DAY = 3
+DAILY_BONUSES = (0, 10)
+
+
+# Shrinks the table to a grid small enough to build in a test, and builds it in this process
+@pytest.fixture
+def table_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(vat, 'AMT_REQ', AMT_REQ)
+    monkeypatch.setattr(vat, 'MAX_QUESTS_PER_DAY', MAX_QUESTS_PER_DAY)
+    monkeypatch.setattr(vat, 'DAILY_BONUSES', DAILY_BONUSES)
+    monkeypatch.setattr(vat, 'TABLE_SHAPE', (len(vat.BOOST_STATUSES), len(DAILY_BONUSES), MAX_QUESTS_PER_DAY, AMT_REQ))
+
+    path = str(tmp_path / 'data' / 'void_aura_table.npy')
+    vat.build_table(path, workers = 1)
+    return path
+
+
+def _cells():
+    return [(current, quests_per_day, daily_bonus, boost_status) for boost_status in vat.BOOST_STATUSES
+            for daily_bonus in DAILY_BONUSES for quests_per_day in range(1, MAX_QUESTS_PER_DAY + 1)
+            for current in range(AMT_REQ)]
+
+
+def test_build_table_writes_a_table_load_table_accepts(table_path):
+    table = vat.load_table(table_path)
+
+    assert table is not None
+    assert table.shape == vat.TABLE_SHAPE
+    assert not (table['max'] == 0).any()
+
+
+def test_load_table_rejects_missing_and_mismatched_tables(table_path, tmp_path):
+    assert vat.load_table(str(tmp_path / 'missing.npy')) is None
+
+    other = str(tmp_path / 'other.npy')
+    np.save(other, np.zeros(vat.TABLE_SHAPE, dtype = [('mean', '<f8')]))
+    assert vat.load_table(other) is None
+
+
+def test_lookups_match_summarise_config(table_path):
+    table = vat.load_table(table_path)
+    for boost_status in vat.BOOST_STATUSES:
+        for daily_bonus in DAILY_BONUSES:
+            for quests_per_day in range(1, MAX_QUESTS_PER_DAY + 1):
+                _, out = vat.summarise_config((boost_status, daily_bonus, quests_per_day))
+                for current in range(AMT_REQ):
+                    assert vat.lookup(table, current, quests_per_day, daily_bonus, boost_status) == \
+                        {name: out[current][name].item() for name in vat.TABLE_DTYPE.names}
+
+
+def test_lookups_match_exact_days(table_path):
+    table = vat.load_table(table_path)
+    for current, quests_per_day, daily_bonus, boost_status in _cells():
+        stored = vat.lookup(table, current, quests_per_day, daily_bonus, boost_status)
+        live = vat.days_summary(exact_days(AMT_REQ - current, quests_per_day, daily_bonus, boost_status))
+        for name in vat.TABLE_DTYPE.names:
+            assert stored[name] == pytest.approx(live[name], rel = 1e-4, abs = 1e-4), (current, quests_per_day, name)
+
+
+def test_days_stats_falls_back_outside_the_table(table_path):
+    table = vat.load_table(table_path)
+
+    assert vat.days_stats(5, 2, 10, True, table) == vat.lookup(table, 5, 2, 10, True)
+    for current, quests_per_day, daily_bonus in [(5, MAX_QUESTS_PER_DAY + 1, 0), (5, 2, 25), (AMT_REQ, 2, 0)]:
+        live = vat.days_summary(exact_days(AMT_REQ - current, quests_per_day, daily_bonus, False))
+        assert vat.days_stats(current, quests_per_day, daily_bonus, False, table) == live
+
+
+def test_verify_table_finds_corrupted_cells(table_path):
+    table = vat.load_table(table_path)
+    assert vat.verify_table(table, n_cells = 200, seed = 0) == []
+
+    corrupted = np.array(table)
+    corrupted['mean'] += 1
+    mismatches = vat.verify_table(corrupted, n_cells = 20, seed = 0)
+    assert len(mismatches) == 20
+    cell, stored, live = mismatches[0]
+    assert stored['mean'] == pytest.approx(live['mean'] + 1, rel = 1e-4)